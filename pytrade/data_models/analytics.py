@@ -3,6 +3,7 @@ import numpy as np
 import matplotlib.pyplot as plt
 import matplotlib.ticker as mticker
 from pytrade.data_models.simulation import BaseSimulationResults
+from pytrade.simulation.streaming import histogram_quantiles
 
 
 class PortfolioAnalytics:
@@ -53,42 +54,68 @@ class PortfolioAnalytics:
         plt.show()
 
 
+    # resolution → (months per period, period key, correlation key prefix, period unit)
+    SEQUENCE_RESOLUTIONS = {
+        "yearly":  (12, "years",  "annual",  "year"),
+        "monthly": (1,  "months", "monthly", "month"),
+    }
+
     def analyze_sequence_sensitivity(
         self,
         simulation_results: BaseSimulationResults,
+        resolution: str = "yearly",
     ) -> BaseSimulationResults:
         """
-        For each year in the simulation horizon, compute the Spearman rank correlation
-        between that year's return and the terminal portfolio value, across all simulated
-        paths. Also computes the partial correlation controlling for total path return,
-        which isolates the pure timing effect from return magnitude.
+        For each year (or month, with resolution="monthly") in the simulation horizon,
+        compute the Spearman rank correlation between that period's return and the
+        terminal portfolio value, across all simulated paths. Also computes the partial
+        correlation controlling for total path return, which isolates the pure timing
+        effect from return magnitude.
+
+        Every period's compounded return is computed in one reshaped (N, periods,
+        months) product, all columns are ranked once along the path axis, and all
+        correlations come from a single product of standardized ranks.
         """
-        from scipy.stats import spearmanr
+        from scipy.stats import rankdata
+
+        if resolution not in self.SEQUENCE_RESOLUTIONS:
+            raise ValueError(
+                f"Unknown resolution '{resolution}'. Expected one of {list(self.SEQUENCE_RESOLUTIONS)}."
+            )
+        months_per_period, period_key, prefix, _ = self.SEQUENCE_RESOLUTIONS[resolution]
 
         outputs         = simulation_results.simulation_output
-        returns_arr     = outputs["sampled_returns"]           # (N, T)
-        terminal_values = outputs["portfolio_value"][:, -1]   # (N,)
-        _, T            = returns_arr.shape
-        horizon_years   = T // 12
+        returns_arr     = np.asarray(outputs["sampled_returns"])          # (N, T)
+        terminal_values = np.asarray(outputs["portfolio_value"][:, -1])   # (N,)
+        N, T            = returns_arr.shape
+        num_periods     = T // months_per_period
 
+        growth       = 1 + returns_arr[:, :num_periods * months_per_period]
+        period_ret   = np.prod(growth.reshape(N, num_periods, months_per_period), axis=2) - 1
         total_return = np.prod(1 + returns_arr, axis=1) - 1
-        r_YZ = spearmanr(terminal_values, total_return).statistic
 
-        annual_corr   = np.empty(horizon_years)
-        partial_corr  = np.empty(horizon_years)
+        # Spearman = Pearson on (average) ranks: columns are [periods..., Y, Z]
+        ranks = rankdata(
+            np.column_stack([period_ret, terminal_values, total_return]), axis=0
+        )
+        ranks -= ranks.mean(axis=0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            ranks /= np.sqrt((ranks ** 2).sum(axis=0))
+            corr = ranks.T @ ranks[:, -2:]                              # (periods + 2, 2)
+
+        r_XY = corr[:num_periods, 0]
+        r_XZ = corr[:num_periods, 1]
+        r_YZ = corr[num_periods, 1]
 
-        for yr in range(horizon_years):
-            ann_ret = np.prod(1 + returns_arr[:, yr * 12:(yr + 1) * 12], axis=1) - 1
-            r_XY = spearmanr(ann_ret, terminal_values).statistic
-            r_XZ = spearmanr(ann_ret, total_return).statistic
+        with np.errstate(invalid="ignore"):
             denom = np.sqrt((1 - r_XZ ** 2) * (1 - r_YZ ** 2))
-            annual_corr[yr]  = r_XY
-            partial_corr[yr] = (r_XY - r_XZ * r_YZ) / denom if denom > 1e-10 else 0.0
+            partial_corr = np.where(denom > 1e-10, (r_XY - r_XZ * r_YZ) / denom, 0.0)
 
         return BaseSimulationResults(simulation_output={
-            "years":                      np.arange(1, horizon_years + 1),
-            "annual_correlation":         annual_corr,
-            "annual_partial_correlation": partial_corr,
+            "resolution":                    resolution,
+            period_key:                      np.arange(1, num_periods + 1),
+            f"{prefix}_correlation":         r_XY,
+            f"{prefix}_partial_correlation": partial_corr,
         })
 
 
@@ -97,9 +124,12 @@ class PortfolioAnalytics:
         sensitivity_results: BaseSimulationResults,
     ) -> None:
         outputs      = sensitivity_results.simulation_output
-        years        = outputs["years"]
-        raw_corr     = outputs["annual_correlation"]
-        partial_corr = outputs["annual_partial_correlation"]
+        resolution   = outputs.get("resolution", "yearly")
+        months_per_period, period_key, prefix, unit = self.SEQUENCE_RESOLUTIONS[resolution]
+        periods      = outputs[period_key]
+        raw_corr     = outputs[f"{prefix}_correlation"]
+        partial_corr = outputs[f"{prefix}_partial_correlation"]
+        tick_step    = 2 if months_per_period == 12 else 24
 
         BLUE_DARK, RED = "#1a4f7a", "#c0392b"
 
@@ -110,25 +140,25 @@ class PortfolioAnalytics:
         fig, axes = plt.subplots(1, 2, figsize=(14, 5), sharey=False)
         fig.suptitle("Sequence-of-Returns Sensitivity", fontsize=14, fontweight="bold")
 
-        # ── Left: raw annual Spearman correlation ─────────────────────────
+        # ── Left: raw per-period Spearman correlation ─────────────────────
         ax = axes[0]
-        ax.bar(years, raw_corr, color=bar_colors(raw_corr), edgecolor="white", linewidth=0.4)
+        ax.bar(periods, raw_corr, color=bar_colors(raw_corr), edgecolor="white", linewidth=0.4)
         ax.axhline(0, color="black", linewidth=0.8, linestyle="--")
-        ax.set_xlabel("Retirement year")
+        ax.set_xlabel(f"Retirement {unit}")
         ax.set_ylabel("Spearman correlation with terminal value")
-        ax.set_title("Return Impact by Year")
+        ax.set_title(f"Return Impact by {unit.title()}")
         ax.yaxis.set_major_formatter(mticker.FuncFormatter(lambda x, _: f"{x:.2f}"))
-        ax.set_xticks(years[::2])
+        ax.set_xticks(periods[::tick_step])
 
         # ── Right: partial correlation (controlling for total return) ─────
         ax = axes[1]
-        ax.bar(years, partial_corr, color=bar_colors(partial_corr), edgecolor="white", linewidth=0.4)
+        ax.bar(periods, partial_corr, color=bar_colors(partial_corr), edgecolor="white", linewidth=0.4)
         ax.axhline(0, color="black", linewidth=0.8, linestyle="--")
-        ax.set_xlabel("Retirement year")
+        ax.set_xlabel(f"Retirement {unit}")
         ax.set_ylabel("Partial correlation with terminal value")
-        ax.set_title("Pure Timing Effect by Year\n(controlling for total path return)")
+        ax.set_title(f"Pure Timing Effect by {unit.title()}\n(controlling for total path return)")
         ax.yaxis.set_major_formatter(mticker.FuncFormatter(lambda x, _: f"{x:.2f}"))
-        ax.set_xticks(years[::2])
+        ax.set_xticks(periods[::tick_step])
 
         plt.tight_layout()
         plt.show()
@@ -146,39 +176,35 @@ class PortfolioAnalytics:
         prior peak. Depth is the maximum percentage decline within the event.
         Duration is the number of months from peak to full recovery (or to the end
         of the path if the portfolio never recovers within the horizon).
+
+        Events are extracted for the whole matrix at once: drawdown-state edges
+        delimit each event in the flattened matrix and per-event statistics come
+        from segment reductions, so no per-path or per-event Python work is done.
         """
-        def _extract_events(returns_1d):
-            wealth = np.cumprod(1 + returns_1d)
-            peak   = np.maximum.accumulate(wealth)
-            dd     = wealth / peak - 1
-
-            in_dd  = dd < -1e-10
-            edges  = np.diff(in_dd.astype(int))
-            starts = np.where(edges == 1)[0] + 1
-            ends   = np.where(edges == -1)[0] + 1
-
-            if len(in_dd) > 0 and in_dd[-1]:
-                ends = np.append(ends, len(dd))
-
-            events = []
-            for s, e in zip(starts, ends):
-                peak_idx   = s - 1
-                trough_idx = s + int(np.argmin(dd[s:e]))
-                recovered  = int(e) < len(dd)
-                events.append({
-                    "depth":          float(dd[trough_idx]),
-                    "duration":       int(e) - peak_idx,
-                    "time_to_trough": trough_idx - peak_idx,
-                    "recovery_time":  (int(e) - trough_idx) if recovered else np.nan,
-                    "recovered":      recovered,
-                })
-            return events
-
-        all_events = []
-        for row in returns_2d:
-            all_events.extend(_extract_events(row))
-
-        if not all_events:
+        returns_2d = np.asarray(returns_2d, dtype=float)
+        if returns_2d.ndim == 1:
+            returns_2d = returns_2d[None, :]
+        num_paths, T = returns_2d.shape
+
+        # Drawdown matrix, padded with one trailing "at peak" column per row so
+        # that, once flattened, no drawdown run can spill into the next path.
+        W  = T + 1
+        dd = np.zeros((num_paths, W))
+        wealth = np.cumprod(1 + returns_2d, axis=1)
+        np.divide(wealth, np.maximum.accumulate(wealth, axis=1), out=dd[:, :T])
+        dd[:, :T] -= 1
+        dd = dd.ravel()
+
+        # Drawdown state edges: +1 where a run starts, -1 one past where it ends.
+        # Column 0 is its own peak (x / x == 1); forcing it out of drawdown makes
+        # explicit that every run starts inside its row, after its peak month.
+        in_dd = dd < -1e-10
+        in_dd[::W] = False
+        edges = np.diff(in_dd.view(np.int8), prepend=np.int8(0))
+        starts = np.flatnonzero(edges == 1)
+        ends   = np.flatnonzero(edges == -1)
+
+        if len(starts) == 0:
             empty = np.array([])
             return BaseSimulationResults(simulation_output={
                 "depths": empty, "durations": empty,
@@ -186,12 +212,29 @@ class PortfolioAnalytics:
                 "recovered": np.array([], dtype=bool),
             })
 
+        # Trough depth per event: segment minimum over [start, end)
+        bounds = np.column_stack([starts, ends]).ravel()
+        trough = np.minimum.reduceat(dd, bounds)[::2]
+
+        # Trough position: first month within each event that hits its minimum.
+        # The in-drawdown positions are exactly the concatenated [start, end) runs.
+        lengths    = ends - starts
+        in_dd_pos  = np.flatnonzero(in_dd)
+        hits       = np.flatnonzero(dd[in_dd_pos] == np.repeat(trough, lengths))
+        hit_event  = np.repeat(np.arange(len(starts)), lengths)[hits]
+        first      = hits[np.flatnonzero(np.diff(hit_event, prepend=-1))]
+        trough_idx = in_dd_pos[first] % W
+
+        peak_idx  = starts % W - 1
+        end_idx   = ends % W
+        recovered = end_idx < T
+
         return BaseSimulationResults(simulation_output={
-            "depths":          np.array([-e["depth"]          for e in all_events]),
-            "durations":       np.array([e["duration"]        for e in all_events]),
-            "times_to_trough": np.array([e["time_to_trough"]  for e in all_events]),
-            "recovery_times":  np.array([e["recovery_time"]   for e in all_events], dtype=float),
-            "recovered":       np.array([e["recovered"]       for e in all_events], dtype=bool),
+            "depths":          -trough,
+            "durations":       end_idx - peak_idx,
+            "times_to_trough": trough_idx - peak_idx,
+            "recovery_times":  np.where(recovered, end_idx - trough_idx, np.nan),
+            "recovered":       recovered,
         })
 
 
@@ -266,19 +309,45 @@ class PortfolioAnalytics:
 
 
     def generate_simulation_report(self, simulation_results: BaseSimulationResults):
-        dict_results  = simulation_results.simulation_output
-        portfolio_arr = dict_results["portfolio_value"]   # (num_sim, seq_len)
-        withdraw_arr  = dict_results["withdrawals"]        # (num_sim, seq_len)
-        _, seq_len = portfolio_arr.shape
-        months = np.arange(seq_len)
+        """
+        Plot depletion rate, value and withdrawal fans and the terminal value
+        distribution. Accepts either the dense output of
+        simulate_withdrawal_failure_rate (exact quantiles) or the streamed summary
+        of simulate_withdrawal_summary (quantiles approximated from histograms).
+        """
+        dict_results = simulation_results.simulation_output
+        pv_levels    = [0.05, 0.25, 0.50, 0.75, 0.95]
+        wd_levels    = [0.10, 0.25, 0.50, 0.75, 0.90]
 
         # ── Derived series ─────────────────────────────────────────────────
-        failure_rate    = (portfolio_arr <= 0).mean(axis=0)
-        pv_q            = np.quantile(portfolio_arr, [0.05, 0.25, 0.50, 0.75, 0.95], axis=0)
-        wd_q            = np.quantile(withdraw_arr,  [0.10, 0.25, 0.50, 0.75, 0.90], axis=0)
-        terminal_values = portfolio_arr[:, -1]
-        pct_depleted    = (terminal_values == 0).mean()
-        survivors       = terminal_values[terminal_values > 0]
+        if "portfolio_value" in dict_results:
+            portfolio_arr = dict_results["portfolio_value"]   # (num_sim, seq_len)
+            withdraw_arr  = dict_results["withdrawals"]        # (num_sim, seq_len)
+
+            failure_rate    = (portfolio_arr <= 0).mean(axis=0)
+            pv_q            = np.quantile(portfolio_arr, pv_levels, axis=0)
+            wd_q            = np.quantile(withdraw_arr,  wd_levels, axis=0)
+            terminal_values = portfolio_arr[:, -1]
+            pct_depleted    = (terminal_values == 0).mean()
+            survivors       = terminal_values[terminal_values > 0]
+            survivor_hist   = None
+            survivor_median = np.median(survivors) if len(survivors) > 0 else np.nan
+        else:
+            value_edges   = dict_results["portfolio_value_bin_edges"]
+            value_hist    = dict_results["portfolio_value_histogram"]   # (seq_len, bins + 2)
+
+            failure_rate    = dict_results["failure_rate"]
+            pv_q            = histogram_quantiles(value_hist, value_edges, pv_levels)
+            wd_q            = histogram_quantiles(
+                dict_results["withdrawals_histogram"], dict_results["withdrawals_bin_edges"], wd_levels
+            )
+            pct_depleted    = failure_rate[-1]
+            survivors       = np.array([])
+            survivor_hist   = value_hist[-1, 1:-1]
+            survivor_median = histogram_quantiles(value_hist[-1], value_edges, [0.5], skip_underflow=True)[0, 0]
+
+        seq_len = len(failure_rate)
+        months  = np.arange(seq_len)
 
         # ── Shared helpers ─────────────────────────────────────────────────
         BLUE_DARK, BLUE_MID, BLUE_LIGHT = "#1a4f7a", "#4a90d9", "#c8e0f4"
@@ -328,8 +397,17 @@ class PortfolioAnalytics:
         if len(survivors) > 0:
             ax.hist(survivors, bins=40, color=BLUE_MID, edgecolor="white",
                     linewidth=0.5, alpha=0.85, label="Survivors")
-            ax.axvline(np.median(survivors), color=BLUE_DARK, linewidth=1.5,
-                       linestyle="--", label=f"Median: {currency_fmt(np.median(survivors), None)}")
+        elif survivor_hist is not None and survivor_hist.sum() > 0:
+            # Streamed results: plot the log-spaced terminal histogram over its occupied range
+            occupied = np.flatnonzero(survivor_hist)
+            used = slice(occupied[0], occupied[-1] + 1)
+            ax.hist(value_edges[:-1][used], bins=value_edges[used.start:used.stop + 1],
+                    weights=survivor_hist[used], color=BLUE_MID, edgecolor="white",
+                    linewidth=0.5, alpha=0.85, label="Survivors")
+            ax.set_xscale("log")
+        if not np.isnan(survivor_median):
+            ax.axvline(survivor_median, color=BLUE_DARK, linewidth=1.5,
+                       linestyle="--", label=f"Median: {currency_fmt(survivor_median, None)}")
         ax.xaxis.set_major_formatter(mticker.FuncFormatter(currency_fmt))
         ax.tick_params(axis="x", labelrotation=30)
         ax.set_title("Terminal Portfolio Value", fontweight="bold")
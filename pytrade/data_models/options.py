@@ -1,12 +1,13 @@
 
 import numpy as np
 from typing import Final
-from scipy.stats import norm
+from scipy.special import ndtr
 from datetime import datetime
 from enum import StrEnum
 from dataclasses import dataclass
 
 RISK_FREE_RATE: Final[float] = 0.035
+SQRT_2PI: Final[float] = np.sqrt(2 * np.pi)
 
 
 class OptionType(StrEnum):
@@ -21,10 +22,10 @@ class OptionDirection(StrEnum):
 
 @dataclass
 class Greeks:
-    delta: float
-    theta: float
-    gamma: float
-    vega: float
+    delta: float | np.ndarray
+    theta: float | np.ndarray
+    gamma: float | np.ndarray
+    vega: float | np.ndarray
 
 
 class OptionModel:
@@ -70,9 +71,9 @@ class OptionModel:
 
     def black_scholes_calculation(
         self,
-        underlying_price: float,
-        iv: float | None = None,
-        days_to_expiry: float | None = None
+        underlying_price: float | np.ndarray,
+        iv: float | np.ndarray | None = None,
+        days_to_expiry: float | np.ndarray | None = None
     ):
         
         """
@@ -80,6 +81,9 @@ class OptionModel:
         strike: Strike price
         days_to_expiry: Time to maturity (in days)
         iv: Volatility of the underlying asset (decimal)
+
+        All inputs broadcast against each other, so whole grids of spots, IVs and
+        DTEs are priced in one call. Scalar inputs return a scalar.
         """
 
         if iv is None:
@@ -88,60 +92,64 @@ class OptionModel:
         if days_to_expiry is None:
             days_to_expiry = self.days_to_expiry
 
+        underlying_price = np.asarray(underlying_price, dtype=float)
+        iv = np.asarray(iv, dtype=float)
+
         # Convert days to years
-        years_to_expiry = max(days_to_expiry, 0.0001) / 365.
-    
-        # Exit if almost at maturity
-        if years_to_expiry <= 0.0001 / 365.0:
-            if self.option_type == OptionType.PUT:
-                return max(self.strike - underlying_price, 0)
-            else:
-                return max(underlying_price - self.strike, 0)
-            
+        years_to_expiry = np.maximum(days_to_expiry, 0.0001) / 365.
+
+        # Intrinsic value for (almost) expired contracts
+        expired = years_to_expiry <= 0.0001 / 365.0
+        match self.option_type:
+            case OptionType.PUT:
+                intrinsic = np.maximum(self.strike - underlying_price, 0)
+            case OptionType.CALL:
+                intrinsic = np.maximum(underlying_price - self.strike, 0)
+            case _:
+                raise RuntimeError("Options are either Put or Call")
 
         # Calculate d1 and d2
         d1, d2 = self._compute_d1_d2(underlying_price, self.strike, years_to_expiry, iv)
+        discounted_strike = self.strike * np.exp(-RISK_FREE_RATE * years_to_expiry)
         match self.option_type:
             case OptionType.PUT:
                 # Calculate Put price
-                opt_price = self.strike * np.exp(-RISK_FREE_RATE * years_to_expiry) * norm.cdf(-d2) - underlying_price * norm.cdf(-d1)
-                            
+                opt_price = discounted_strike * ndtr(-d2) - underlying_price * ndtr(-d1)
+
             case OptionType.CALL:
                 # Calculate Call price
-                opt_price = underlying_price * norm.cdf(d1) - self.strike * np.exp(-RISK_FREE_RATE * years_to_expiry) * norm.cdf(d2)
+                opt_price = underlying_price * ndtr(d1) - discounted_strike * ndtr(d2)
 
-            case _:
-                raise RuntimeError("Options are either Put or Call")
-
-
-        return opt_price
+        return np.where(expired, intrinsic, opt_price)[()]
     
 
     def compute_greeks(
         self,
-        underlying_price: float,
-        iv: float | None = None,
-        days_to_expiry: float | None = None
+        underlying_price: float | np.ndarray,
+        iv: float | np.ndarray | None = None,
+        days_to_expiry: float | np.ndarray | None = None
     ) -> Greeks:
-        
+        """
+        Delta, theta (per day), gamma and vega (per 1% IV move). Inputs broadcast
+        like black_scholes_calculation; each greek has the broadcast shape.
+        """
+
         if iv is None:
             iv = self.iv
         if days_to_expiry is None:
             days_to_expiry = self.days_to_expiry
 
-        years_to_expiry = max(days_to_expiry, 0.0001) / 365.0
-        if years_to_expiry <= 0.0001 / 365.0:
-            if self.option_type == OptionType.CALL:
-                delta = 1.0 if underlying_price > self.strike else 0.0
-            else:
-                delta = -1.0 if underlying_price < self.strike else 0.0
-            return Greeks(delta=delta, theta=0.0, gamma=0.0, vega=0.0)
+        underlying_price = np.asarray(underlying_price, dtype=float)
+        iv = np.asarray(iv, dtype=float)
 
+        years_to_expiry = np.maximum(days_to_expiry, 0.0001) / 365.0
+        expired = years_to_expiry <= 0.0001 / 365.0
 
         d1, d2 = self._compute_d1_d2(underlying_price, self.strike, years_to_expiry, iv)
 
-        pdf_d1 = norm.pdf(d1)
+        pdf_d1 = np.exp(-0.5 * d1 ** 2) / SQRT_2PI
         sqrt_t = np.sqrt(years_to_expiry)
+        discounted_strike = self.strike * np.exp(-RISK_FREE_RATE * years_to_expiry)
 
         # Gamma (same for calls and puts)
         gamma = pdf_d1 / (underlying_price * iv * sqrt_t)
@@ -150,29 +158,36 @@ class OptionModel:
         vega = underlying_price * pdf_d1 * sqrt_t * 0.01
 
         if self.option_type == OptionType.CALL:
-            delta = norm.cdf(d1)
+            delta = ndtr(d1)
             theta = (
                 -(underlying_price * pdf_d1 * iv) / (2 * sqrt_t)
-                - RISK_FREE_RATE * self.strike * np.exp(-RISK_FREE_RATE * years_to_expiry) * norm.cdf(d2)
+                - RISK_FREE_RATE * discounted_strike * ndtr(d2)
             ) / 365.0
+            expiry_delta = np.where(underlying_price > self.strike, 1.0, 0.0)
 
         else:
-            delta = norm.cdf(d1) - 1
+            delta = ndtr(d1) - 1
             theta = (
                 -(underlying_price * pdf_d1 * iv) / (2 * sqrt_t)
-                + RISK_FREE_RATE * self.strike * np.exp(-RISK_FREE_RATE * years_to_expiry) * norm.cdf(-d2)
+                + RISK_FREE_RATE * discounted_strike * ndtr(-d2)
             ) / 365.0
+            expiry_delta = np.where(underlying_price < self.strike, -1.0, 0.0)
 
-        return Greeks(delta=delta, theta=theta, gamma=gamma, vega=vega)
+        return Greeks(
+            delta=np.where(expired, expiry_delta, delta)[()],
+            theta=np.where(expired, 0.0, theta)[()],
+            gamma=np.where(expired, 0.0, gamma)[()],
+            vega=np.where(expired, 0.0, vega)[()]
+        )
 
        
 
     @staticmethod
     def _compute_d1_d2(
-        underlying_price: float,
+        underlying_price: float | np.ndarray,
         strike: float,
-        years_to_expiry: float,
-        iv: float
+        years_to_expiry: float | np.ndarray,
+        iv: float | np.ndarray
     ):
         
         # Calculate d1 and d2
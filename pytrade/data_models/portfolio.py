@@ -1,13 +1,167 @@
 
+import asyncio
+import hashlib
+import warnings
+import threading
+import itertools
 import pandas as pd
 import numpy as np
-import requests
-import yfinance as yf
-from dataclasses import dataclass
-from functools import reduce
-from pathlib import Path
-from pytrade.data_models.simulation import BaseSimulationModel, BaseSimulationResults
+from dataclasses import dataclass, asdict
+from contextlib import ExitStack
+from multiprocessing import cpu_count, get_context
+from pytrade.data_models.simulation import BaseSimulationModel, BaseSimulationResults, CompactSimulationOutput
 from pytrade.data_models.analytics import PortfolioAnalytics
+from pytrade.simulation.utils import block_indices_from_uniforms
+from pytrade.simulation.seeding import as_seed_sequence, path_uniforms
+from pytrade.simulation.shared_memory import SharedArray
+from pytrade.simulation.withdrawal import simulate_withdrawals, simulate_withdrawal_policies, solve_perpetual_withdrawal_rates
+from pytrade.simulation.streaming import StreamingWithdrawalSummary
+from pytrade.utils.market_data import MarketDataCache
+from pytrade.utils.return_store import (
+    COMPLEX_TICKER_STRUCTURES, MonthlyReturnStore, default_monthly_return_store, split_ticker_chain
+)
+from pytrade.utils.inflation import InflationStore, default_inflation_store
+from pytrade.utils.external_data import ExternalSeriesRegistry, default_external_registry
+from pytrade.utils.async_loader import AsyncDataLoader, default_async_loader
+
+
+# Withdrawal policy parameters of simulate_withdrawal_failure_rate, with their defaults
+WITHDRAWAL_POLICY_DEFAULTS = {
+    "anual_withdrawal_rate":             0.04,
+    "minimum_monthly_withdrawal_amount": 1000,
+    "maximum_monthly_withdrawal_amount": 2000,
+    "drawdown_deferral":                 0,
+}
+
+# Allocation scores of Portfolio.optimize_allocation → sort ascending (lower is better)
+ALLOCATION_OBJECTIVES = {
+    "failure_rate":                     True,
+    "median_perpetual_withdrawal_rate": False,
+    "cvar":                             False,
+}
+
+
+# ---------------------------------------------------------------------------
+# Path simulation (module-level so worker processes can unpickle them)
+# ---------------------------------------------------------------------------
+
+def _bootstrap_indices(
+    history_length: int,
+    sequence_length: int,
+    path_start: int,
+    num_paths: int,
+    bootstrap_min_block_len: int,
+    bootstrap_max_block_len: int,
+    seed: int | np.random.SeedSequence
+) -> np.ndarray:
+    """
+    (num_paths, sequence_length) joint bootstrap index matrix into a monthly
+    history of `history_length` months for paths [path_start, path_start + num_paths).
+    Each path draws its own mean block length uniformly from
+    [bootstrap_min_block_len, bootstrap_max_block_len).
+
+    Draws are keyed by path index (see pytrade.simulation.seeding), so the
+    matrix does not depend on how a run is split into chunks or workers.
+    """
+    uniforms = path_uniforms(seed, path_start, num_paths, 2 * sequence_length + 1)
+    block_lens = bootstrap_min_block_len + np.floor(
+        uniforms[:, 0] * (bootstrap_max_block_len - bootstrap_min_block_len)
+    )
+    return block_indices_from_uniforms(uniforms[:, 1:], history_length, block_lens)
+
+
+def _withdrawal_paths(
+    sampled_returns: np.ndarray,
+    sampled_inflation: np.ndarray,
+    value_dtype: np.dtype = np.float64,
+    **withdrawal_kwargs
+) -> dict[str, np.ndarray]:
+    portfolio_value, withdrawals = simulate_withdrawals(sampled_returns, sampled_inflation, **withdrawal_kwargs)
+    return {
+        "portfolio_value": portfolio_value.astype(value_dtype, copy=False),
+        "withdrawals":     withdrawals.astype(value_dtype, copy=False),
+    }
+
+
+def _perpetual_paths(sampled_returns: np.ndarray, sampled_inflation: np.ndarray) -> dict[str, np.ndarray]:
+    return {"perpetual_withdrawal_rates": solve_perpetual_withdrawal_rates(sampled_returns, sampled_inflation)}
+
+
+def _simulate_path_range(
+    sources: dict[str, np.ndarray | float],
+    path_start: int,
+    num_paths: int,
+    bootstrap: dict,
+    path_function,
+    path_kwargs: dict,
+    keep_paths: bool
+) -> tuple[np.ndarray, dict[str, np.ndarray]]:
+    """Bootstrap paths [path_start, path_start + num_paths) and run `path_function` on them."""
+    indices = _bootstrap_indices(
+        len(sources["sampled_returns"]), path_start=path_start, num_paths=num_paths, **bootstrap
+    )
+    sampled_returns   = CompactSimulationOutput.gather(sources["sampled_returns"], indices)
+    sampled_inflation = CompactSimulationOutput.gather(sources["sampled_inflation"], indices)
+
+    outputs = path_function(sampled_returns, sampled_inflation, **path_kwargs)
+    if keep_paths:
+        outputs["sampled_returns"]   = sampled_returns
+        outputs["sampled_inflation"] = sampled_inflation
+    return indices, outputs
+
+
+def _fill_path_range(
+    sources: dict[str, np.ndarray | float],
+    path_start: int,
+    out: dict[str, np.ndarray],
+    bootstrap: dict,
+    path_function,
+    path_kwargs: dict,
+    chunk_size: int
+) -> None:
+    """
+    Simulate paths [path_start, path_start + len(rows of `out`)) in blocks of
+    `chunk_size` paths, writing each block's rows into the preallocated `out`
+    arrays (the bootstrap indices under "indices", when present). Only one
+    block of sampled paths is alive at a time.
+    """
+    num_paths = len(next(iter(out.values())))
+    keep_paths = "sampled_returns" in out
+    for start in range(0, num_paths, chunk_size):
+        stop = min(start + chunk_size, num_paths)
+        indices, outputs = _simulate_path_range(
+            sources, path_start + start, stop - start, bootstrap, path_function, path_kwargs, keep_paths
+        )
+        if "indices" in out:
+            out["indices"][start:stop] = indices
+        for key, values in outputs.items():
+            out[key][start:stop] = values
+
+
+# Shared arrays attached once per worker process by the pool initializer
+_worker_arrays: dict[str, SharedArray] = {}
+
+
+def _init_path_worker(specs: dict[str, tuple]) -> None:
+    for key, spec in specs.items():
+        _worker_arrays[key] = SharedArray.attach(spec)
+
+
+def _run_path_chunk(args) -> None:
+    """
+    Simulate one contiguous range of paths and write its rows in place into the
+    shared output buffers. Only the path range and the scalar parameters travel
+    through the task pickle.
+    """
+    path_start, path_stop, bootstrap, path_function, path_kwargs, chunk_size = args
+
+    sources = {key: _worker_arrays[f"source__{key}"].array for key in ("sampled_returns", "sampled_inflation")}
+    out = {
+        key: shared_array.array[path_start:path_stop]
+        for key, shared_array in _worker_arrays.items() if not key.startswith("source__")
+    }
+    _fill_path_range(sources, path_start, out, bootstrap, path_function, path_kwargs, chunk_size)
+
 
 
 @dataclass
@@ -21,17 +175,118 @@ class StockPosition:
 
 class Portfolio(BaseSimulationModel, PortfolioAnalytics):
 
-    COMPLEX_TICKER_STRUCTURES = ["?FB="]
+    COMPLEX_TICKER_STRUCTURES = COMPLEX_TICKER_STRUCTURES
 
-    def __init__(self, positions: list[StockPosition]):
+    def __init__(
+        self,
+        positions: list[StockPosition],
+        market_data: MarketDataCache | None = None,
+        inflation_store: InflationStore | None = None,
+        external_data: ExternalSeriesRegistry | None = None,
+        return_store: MonthlyReturnStore | None = None,
+        lazy: bool = False,
+        loader: AsyncDataLoader | None = None
+    ):
+        """
+        With `lazy=True` construction only validates the positions; the data
+        pipeline (prices, external padding, inflation, PRTF) runs on first
+        access to `data` — e.g. the first simulation — or via load / aload /
+        Portfolio.prefetch, and its result is kept.
+
+        Sources that need the network are fetched concurrently by `loader`
+        (by default the one shared over this portfolio's caches) before the pipeline
+        runs; pass one to tune its concurrency, timeouts and retries.
+
+        `return_store` already reads from its own market data cache, so
+        `market_data`, when also given, must be that same cache.
+        """
+        if return_store is not None and market_data is not None and return_store.market_data is not market_data:
+            raise ValueError("return_store reads from a different market_data cache than the one given.")
         self.positions = positions
+        # Portfolios over the same market data share one store of monthly returns
+        self.return_store = return_store if return_store is not None else default_monthly_return_store(market_data)
+        self.market_data = self.return_store.market_data
+        self.inflation_store = inflation_store if inflation_store is not None else default_inflation_store()
+        self.external_data = external_data if external_data is not None else default_external_registry()
+        self.loader = loader if loader is not None else default_async_loader(
+            self.market_data, self.inflation_store, self.external_data
+        )
 
         total_allocation = sum(position.allocation for position in self.positions)
         if (total_allocation > 1 + 1e-6) | (total_allocation < 1 - 1e-6):
             raise RuntimeError(f"Allocations must sum to 1.0. Got {total_allocation}")
 
-        self._fetch_data()               # Fetch data
-        self._build_portfolio()          # Construct portfolio weighted average
+        self._data: pd.DataFrame | None = None
+        self._load_lock = threading.Lock()
+        if not lazy:
+            self.load()
+
+
+    @property
+    def data(self) -> pd.DataFrame:
+        if self._data is None:
+            self.load()
+        return self._data
+
+    @data.setter
+    def data(self, value: pd.DataFrame) -> None:
+        self._data = value
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._data is not None
+
+
+    def load(self) -> "Portfolio":
+        """
+        Run the data pipeline unless it already ran. Safe to call from several
+        threads: the pipeline builds a local frame, published only once
+        complete, so `data` never exposes a partial one.
+        """
+        with self._load_lock:
+            if self._data is None:
+                self._warm_sources()                         # Fetch missing sources concurrently
+                data = self._fetch_data()                    # Fetch data
+                self._data = self._build_portfolio(data)     # Construct portfolio weighted average
+        return self
+
+
+    async def aload(self) -> "Portfolio":
+        """Awaitable load; sources are fetched on the running loop, the pipeline on a worker thread."""
+        if not self.is_loaded:
+            await self._awarm_sources()
+        return await asyncio.to_thread(self.load)
+
+
+    @staticmethod
+    async def prefetch(portfolios: list["Portfolio"]) -> list["Portfolio"]:
+        """
+        Load many (lazy) portfolios concurrently. Every source any of them
+        needs is fetched at once (per loader), then the monthly returns of
+        every position are requested from each shared return store in a single
+        batch, so common tickers are fetched and transformed once; the
+        remaining per-portfolio steps then run in parallel threads.
+        """
+        pending = [portfolio for portfolio in portfolios if not portfolio.is_loaded]
+
+        by_loader: dict[AsyncDataLoader, list[Portfolio]] = {}
+        for portfolio in pending:
+            by_loader.setdefault(portfolio.loader, []).append(portfolio)
+        await asyncio.gather(*(
+            group[0]._awarm_sources(
+                tickers=[t for portfolio in group for t in portfolio._missing_tickers],
+                columns=[c for portfolio in group for c in portfolio.tickers]
+            )
+            for group in by_loader.values()
+        ))
+
+        keys_by_store: dict[MonthlyReturnStore, list] = {}
+        for portfolio in pending:
+            keys_by_store.setdefault(portfolio.return_store, []).extend(portfolio._position_keys)
+        await asyncio.gather(*(asyncio.to_thread(store.get, keys) for store, keys in keys_by_store.items()))
+
+        await asyncio.gather(*(portfolio.aload() for portfolio in pending))
+        return portfolios
 
 
     @property
@@ -40,150 +295,294 @@ class Portfolio(BaseSimulationModel, PortfolioAnalytics):
 
     @property
     def chained_tickers(self):
-        # Unpack tickers
-        chained_tickers = {}
-        for ticker in self.tickers:
-            for cts in self.COMPLEX_TICKER_STRUCTURES:
-
-                # Clean up the string by replacing the indicators to make splitting uniform
-                normalized_string = ticker.replace(cts, "?")
-                ticker_chain = normalized_string.split("?") # Split by the '?' indicator
-                chained_tickers[ticker] = ticker_chain
-
-        return chained_tickers
-
-
-    def _fetch_data(self):
-        unpacked_chained_tickers = [t for ct in self.chained_tickers.values() for t in ct]
-        # Data is extracted at daily frequency in order to apply leverage properly.
-        # Leverage ETFs reset leverage daily
-        df = (
-            yf.download(unpacked_chained_tickers, period = "max", interval = "1d")
-            .pipe(self._process_returns)
-            .pipe(self._apply_leverage_factor) # Apply leverage
-        )
+        return {ticker: split_ticker_chain(ticker, self.COMPLEX_TICKER_STRUCTURES) for ticker in self.tickers}
 
 
-        df_monthly = (1 + df).resample("ME").prod(min_count=1) - 1
-        self.data = df_monthly
+    @property
+    def _position_keys(self) -> list[tuple[str, float, float]]:
+        return [(position.ticker, position.leverage, position.expense_ratio) for position in self.positions]
 
-        self._apply_external_padding()   # Pad historical returns from local parquet files
-        self._fetch_inflation_data()     # Fetches inflation from ECB's ReST API
-        
 
+    @property
+    def _position_columns(self) -> list[str]:
+        """
+        Column of each position in `data`: its ticker, or, when the same ticker
+        is held with different leverage or expense ratio, the ticker tagged
+        with both (e.g. "SPY x2 er0.006"). Identical positions share a column.
+        """
+        variants: dict[str, set] = {}
+        for ticker, leverage, expense_ratio in self._position_keys:
+            variants.setdefault(ticker, set()).add((leverage, expense_ratio))
+        return [
+            ticker if len(variants[ticker]) == 1 else f"{ticker} x{leverage:g} er{expense_ratio:g}"
+            for ticker, leverage, expense_ratio in self._position_keys
+        ]
 
-    def _process_returns(self, df: pd.DataFrame) -> pd.DataFrame:
-        df_returns =  (
-            df["Close"]
-            .pct_change(1)
-        )
 
-        for ticker, ct in self.chained_tickers.items():
-            if len(ct) > 1: # is complex ticker
+    @property
+    def _missing_tickers(self) -> list[str]:
+        # Constituents of the positions whose monthly returns are not memoized yet
+        return [
+            ticker
+            for key in self._position_keys if key not in self.return_store
+            for ticker in split_ticker_chain(key[0], self.COMPLEX_TICKER_STRUCTURES)
+        ]
 
-                data_objects = [df_returns[t] for t in ct]
-                padded_df = reduce(lambda left, right: left.fillna(right), data_objects)
 
-                df_returns[ticker] = padded_df
-                df_returns = df_returns.drop(columns = [t for t in ct])
+    def _warm_sources(self):
+        # Cold start: fetch prices, HICP and the external series concurrently so
+        # the pipeline below only reads local caches. Warm starts skip the loader.
+        tickers = self._missing_tickers
+        if self.loader.needs_network(tickers):
+            self.loader.load_sync(tickers, self.tickers + ["INFLATION"])
 
-        return df_returns
 
+    async def _awarm_sources(self, tickers: list[str] | None = None, columns: list[str] | None = None):
+        tickers = self._missing_tickers if tickers is None else tickers
+        if self.loader.needs_network(tickers):
+            await self.loader.load(tickers, (self.tickers if columns is None else columns) + ["INFLATION"])
 
 
-    def _apply_leverage_factor(self, df: pd.DataFrame) -> pd.DataFrame:
-        SW = 1.1
-        FFR = 0.03
+    def _fetch_data(self) -> pd.DataFrame:
+        # Monthly returns per (ticker, leverage, expense_ratio) come from the shared
+        # store, which compounds them from daily data (leverage ETFs reset daily)
+        monthly_returns = self.return_store.get(self._position_keys)
+        self.external_data.refresh()                 # pick up rewritten parquet files once per load
 
-        for position in self.positions:
-            ticker = position.ticker
-            leverage_factor = position.leverage
-            expense_ratio = position.expense_ratio
+        data = pd.DataFrame({
+            column: monthly_returns[key] for column, key in zip(self._position_columns, self._position_keys)
+        })
+        first, last = data.index[0], data.index[-1]
+        if len(data) != (last.year - first.year) * 12 + last.month - first.month + 1:
+            data = data.reindex(pd.date_range(first, last, freq="ME"))     # disjoint histories
 
-            E = 0.005 * (leverage_factor - 1)
-            SP = np.sign(leverage_factor) * 0.004
+        data = self._apply_external_padding(data)    # Pad historical returns from local parquet files
+        return self._fetch_inflation_data(data)      # ECB inflation from the local store (refreshed from the ReST API)
 
-            cost_of_leverage = SW * (leverage_factor - 1) * (FFR + SP) + E
-            df[ticker] = df[ticker] * leverage_factor - ((cost_of_leverage + expense_ratio) / 365)
 
-        return df
+    def _fetch_inflation_data(self, data: pd.DataFrame) -> pd.DataFrame:
+        # --- ECB (recent, ~1997+), served from the local inflation store ----
+        monthly_inflation = self.inflation_store.monthly_inflation()
+        if monthly_inflation.empty:
+            warnings.warn(
+                "No ECB HICP data available; months without historical inflation use "
+                "the simulations' inflation_rate_fallback."
+            )
 
+        # --- Local parquet backfill (historical, e.g. pre-1997) -----------
+        historical_inflation = self.external_data.get("INFLATION")
+        if historical_inflation is not None:
+            # ECB wins where it has data; parquet fills historical gaps
+            monthly_inflation = monthly_inflation.combine_first(historical_inflation)
 
-    def _fetch_inflation_data(self):
-        # --- ECB (recent, ~1997+) -----------------------------------------
-        url = (
-            "https://data-api.ecb.europa.eu/service/data/"
-            "ICP/M.PT.N.000000.4.ANR?format=jsondata"
-        )
+        # --- Align to data index ------------------------------------------
+        aligned = monthly_inflation.reindex(data.index).ffill()
+        if aligned.notna().any():
+            data["INFLATION"] = aligned
+        return data
 
-        resp  = requests.get(url, timeout=15)
-        resp.raise_for_status()
-        data  = resp.json()
 
-        observations = data["dataSets"][0]["series"]["0:0:0:0:0:0"]["observations"]
-        dates_raw    = data["structure"]["dimensions"]["observation"][0]["values"]
+    def _apply_external_padding(self, data: pd.DataFrame) -> pd.DataFrame:
 
-        dates  = pd.to_datetime([d["id"] for d in dates_raw], format="%Y-%m") + pd.offsets.MonthEnd(0)
-        values = [observations[str(i)][0] for i in range(len(dates))]
+        for column, ticker in dict(zip(self._position_columns, self.tickers)).items():
+            ext_series = self.external_data.get(ticker)
+            if ext_series is None:
+                continue
 
-        hicp = pd.Series(values, index=dates, dtype=float)
-        # ECB reports annual % change -> convert to equivalent monthly rate
-        monthly_inflation = (1 + hicp / 100) ** (1 / 12) - 1
+            # Extend data to cover the historical date range in the parquet file
+            combined_index = data.index.union(ext_series.index)
+            data = data.reindex(combined_index)
 
-        # --- Local parquet backfill (historical, e.g. pre-1997) -----------
-        external_dir = Path(__file__).resolve().parent.parent.parent / "data" / "external"
-        if external_dir.exists():
-            for parquet_path in external_dir.glob("*.parquet"):
-                ext_df = pd.read_parquet(parquet_path)
-                if "INFLATION" not in ext_df.columns:
-                    continue
-                ext_df.index = ext_df.index + pd.offsets.MonthEnd(0)
-                # ECB wins where it has data; parquet fills historical gaps
-                monthly_inflation = monthly_inflation.combine_first(ext_df["INFLATION"])
-                break  # first matching file wins
-
-        # --- Align to self.data index -------------------------------------
-        aligned = monthly_inflation.reindex(self.data.index).ffill()
-        if aligned.notna().any():
-            self.data["INFLATION"] = aligned
+            # yfinance data takes priority; parquet fills in historical gaps
+            data[column] = data[column].fillna(
+                ext_series.reindex(combined_index)
+            )
+        return data
 
 
-    def _apply_external_padding(self):
+    def _build_portfolio(self, data: pd.DataFrame) -> pd.DataFrame:
+        allocations = [position.allocation for position in self.positions]
+        data["PRTF"] = data[self._position_columns].dot(allocations)
+        return data.dropna(subset=["PRTF"])
 
-        external_dir = Path(__file__).resolve().parent.parent.parent / "data" / "external"
-        if not external_dir.exists():
-            return
 
-        portfolio_tickers = set(self.tickers)
+    @property
+    def data_hash(self) -> str:
+        """SHA-256 of the monthly portfolio/inflation history simulations sample from."""
+        columns = [c for c in ("PRTF", "INFLATION") if c in self.data.columns]
+        hashed = pd.util.hash_pandas_object(self.data[columns], index=True)
+        return hashlib.sha256(hashed.to_numpy().tobytes()).hexdigest()
 
-        for parquet_path in external_dir.glob("*.parquet"):
-            ext_df = pd.read_parquet(parquet_path)
 
-            if not isinstance(ext_df.index, pd.DatetimeIndex):
-                continue
+    def _run_metadata(self, method: str, seed: int, parameters: dict) -> dict:
+        """
+        Metadata stored alongside simulation results (see BaseSimulationResults.save):
+        the method, its seed, the parameters that determine the results (as
+        JSON-friendly values) and the hash of the source data.
+        """
+        return {
+            "method":     method,
+            "seed":       seed,
+            "parameters": parameters,
+            "positions":  [asdict(position) for position in self.positions],
+            "data_hash":  self.data_hash,
+            "data_range": [str(self.data.index[0].date()), str(self.data.index[-1].date())],
+        }
 
-            # Normalize index to month-end to align with self.data
-            ext_df.index = ext_df.index + pd.offsets.MonthEnd(0)
 
-            matching_tickers = portfolio_tickers & set(ext_df.columns)
-            if not matching_tickers:
-                continue
+    def _path_sources(self, inflation_rate_fallback: float) -> dict[str, np.ndarray | float]:
+        """
+        Historical series that bootstrapped paths are gathered from. When no
+        empirical inflation is available the fallback monthly rate is returned as
+        a scalar; months that predate the inflation history use it too.
+        """
+        has_empirical_inflation = (
+            "INFLATION" in self.data.columns and self.data["INFLATION"].notna().any()
+        )
 
-            # Extend self.data to cover the historical date range in the parquet file
-            combined_index = self.data.index.union(ext_df.index)
-            self.data = self.data.reindex(combined_index)
+        if has_empirical_inflation:
+            inf_seq = self.data["INFLATION"].to_numpy(dtype=float)
+            inflation_source = np.where(np.isnan(inf_seq), inflation_rate_fallback / 12, inf_seq)
+        else:
+            inflation_source = inflation_rate_fallback / 12
 
-            for ticker in matching_tickers:
-                # yfinance data takes priority; parquet fills in historical gaps
-                self.data[ticker] = self.data[ticker].fillna(
-                    ext_df[ticker].reindex(combined_index)
-                )
+        return {
+            "sampled_returns":   self.data["PRTF"].to_numpy(dtype=float),
+            "sampled_inflation": inflation_source,
+        }
 
 
-    def _build_portfolio(self):
-        allocations = [position.allocation for position in self.positions]
-        self.data["PRTF"] = self.data[self.tickers].dot(allocations)
-        self.data = self.data.dropna(subset=["PRTF"])
+    def _bootstrap_paths(
+        self,
+        sequence_length: int,
+        num_simulations: int,
+        bootstrap_min_block_len: int,
+        bootstrap_max_block_len: int,
+        inflation_rate_fallback: float,
+        seed: int | np.random.SeedSequence,
+        path_offset: int = 0
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Jointly bootstrap (num_simulations, sequence_length) matrices of monthly
+        portfolio returns and inflation, for paths starting at `path_offset`.
+        """
+        indices = _bootstrap_indices(
+            len(self.data),
+            sequence_length=sequence_length,
+            path_start=path_offset,
+            num_paths=num_simulations,
+            bootstrap_min_block_len=bootstrap_min_block_len,
+            bootstrap_max_block_len=bootstrap_max_block_len,
+            seed=seed
+        )
+        sources = self._path_sources(inflation_rate_fallback)
+        return (
+            CompactSimulationOutput.gather(sources["sampled_returns"], indices),
+            CompactSimulationOutput.gather(sources["sampled_inflation"], indices),
+        )
+
+
+    def _simulate_paths(
+        self,
+        sources: dict[str, np.ndarray | float],
+        num_simulations: int,
+        bootstrap: dict,
+        path_function,
+        path_kwargs: dict,
+        output_layout: dict[str, tuple[tuple[int, ...], np.dtype]],
+        n_workers: int = 1,
+        chunk_size: int | None = None,
+        keep_indices: bool = True,
+        task_size: int | None = None
+    ) -> tuple[np.ndarray | None, dict[str, np.ndarray]]:
+        """
+        Bootstrap `num_simulations` paths and apply `path_function` to them,
+        either in-process or split into contiguous path chunks over a pool of
+        `n_workers` processes (-1 → all cores).
+
+        `output_layout` maps each output of `path_function` (and the sampled
+        paths, when listed) to its per-path shape and dtype. Paths are
+        bootstrapped and processed `chunk_size` at a time (None → all at once),
+        so besides the outputs in the layout only the bootstrap index matrix
+        (when `keep_indices`, else None is returned) scales with
+        `num_simulations`.
+
+        Workers receive the historical series and the output buffers once, as
+        shared memory, through the pool initializer; each task carries only its
+        path range (`task_size` paths, None → about four tasks per worker) and
+        writes its rows in place, `chunk_size` paths at a time (None → the
+        whole task). The outputs are handed back from shared memory without a
+        copy (see SharedArray.detach). Since draws are keyed by path index, the
+        result is identical for any number of workers, task or chunk size.
+
+        Workers are started with the "forkserver" method, so scripts using
+        n_workers > 1 need the usual `if __name__ == "__main__":` guard.
+        """
+        if n_workers == -1:
+            n_workers = cpu_count()
+        if chunk_size is not None and chunk_size < 1:
+            raise ValueError(f"chunk_size must be a positive number of paths. Got {chunk_size}.")
+        if task_size is not None and task_size < 1:
+            raise ValueError(f"task_size must be a positive number of paths. Got {task_size}.")
+        sequence_length = bootstrap["sequence_length"]
+
+        if n_workers <= 1:
+            if chunk_size is None or chunk_size >= num_simulations:
+                indices, outputs = _simulate_path_range(
+                    sources, 0, num_simulations, bootstrap, path_function, path_kwargs,
+                    keep_paths="sampled_returns" in output_layout
+                )
+                return (indices if keep_indices else None), outputs
+
+            out = {key: np.empty((num_simulations, *path_shape), dtype) for key, (path_shape, dtype) in output_layout.items()}
+            if keep_indices:
+                out["indices"] = np.empty((num_simulations, sequence_length), np.intp)
+            _fill_path_range(sources, 0, out, bootstrap, path_function, path_kwargs, chunk_size)
+            return out.pop("indices", None), out
+
+        if task_size is None:
+            task_size = max(-(-num_simulations // (4 * n_workers)), 1)  # ~4 tasks per worker
+        history_length = len(sources["sampled_returns"])
+
+        with ExitStack() as stack:
+            def share(key: str, shared_array: SharedArray) -> None:
+                shared[key] = stack.enter_context(shared_array)
+
+            shared: dict[str, SharedArray] = {}
+            share("source__sampled_returns", SharedArray.from_array(sources["sampled_returns"]))
+            share("source__sampled_inflation", SharedArray.from_array(
+                np.broadcast_to(sources["sampled_inflation"], (history_length,))
+            ))
+            if keep_indices:
+                share("indices", SharedArray.create((num_simulations, sequence_length), np.intp))
+            for key, (path_shape, dtype) in output_layout.items():
+                share(key, SharedArray.create((num_simulations, *path_shape), dtype))
+
+            tasks = [
+                (start, min(start + task_size, num_simulations), bootstrap, path_function, path_kwargs,
+                 chunk_size or task_size)
+                for start in range(0, num_simulations, task_size)
+            ]
+            specs = {key: shared_array.spec for key, shared_array in shared.items()}
+            # forkserver: workers must not inherit the thread pools of a numba
+            # engine that already ran in this process (fork is not thread-safe)
+            pool = get_context("forkserver").Pool(
+                processes=n_workers, initializer=_init_path_worker, initargs=(specs,)
+            )
+            try:
+                for _ in pool.imap_unordered(_run_path_chunk, tasks):
+                    pass
+                pool.close()
+            except BaseException:
+                pool.terminate()
+                raise
+            finally:
+                pool.join()
+
+            indices = shared["indices"].detach() if keep_indices else None
+            outputs = {key: shared[key].detach() for key in output_layout}
+
+        return indices, outputs
 
 
     def simulate_withdrawal_failure_rate(
@@ -198,81 +597,359 @@ class Portfolio(BaseSimulationModel, PortfolioAnalytics):
         bootstrap_max_block_len: int = 36,
         num_simulations: int = 1000,
         inflation_rate_fallback: float = 0.03,
-        seed: int = 0
+        seed: int = 0,
+        engine: str = "numpy",
+        compact: bool = False,
+        value_dtype: np.dtype = np.float64,
+        n_workers: int = 1,
+        chunk_size: int | None = None,
+        task_size: int | None = None
     ):
+        """
+        Monte Carlo simulation of a withdrawal plan over bootstrapped return and
+        inflation paths.
+
+        `engine` selects the path recursion backend (see
+        pytrade.simulation.withdrawal): "numpy" steps all paths together over
+        (N,) arrays, "numba" runs the compiled recursion in parallel across
+        cores, and "python" is the per-path reference loop. All engines consume
+        the same bootstrapped paths, so they return identical outputs for a
+        given seed.
+
+        `compact=True` returns a CompactSimulationOutput that keeps only the
+        bootstrap index matrix in place of `sampled_returns` and
+        `sampled_inflation` (gathered on access). `value_dtype` sets the storage
+        type of `portfolio_value` and `withdrawals`, e.g. np.float32.
+
+        `chunk_size` bootstraps and simulates the paths that many at a time,
+        bounding the temporaries of the recursion. `n_workers > 1` (-1 → all
+        cores) splits the paths over a process pool in tasks of `task_size`
+        paths (see _simulate_paths); the outputs are identical to a
+        single-process run. Prefer engine="numpy"
+        then, as the numba engine already uses every core on its own.
+        """
+        metadata = self._run_metadata("simulate_withdrawal_failure_rate", seed, dict(
+            starting_portfolio=starting_portfolio,
+            anual_withdrawal_rate=anual_withdrawal_rate,
+            minimum_monthly_withdrawal_amount=minimum_monthly_withdrawal_amount,
+            maximum_monthly_withdrawal_amount=maximum_monthly_withdrawal_amount,
+            horizon_years=horizon_years,
+            drawdown_deferral=drawdown_deferral,
+            bootstrap_min_block_len=bootstrap_min_block_len,
+            bootstrap_max_block_len=bootstrap_max_block_len,
+            num_simulations=num_simulations,
+            inflation_rate_fallback=inflation_rate_fallback,
+            engine=engine,
+            compact=compact,
+            value_dtype=np.dtype(value_dtype).name,
+        ))
+        sequence_length = horizon_years * 12
+        sources = self._path_sources(inflation_rate_fallback)
 
-        has_empirical_inflation = (
-            "INFLATION" in self.data.columns and self.data["INFLATION"].notna().any()
+        output_layout = {
+            "portfolio_value": ((sequence_length,), value_dtype),
+            "withdrawals":     ((sequence_length,), value_dtype),
+        }
+        if not compact:
+            output_layout["sampled_returns"]   = ((sequence_length,), np.float64)
+            output_layout["sampled_inflation"] = ((sequence_length,), np.float64)
+
+        indices, outputs = self._simulate_paths(
+            sources,
+            num_simulations=num_simulations,
+            bootstrap=dict(
+                sequence_length=sequence_length,
+                bootstrap_min_block_len=bootstrap_min_block_len,
+                bootstrap_max_block_len=bootstrap_max_block_len,
+                seed=as_seed_sequence(seed)
+            ),
+            path_function=_withdrawal_paths,
+            path_kwargs=dict(
+                value_dtype=value_dtype,
+                starting_portfolio=starting_portfolio,
+                anual_withdrawal_rate=anual_withdrawal_rate,
+                minimum_monthly_withdrawal_amount=minimum_monthly_withdrawal_amount,
+                maximum_monthly_withdrawal_amount=maximum_monthly_withdrawal_amount,
+                drawdown_deferral=drawdown_deferral,
+                engine=engine
+            ),
+            output_layout=output_layout,
+            n_workers=n_workers,
+            chunk_size=chunk_size,
+            keep_indices=compact,
+            task_size=task_size
         )
 
-        sequence_length = horizon_years * 12
-        outputs = {
-            "portfolio_value": np.full(shape = (num_simulations, sequence_length), fill_value = np.nan),
-            "sampled_returns": np.full(shape = (num_simulations, sequence_length), fill_value = np.nan),
-            "sampled_inflation": np.full(shape = (num_simulations, sequence_length), fill_value = np.nan),
-            "withdrawals": np.full(shape = (num_simulations, sequence_length), fill_value = np.nan),
-        }
+        if compact:
+            outputs = CompactSimulationOutput(arrays=outputs, indices=indices, sources=sources)
+        return BaseSimulationResults(simulation_output=outputs, metadata=metadata)
 
 
-        np.random.seed(seed)
-        block_lens = np.random.randint(
-            low = bootstrap_min_block_len,
-            high = bootstrap_max_block_len,
-            size = num_simulations
+    def simulate_withdrawal_summary(
+        self,
+        starting_portfolio: float = 10000,
+        anual_withdrawal_rate: float = 0.04,
+        minimum_monthly_withdrawal_amount: float = 1000,
+        maximum_monthly_withdrawal_amount: float = 2000,
+        horizon_years: int = 30,
+        drawdown_deferral: int = 0,
+        bootstrap_min_block_len: int = 1,
+        bootstrap_max_block_len: int = 36,
+        num_simulations: int = 1_000_000,
+        inflation_rate_fallback: float = 0.03,
+        seed: int = 0,
+        engine: str = "numpy",
+        chunk_size: int = 10_000,
+        num_bins: int = 1000
+    ) -> BaseSimulationResults:
+        """
+        Streaming counterpart of simulate_withdrawal_failure_rate for very large runs.
+
+        Paths are simulated `chunk_size` at a time and folded into online
+        accumulators (see pytrade.simulation.streaming), so memory does not grow
+        with `num_simulations`. The results hold per-month failure rates and
+        means, plus fixed-bin histograms of portfolio values and withdrawals from
+        which generate_simulation_report derives approximate quantiles and the
+        terminal value distribution.
+
+        Paths are keyed by their index within the run (see
+        pytrade.simulation.seeding), so `chunk_size` does not change which paths
+        are simulated: counts and histograms are identical for any chunk size and
+        means agree up to floating-point summation order.
+
+        Histogram bins are log-spaced: portfolio values over starting_portfolio
+        × [1e-4, 1e4], withdrawals over [1e-3 × minimum, 1e3 × maximum] amount.
+        """
+        metadata = self._run_metadata("simulate_withdrawal_summary", seed, dict(
+            starting_portfolio=starting_portfolio,
+            anual_withdrawal_rate=anual_withdrawal_rate,
+            minimum_monthly_withdrawal_amount=minimum_monthly_withdrawal_amount,
+            maximum_monthly_withdrawal_amount=maximum_monthly_withdrawal_amount,
+            horizon_years=horizon_years,
+            drawdown_deferral=drawdown_deferral,
+            bootstrap_min_block_len=bootstrap_min_block_len,
+            bootstrap_max_block_len=bootstrap_max_block_len,
+            num_simulations=num_simulations,
+            inflation_rate_fallback=inflation_rate_fallback,
+            engine=engine,
+            num_bins=num_bins,
+        ))
+        sequence_length = horizon_years * 12
+        summary = StreamingWithdrawalSummary(
+            sequence_length,
+            value_edges=np.geomspace(starting_portfolio * 1e-4, starting_portfolio * 1e4, num_bins + 1),
+            withdrawal_edges=np.geomspace(
+                max(minimum_monthly_withdrawal_amount, 1e-2) * 1e-3,
+                max(maximum_monthly_withdrawal_amount, 1e-2) * 1e3,
+                num_bins + 1
+            )
         )
 
-        for i in range(num_simulations):
-            b = block_lens[i]
-            if has_empirical_inflation:
-                bootstrapped_returns, bootstrapped_inflation = self.block_resample_joint(
-                    sequences=[self.data["PRTF"].values, self.data["INFLATION"].values],
-                    block_length=b,
-                    resample_sequence_length=sequence_length,
-                    seed=seed + i
-                )
-            else:
-                bootstrapped_returns = self.block_bootstrap_returns(
-                    original_sequence=self.data["PRTF"].values,
-                    block_length=b,
-                    resample_sequence_length=sequence_length,
-                    seed=seed + i
-                )
-                bootstrapped_inflation = np.full(sequence_length, inflation_rate_fallback / 12)
-
-
-            current_portfolio = starting_portfolio
-            outputs["sampled_returns"][i,:] = bootstrapped_returns
-            outputs["sampled_inflation"][i,:] = bootstrapped_inflation
-
-            mimwa_ = minimum_monthly_withdrawal_amount
-            mamwa_ = maximum_monthly_withdrawal_amount
-            for t in range(sequence_length):
-                r = bootstrapped_returns[t]
-                current_portfolio *= (1 + r)
-
-                monthly_withdrawal_amount = (
-                    min(
-                        min(
-                            max(mimwa_, anual_withdrawal_rate / 12 * current_portfolio),
-                            mamwa_
-                        ),
-                        current_portfolio
-                    )
-                    if t >= drawdown_deferral else 0
-                )
+        seed = as_seed_sequence(seed)
+        for start in range(0, num_simulations, chunk_size):
+            sampled_returns, sampled_inflation = self._bootstrap_paths(
+                sequence_length=sequence_length,
+                num_simulations=min(chunk_size, num_simulations - start),
+                bootstrap_min_block_len=bootstrap_min_block_len,
+                bootstrap_max_block_len=bootstrap_max_block_len,
+                inflation_rate_fallback=inflation_rate_fallback,
+                seed=seed,
+                path_offset=start
+            )
+            portfolio_value, withdrawals = simulate_withdrawals(
+                sampled_returns,
+                sampled_inflation,
+                starting_portfolio=starting_portfolio,
+                anual_withdrawal_rate=anual_withdrawal_rate,
+                minimum_monthly_withdrawal_amount=minimum_monthly_withdrawal_amount,
+                maximum_monthly_withdrawal_amount=maximum_monthly_withdrawal_amount,
+                drawdown_deferral=drawdown_deferral,
+                engine=engine
+            )
+            summary.update(portfolio_value, withdrawals)
+
+        return BaseSimulationResults(simulation_output=summary.to_output(), metadata=metadata)
+
+
+    def sweep_withdrawal_policies(
+        self,
+        policies: dict[str, list] | pd.DataFrame | list[dict],
+        starting_portfolio: float = 10000,
+        horizon_years: int = 30,
+        bootstrap_min_block_len: int = 1,
+        bootstrap_max_block_len: int = 36,
+        num_simulations: int = 1000,
+        inflation_rate_fallback: float = 0.03,
+        seed: int = 0,
+        quantiles: tuple[float, ...] = (0.05, 0.25, 0.5, 0.75, 0.95)
+    ) -> pd.DataFrame:
+        """
+        Evaluate many withdrawal policies against one set of bootstrapped paths.
 
-                outputs["withdrawals"][i,t] = monthly_withdrawal_amount
-                current_portfolio -= monthly_withdrawal_amount
-                current_portfolio = max(0, current_portfolio)
+        `policies` is either a grid (dict of parameter → values, expanded to the
+        cartesian product) or explicit rows (DataFrame or list of dicts). Policy
+        parameters are those of simulate_withdrawal_failure_rate listed in
+        WITHDRAWAL_POLICY_DEFAULTS; omitted ones take its defaults.
 
-                outputs["portfolio_value"][i,t] = current_portfolio
+        Paths are bootstrapped once, exactly as simulate_withdrawal_failure_rate
+        would for the same seed, and all policies are stepped together (see
+        simulate_withdrawal_policies). Sharing the paths makes differences
+        between policies free of resampling noise.
+
+        Returns one row per policy: its parameters, the failure rate (share of
+        depleted paths at the horizon), the mean total amount withdrawn and
+        terminal portfolio value quantiles (`terminal_value_q05`, ...).
+        """
+        if isinstance(policies, dict):
+            grid = pd.DataFrame(list(itertools.product(*policies.values())), columns=list(policies))
+        else:
+            grid = pd.DataFrame(policies).reset_index(drop=True)
+
+        unknown = set(grid.columns) - set(WITHDRAWAL_POLICY_DEFAULTS)
+        if unknown:
+            raise ValueError(
+                f"Unknown policy parameters {sorted(unknown)}. Expected {list(WITHDRAWAL_POLICY_DEFAULTS)}."
+            )
+        grid = grid.assign(**{
+            key: grid[key] if key in grid.columns else default
+            for key, default in WITHDRAWAL_POLICY_DEFAULTS.items()
+        })[list(WITHDRAWAL_POLICY_DEFAULTS)]
+
+        sampled_returns, sampled_inflation = self._bootstrap_paths(
+            sequence_length=horizon_years * 12,
+            num_simulations=num_simulations,
+            bootstrap_min_block_len=bootstrap_min_block_len,
+            bootstrap_max_block_len=bootstrap_max_block_len,
+            inflation_rate_fallback=inflation_rate_fallback,
+            seed=seed
+        )
+        terminal_value, total_withdrawals = simulate_withdrawal_policies(
+            sampled_returns,
+            sampled_inflation,
+            starting_portfolio=starting_portfolio,
+            anual_withdrawal_rates=grid["anual_withdrawal_rate"].to_numpy(),
+            minimum_monthly_withdrawal_amounts=grid["minimum_monthly_withdrawal_amount"].to_numpy(),
+            maximum_monthly_withdrawal_amounts=grid["maximum_monthly_withdrawal_amount"].to_numpy(),
+            drawdown_deferrals=grid["drawdown_deferral"].to_numpy()
+        )
+
+        grid["failure_rate"] = (terminal_value <= 0).mean(axis=1)
+        grid["mean_total_withdrawals"] = total_withdrawals.mean(axis=1)
+        terminal_quantiles = np.quantile(terminal_value, quantiles, axis=1)
+        for q, values in zip(quantiles, terminal_quantiles):
+            grid[f"terminal_value_q{round(q * 100):02d}"] = values
+        return grid
 
-                # Adjust minimum_monthly_withdrawal_amount for inflation
-                mimwa_ *= (1 + bootstrapped_inflation[t])
-                mamwa_ *= (1 + bootstrapped_inflation[t])
 
+    def optimize_allocation(
+        self,
+        candidates: np.ndarray | None = None,
+        num_candidates: int = 1000,
+        objective: str = "failure_rate",
+        starting_portfolio: float = 10000,
+        anual_withdrawal_rate: float = 0.04,
+        minimum_monthly_withdrawal_amount: float = 1000,
+        maximum_monthly_withdrawal_amount: float = 2000,
+        drawdown_deferral: int = 0,
+        horizon_years: int = 30,
+        bootstrap_min_block_len: int = 1,
+        bootstrap_max_block_len: int = 36,
+        num_simulations: int = 1000,
+        inflation_rate_fallback: float = 0.03,
+        cvar_level: float = 0.05,
+        seed: int = 0,
+        candidate_chunk_size: int = 32
+    ) -> pd.DataFrame:
+        """
+        Score candidate allocations of this portfolio's positions on common
+        bootstrapped paths.
+
+        Joint bootstrap indices are drawn once over the monthly per-ticker
+        return matrix, giving (A, N, T) asset paths. Each batch of candidate
+        weight vectors is turned into portfolio paths with a single matmul
+        (monthly rebalancing, as in _build_portfolio) and scored on:
+
+        - failure_rate                     : share of paths depleted at the horizon
+                                             under the given withdrawal plan (lower is better).
+        - median_perpetual_withdrawal_rate : median w* (see estimate_perpetual_withdrawal_rate).
+        - cvar                             : mean real terminal value of 1 invested without
+                                             withdrawals over the worst `cvar_level` share
+                                             of paths (expected shortfall).
+
+        `candidates` is a (K, A) array of weights in the order of `tickers`, each
+        row summing to 1. By default the current allocation is scored together
+        with `num_candidates - 1` long-only allocations drawn uniformly from the
+        simplex. `candidate_chunk_size` bounds the (chunk, N, T) working set.
+
+        Returns one row per candidate (index = candidate number), with its
+        weights and the three scores, sorted best first by `objective` (ties
+        broken by the other scores).
+        """
+        if objective not in ALLOCATION_OBJECTIVES:
+            raise ValueError(f"Unknown objective '{objective}'. Expected one of {list(ALLOCATION_OBJECTIVES)}.")
+
+        num_assets = len(self.tickers)
+        if candidates is None:
+            current = np.array([position.allocation for position in self.positions], dtype=float)
+            sampled = np.random.default_rng(seed).dirichlet(np.ones(num_assets), size=max(num_candidates - 1, 0))
+            candidates = np.vstack([current, sampled])
+        candidates = np.atleast_2d(np.asarray(candidates, dtype=float))
+        if candidates.shape[1] != num_assets:
+            raise ValueError(f"Candidates must have one weight per position ({num_assets}). Got {candidates.shape[1]}")
+        total_allocation = candidates.sum(axis=1)
+        if (np.abs(total_allocation - 1) > 1e-6).any():
+            raise RuntimeError(f"Allocations must sum to 1.0. Got {total_allocation[np.abs(total_allocation - 1) > 1e-6]}")
 
-        return BaseSimulationResults(simulation_output = outputs)
+        sequence_length = horizon_years * 12
+        indices = _bootstrap_indices(
+            len(self.data),
+            sequence_length=sequence_length,
+            path_start=0,
+            num_paths=num_simulations,
+            bootstrap_min_block_len=bootstrap_min_block_len,
+            bootstrap_max_block_len=bootstrap_max_block_len,
+            seed=seed
+        )
+        asset_returns = self.data[self._position_columns].to_numpy(dtype=float)
+        asset_paths = asset_returns.T[:, indices].reshape(num_assets, -1)            # (A, N * T)
+        sampled_inflation = CompactSimulationOutput.gather(
+            self._path_sources(inflation_rate_fallback)["sampled_inflation"], indices
+        )
+        terminal_cpi = np.prod(1 + sampled_inflation, axis=1)
+        tail_size = max(int(np.ceil(cvar_level * num_simulations)), 1)
+
+        scores = {key: np.empty(len(candidates)) for key in ALLOCATION_OBJECTIVES}
+        for start in range(0, len(candidates), candidate_chunk_size):
+            weights = candidates[start:start + candidate_chunk_size]
+            rows = slice(start, start + len(weights))
+            sampled_returns = (weights @ asset_paths).reshape(len(weights), num_simulations, sequence_length)
+
+            terminal_value, _ = simulate_withdrawal_policies(
+                sampled_returns,
+                sampled_inflation,
+                starting_portfolio=starting_portfolio,
+                anual_withdrawal_rates=anual_withdrawal_rate,
+                minimum_monthly_withdrawal_amounts=minimum_monthly_withdrawal_amount,
+                maximum_monthly_withdrawal_amounts=maximum_monthly_withdrawal_amount,
+                drawdown_deferrals=drawdown_deferral
+            )
+            scores["failure_rate"][rows] = (terminal_value <= 0).mean(axis=1)
+
+            w_stars = solve_perpetual_withdrawal_rates(
+                sampled_returns.reshape(-1, sequence_length),
+                np.broadcast_to(sampled_inflation, sampled_returns.shape).reshape(-1, sequence_length)
+            )
+            scores["median_perpetual_withdrawal_rate"][rows] = np.median(
+                w_stars.reshape(len(weights), num_simulations), axis=1
+            )
+
+            real_growth = np.prod(1 + sampled_returns, axis=2) / terminal_cpi
+            worst = np.partition(real_growth, tail_size - 1, axis=1)[:, :tail_size]
+            scores["cvar"][rows] = worst.mean(axis=1)
+
+        table = pd.DataFrame(candidates, columns=self._position_columns).assign(**scores)
+        ranking = [objective] + [key for key in ALLOCATION_OBJECTIVES if key != objective]   # ties → other scores
+        return table.sort_values(ranking, ascending=[ALLOCATION_OBJECTIVES[key] for key in ranking], kind="stable")
 
 
     def estimate_perpetual_withdrawal_rate(
@@ -282,7 +959,12 @@ class Portfolio(BaseSimulationModel, PortfolioAnalytics):
         bootstrap_min_block_len: int = 1,
         bootstrap_max_block_len: int = 36,
         inflation_rate_fallback: float = 0.03,
-        seed: int = 0
+        seed: int = 0,
+        chunk_size: int | None = None,
+        compact: bool = False,
+        n_workers: int = 1,
+        keep_paths: bool = True,
+        task_size: int | None = None
     ) -> BaseSimulationResults:
         """
         For each bootstrapped path, solve analytically for the annual withdrawal rate w*
@@ -291,56 +973,50 @@ class Portfolio(BaseSimulationModel, PortfolioAnalytics):
 
         Returns a distribution of w* across simulations. Negative values indicate paths
         where returns were so poor that real value could not be preserved even at w=0.
-        """
-        has_empirical_inflation = (
-            "INFLATION" in self.data.columns and self.data["INFLATION"].notna().any()
-        )
-
-        T = horizon_years * 12
-        prtf_seq = self.data["PRTF"].values
-        inf_seq  = self.data["INFLATION"].values if has_empirical_inflation else None
-
-        w_stars     = np.empty(num_simulations)
-        ret_store   = np.empty((num_simulations, T))
-        inf_store   = np.empty((num_simulations, T))
 
-        np.random.seed(seed)
-        block_lens = np.random.randint(
-            low=bootstrap_min_block_len,
-            high=bootstrap_max_block_len,
-            size=num_simulations
+        w* is solved in closed form (see solve_perpetual_withdrawal_rates).
+        `chunk_size` bootstraps and solves the paths that many at a time, and
+        `n_workers > 1` (-1 → all cores) spreads them over a process pool in
+        tasks of `task_size` paths (see _simulate_paths). `compact=True` stores the sampled paths as a bootstrap
+        index matrix (see CompactSimulationOutput); `keep_paths=False` drops
+        them altogether, so with a `chunk_size` only w* (plus the index matrix
+        when compact) grows with `num_simulations`.
+        """
+        metadata = self._run_metadata("estimate_perpetual_withdrawal_rate", seed, dict(
+            horizon_years=horizon_years,
+            num_simulations=num_simulations,
+            bootstrap_min_block_len=bootstrap_min_block_len,
+            bootstrap_max_block_len=bootstrap_max_block_len,
+            inflation_rate_fallback=inflation_rate_fallback,
+            compact=compact,
+            keep_paths=keep_paths,
+        ))
+        sequence_length = horizon_years * 12
+        sources = self._path_sources(inflation_rate_fallback)
+
+        output_layout = {"perpetual_withdrawal_rates": ((), np.float64)}
+        if keep_paths and not compact:
+            output_layout["sampled_returns"]   = ((sequence_length,), np.float64)
+            output_layout["sampled_inflation"] = ((sequence_length,), np.float64)
+
+        indices, outputs = self._simulate_paths(
+            sources,
+            num_simulations=num_simulations,
+            bootstrap=dict(
+                sequence_length=sequence_length,
+                bootstrap_min_block_len=bootstrap_min_block_len,
+                bootstrap_max_block_len=bootstrap_max_block_len,
+                seed=as_seed_sequence(seed)
+            ),
+            path_function=_perpetual_paths,
+            path_kwargs={},
+            output_layout=output_layout,
+            n_workers=n_workers,
+            chunk_size=chunk_size,
+            keep_indices=compact,
+            task_size=task_size
         )
 
-        for i in range(num_simulations):
-            b = block_lens[i]
-            if has_empirical_inflation:
-                r, inf = self.block_resample_joint(
-                    sequences=[prtf_seq, inf_seq],
-                    block_length=b,
-                    resample_sequence_length=T,
-                    seed=seed + i
-                )
-            else:
-                r   = self.block_bootstrap_returns(prtf_seq, block_length=b,
-                                                   resample_sequence_length=T, seed=seed + i)
-                inf = np.full(T, inflation_rate_fallback / 12)
-
-            # CPI_{t-1} for each withdrawal month t=1..T  →  [1, 1+inf[0], ...]
-            cpi_mult = np.concatenate([[1.0], np.cumprod(1 + inf[:-1])])
-
-            # Suffix growth: suffix_g[k] = prod(1+r[j] for j=k..T-1), suffix_g[T] = 1
-            suffix_g = np.concatenate([np.cumprod((1 + r)[::-1])[::-1], [1.0]])
-
-            total_growth = suffix_g[0]        # A
-            terminal_cpi = np.prod(1 + inf)   # CPI_T
-            B = np.dot(cpi_mult, suffix_g[1:]) / 12.0
-
-            w_stars[i]   = (total_growth - terminal_cpi) / B
-            ret_store[i] = r
-            inf_store[i] = inf
-
-        return BaseSimulationResults(simulation_output={
-            "perpetual_withdrawal_rates": w_stars,
-            "sampled_returns":            ret_store,
-            "sampled_inflation":          inf_store,
-        })
+        if compact:
+            outputs = CompactSimulationOutput(arrays=outputs, indices=indices, sources=sources)
+        return BaseSimulationResults(simulation_output=outputs, metadata=metadata)
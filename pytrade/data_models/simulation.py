@@ -1,16 +1,180 @@
 
+import json
 import numpy as np
 from typing import Any
-from dataclasses import dataclass
+from pathlib import Path
+from collections.abc import Mapping
+from dataclasses import dataclass, field
 from pytrade.simulation.utils import block_resample
 from pytrade.simulation.utils import block_resample_joint
+from pytrade.simulation.utils import block_resample_indices
+
+RESULTS_FORMAT_VERSION = 1
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    return str(value)
+
 
 @dataclass
 class BaseSimulationResults:
     simulation_output: dict[str, Any]
+    metadata: dict[str, Any] = field(default_factory=dict)
+
+
+    def save(self, path: str | Path) -> Path:
+        """
+        Persist the results as a directory of `.npy` arrays plus a `metadata.json`
+        manifest (run metadata such as seed, parameters and source data hash, and
+        any non-array outputs). Compact outputs keep their compact layout.
+        """
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+
+        output = self.simulation_output
+        manifest: dict[str, Any] = {
+            "format_version": RESULTS_FORMAT_VERSION,
+            "metadata":       self.metadata,
+            "arrays":         [],
+            "values":         {},
+        }
+
+        if isinstance(output, CompactSimulationOutput):
+            stored = output.arrays
+            np.save(path / "bootstrap_indices.npy", output.indices)
+            manifest["compact_indices_dtype"] = output.indices.dtype.str
+            sources = {}
+            for key, source in output.sources.items():
+                source = np.asarray(source)
+                if source.ndim == 0:
+                    sources[key] = source.item()
+                else:
+                    np.save(path / f"source__{key}.npy", source)
+                    sources[key] = f"source__{key}.npy"
+            manifest["compact_sources"] = sources
+        else:
+            stored = output
+
+        for key, value in stored.items():
+            if isinstance(value, np.ndarray):
+                np.save(path / f"{key}.npy", value)
+                manifest["arrays"].append(key)
+            else:
+                manifest["values"][key] = value
+
+        (path / "metadata.json").write_text(json.dumps(manifest, indent=2, default=_json_default))
+        return path
+
+
+    @classmethod
+    def load(cls, path: str | Path, mmap: bool = True) -> "BaseSimulationResults":
+        """
+        Open results written by `save`. With `mmap=True` arrays are memory-mapped
+        read-only, so opening is instant: nothing is read until an array is used.
+        The analytics methods (and gathering a compact output) still load the
+        arrays they work on into memory.
+        """
+        path = Path(path)
+        manifest = json.loads((path / "metadata.json").read_text())
+        if manifest.get("format_version") != RESULTS_FORMAT_VERSION:
+            raise ValueError(f"Unsupported results format version: {manifest.get('format_version')}")
+
+        mmap_mode = "r" if mmap else None
+        stored = {key: np.load(path / f"{key}.npy", mmap_mode=mmap_mode) for key in manifest["arrays"]}
+        stored.update(manifest["values"])
+
+        if "compact_sources" in manifest:
+            sources = {
+                key: np.load(path / source, mmap_mode=mmap_mode) if isinstance(source, str) else source
+                for key, source in manifest["compact_sources"].items()
+            }
+            indices = np.load(path / "bootstrap_indices.npy", mmap_mode=mmap_mode)
+            expected_dtype = manifest.get("compact_indices_dtype", indices.dtype.str)
+            if indices.dtype.str != expected_dtype:
+                raise ValueError(
+                    f"bootstrap_indices.npy holds {indices.dtype}, the manifest expects {np.dtype(expected_dtype)}."
+                )
+            # Stored already narrowed: re-narrowing would scan the whole index file
+            output = CompactSimulationOutput(arrays=stored, indices=indices, sources=sources, narrow=False)
+        else:
+            output = stored
+
+        return cls(simulation_output=output, metadata=manifest["metadata"])
+
+
+class CompactSimulationOutput(Mapping):
+    """
+    Memory-lean drop-in for the `simulation_output` dict.
+
+    Bootstrapped series (e.g. sampled returns and inflation) are pure gathers
+    from a historical series, so only the bootstrap index matrix — stored in the
+    narrowest integer type that fits — and a reference to each source series are
+    kept. Gathered arrays are materialized on access and not retained. Any other
+    output (value paths, withdrawals, ...) is stored as given, e.g. as float32.
+
+    Parameters
+    ----------
+    arrays  : Outputs stored as-is.
+    indices : (N, T) bootstrap index matrix shared by every gathered output.
+    sources : Gathered outputs: key → 1-D source series (gathered as
+              source[indices]) or a scalar (broadcast to the index shape).
+    narrow  : Cast `indices` to the narrowest integer type that fits (reads
+              every index once). False keeps the given array, e.g. a memmap.
+    """
+
+    def __init__(
+        self,
+        arrays: dict[str, Any],
+        indices: np.ndarray,
+        sources: dict[str, np.ndarray | float],
+        narrow: bool = True
+    ):
+        self.arrays  = arrays
+        self.indices = self.narrow_indices(indices) if narrow else indices
+        self.sources = sources
+
+    @staticmethod
+    def narrow_indices(indices: np.ndarray) -> np.ndarray:
+        max_index = int(indices.max()) if indices.size else 0
+        for dtype in (np.int16, np.int32):
+            if max_index <= np.iinfo(dtype).max:
+                return indices.astype(dtype, copy=False)
+        return indices
+
+    @staticmethod
+    def gather(source: np.ndarray | float, indices: np.ndarray) -> np.ndarray:
+        """Materialize source[indices]; scalar sources broadcast to the index shape."""
+        source = np.asarray(source, dtype=float)
+        if source.ndim == 0:
+            return np.full(indices.shape, source)
+        return source[indices]
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self.arrays:
+            return self.arrays[key]
+        return self.gather(self.sources[key], self.indices)
+
+    def __iter__(self):
+        yield from self.arrays
+        yield from self.sources
+
+    def __len__(self) -> int:
+        return len(self.arrays) + len(self.sources)
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the container (excluding the shared source series)."""
+        return self.indices.nbytes + sum(
+            a.nbytes for a in self.arrays.values() if isinstance(a, np.ndarray)
+        )
     
 
 
+
 class BaseSimulationModel:
 
     def block_bootstrap_returns(
@@ -61,7 +225,8 @@ class BaseSimulationModel:
 
         Each row is an independent path of `seq_len` daily returns, constructed
         by stitching geometrically-distributed blocks drawn from `original_sequence`
-        with circular wrap-around indexing (Politis & Romano, 1994).
+        with circular wrap-around indexing (Politis & Romano, 1994). All paths are
+        generated in a single vectorized pass (see `block_resample_indices`).
 
         Parameters
         ----------
@@ -79,28 +244,24 @@ class BaseSimulationModel:
         seed              : Master RNG seed for full reproducibility.
         """
 
-        rng = np.random.default_rng(seed)
-        hist_daily_vol = np.std(original_sequence)
-
-        paths = np.empty((num_resamples, seq_len))
-        for i in range(num_resamples):
-            path = block_resample(
-                original_sequence,
-                block_length=block_length,
-                resample_sequence_length=seq_len,
-                seed=int(rng.integers(0, 2**31))
-            )
-
-            # --- Vol scaling ------------------------------------------------
-            # Rescale so the path's daily vol matches target_ann_vol / sqrt(252).
-            # Without this, a mismatch between historical realized vol and current
-            # IV directly biases the POP estimate — calmer history → overstated
-            # POP for credit strategies; wilder history → understated POP.
-            if target_ann_vol is not None:
-                target_daily_vol = target_ann_vol / np.sqrt(252)
-                path = path * (target_daily_vol / hist_daily_vol)
-
-            paths[i]  = path.flatten()
+        original_sequence = np.asarray(original_sequence)
+        indices = block_resample_indices(
+            len(original_sequence),
+            num_resamples=num_resamples,
+            resample_sequence_length=seq_len,
+            block_length=block_length,
+            seed=seed
+        )
+        paths = original_sequence.reshape(-1)[indices]
+
+        # --- Vol scaling ----------------------------------------------------
+        # Rescale so the path's daily vol matches target_ann_vol / sqrt(252).
+        # Without this, a mismatch between historical realized vol and current
+        # IV directly biases the POP estimate — calmer history → overstated
+        # POP for credit strategies; wilder history → understated POP.
+        if target_ann_vol is not None:
+            hist_daily_vol = np.std(original_sequence)
+            target_daily_vol = target_ann_vol / np.sqrt(252)
+            paths = paths * (target_daily_vol / hist_daily_vol)
 
         return paths
-    
\ No newline at end of file
@@ -1,10 +1,14 @@
 
+import weakref
 import numpy as np
 import yfinance as yf
 import matplotlib.pyplot as plt
-from multiprocessing import Pool, cpu_count
+from multiprocessing import cpu_count, get_context
+from multiprocessing.pool import Pool
 from pytrade.data_models.options import OptionStrategy, RISK_FREE_RATE
 from pytrade.data_models.simulation import BaseSimulationModel
+from pytrade.simulation.shared_memory import SharedArray
+from pytrade.utils.market_data import MarketDataCache, default_market_data_cache
 
 
 # ---------------------------------------------------------------------------
@@ -44,6 +48,60 @@ def _run_single_path(args):
     return path_pnl
 
 
+def _price_paths(paths, strategy, starting_underlying, vol_skew, n_days, initial_cost):
+    """
+    Vectorized counterpart of _run_single_path: price every leg over the full
+    (n_paths, n_days + 1) grid of spots, IV factors and elapsed days at once.
+    """
+    paths = np.asarray(paths, dtype=float)[:, :n_days]
+    n_paths = paths.shape[0]
+
+    # Spot paths: S_0 followed by the running product of daily gross returns.
+    # Multiplying left to right reproduces the per-day update of the loop engine.
+    growth = np.empty((n_paths, n_days + 1))
+    growth[:, 0] = starting_underlying
+    growth[:, 1:] = 1 + paths
+    underlying = np.cumprod(growth, axis=1)
+
+    # Dynamic IV (see _run_single_path): iv_t = iv_0 * exp(-vol_skew * log(S_t / S_0))
+    if vol_skew != 0.0:
+        dynamic_iv_factor = np.exp(-vol_skew * np.log(underlying / starting_underlying))
+    else:
+        dynamic_iv_factor = 1.0
+
+    market_value = strategy.resolve_value(
+        underlying_price=underlying,
+        iv_factor=dynamic_iv_factor,
+        days_elapsed=np.arange(n_days + 1)
+    )
+    return market_value + initial_cost
+
+
+def _run_shared_chunk(args):
+    """
+    Price a contiguous block of rows of a shared-memory return matrix and write
+    the P&L in place into the shared output buffer. Only the shared-memory
+    handles, the row range and the strategy travel through the task pickle.
+    """
+    (returns_spec, output_spec, start, stop, strategy,
+     starting_underlying, vol_skew, n_days, initial_cost) = args
+
+    returns = SharedArray.attach(returns_spec)
+    output  = SharedArray.attach(output_spec)
+    try:
+        output.array[start:stop] = _price_paths(
+            returns.array[start:stop],
+            strategy,
+            starting_underlying,
+            vol_skew,
+            n_days,
+            initial_cost,
+        )
+    finally:
+        returns.close()
+        output.close()
+
+
 # ---------------------------------------------------------------------------
 # Simulator class
 # ---------------------------------------------------------------------------
@@ -56,20 +114,46 @@ class OptionStrategySimulator(BaseSimulationModel):
     them tightly with the strategy so the caller doesn't have to pass the
     strategy or its DTE around manually.
 
+    Worker processes are started once and reused across simulate_pnl calls.
+    Either let the simulator own its pool (released by close() or on leaving a
+    `with` block, and terminated if the simulator is garbage collected first)
+    or inject a long-lived `multiprocessing.Pool` via `pool=`,
+    which the caller remains responsible for shutting down.
+
+    Owned workers are started with the "forkserver" method, as forking after a
+    numba parallel kernel has run is not safe, so scripts using the parallel
+    engines need the usual `if __name__ == "__main__":` guard.
+
     Usage
     -----
     sim    = OptionStrategySimulator(strategy)
     blocks = sim.generate_bootstrap_blocks(returns_data, num_resamples=10_000)
     pnl    = sim.simulate_pnl(blocks, starting_underlying=450.0, vol_skew=1.5)
+
+    with OptionStrategySimulator(strategy) as sim:
+        for blocks in candidate_blocks:
+            pnl = sim.simulate_pnl(blocks, starting_underlying=450.0)
     """
 
+    # engine="auto" stays in-process below this many priced cells
+    # (paths × days × legs); above it, spawning work onto the pool pays off.
+    PARALLEL_WORK_THRESHOLD: int = 25_000_000
+
     def __init__(
         self,
         strategy: OptionStrategy,
         returns: np.ndarray | None = None,
-        period: str = "max"
+        period: str = "max",
+        pool: Pool | None = None,
+        market_data: MarketDataCache | None = None
     ):
         self.strategy = strategy
+
+        # Worker pool: injected pools are borrowed, lazily created ones are owned
+        self._pool: Pool | None = pool
+        self._owns_pool: bool = pool is None
+        self._pool_size: int | None = None
+        self._pool_finalizer: weakref.finalize | None = None
         # Capture the horizon once at construction time — consistent with the
         # frozen DTE approach used by OptionModel.
         self.first_expiration: int = min(
@@ -84,19 +168,60 @@ class OptionStrategySimulator(BaseSimulationModel):
                 "For cross-asset strategies pass returns= explicitly."
             )
 
+        self.market_data = market_data if market_data is not None else default_market_data_cache()
         if returns is not None:
             self.returns = returns          # user-supplied — skip network call
         else:
             self._fetch_data(tickers.pop(), period)
 
+    # ------------------------------------------------------------------
+    # Worker pool
+    # ------------------------------------------------------------------
+
+    def _get_pool(self, n_cores: int) -> Pool:
+        """Return the persistent pool, starting (or resizing) an owned one on demand."""
+        if self._pool is not None and (not self._owns_pool or self._pool_size == n_cores):
+            return self._pool
+
+        self.close()
+        self._pool = get_context("forkserver").Pool(processes=n_cores)
+        self._owns_pool = True
+        self._pool_size = n_cores
+        # Terminate the workers if the simulator is dropped without close()
+        self._pool_finalizer = weakref.finalize(self, self._pool.terminate)
+        return self._pool
+
+    def close(self) -> None:
+        """Shut down the owned worker pool. Injected pools are left running."""
+        if self._pool is not None and self._owns_pool:
+            self._pool_finalizer.detach()
+            self._pool.close()
+            self._pool.join()
+        self._pool = None
+        self._pool_finalizer = None
+        self._owns_pool = True
+        self._pool_size = None
+
+    def __enter__(self) -> "OptionStrategySimulator":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
     # ------------------------------------------------------------------
     # Data
     # ------------------------------------------------------------------
 
     def _fetch_data(self, ticker: str, period: str) -> None:
-        """Download daily close returns from yfinance for the strategy's underlying."""
-        df = yf.download(ticker, period=period, interval="1d", auto_adjust=True, progress=False)
-        self.returns: np.ndarray = df["Close"].pct_change(1).dropna().to_numpy()
+        """
+        Daily close returns for the strategy's underlying. Full history is served
+        from the local market data cache; other periods go straight to yfinance.
+        """
+        if period == "max":
+            close = self.market_data.get_close([ticker])
+        else:
+            close = yf.download(ticker, period=period, interval="1d", auto_adjust=True, progress=False)["Close"]
+        self.returns: np.ndarray = close.pct_change(1).dropna().to_numpy()
 
     # ------------------------------------------------------------------
     # Path generation
@@ -149,7 +274,9 @@ class OptionStrategySimulator(BaseSimulationModel):
         simulation_returns: np.ndarray,
         starting_underlying: float,
         vol_skew: float = 0.0,
-        n_cores: int = -1
+        n_cores: int = -1,
+        engine: str = "auto",
+        chunk_size: int | None = None
     ) -> np.ndarray:
         """
         Simulate P&L paths for the strategy.
@@ -166,39 +293,109 @@ class OptionStrategySimulator(BaseSimulationModel):
                               iv_t = iv_factor * exp(-vol_skew * log(S_t / S_0))
                               0.0       → flat IV (backward-compatible default).
                               1.0-2.0   → typical equity index sensitivity.
-        n_cores             : Worker processes. -1 = all available CPUs.
+        n_cores             : Worker processes for the pool engines.
+                              -1 = all available CPUs. Ignored when a pool
+                              was injected at construction.
+        engine              : "auto"            → "vectorized" in-process for small
+                                                  workloads, "shared_memory" on the
+                                                  persistent pool once paths × days ×
+                                                  legs exceeds PARALLEL_WORK_THRESHOLD.
+                              "vectorized"      → price every leg over the whole
+                                                  (n_simulations, n_days) grid at once.
+                              "shared_memory"   → the return matrix and the P&L
+                                                  buffer live in shared memory; each
+                                                  worker prices a contiguous block of
+                                                  rows and writes it in place.
+                              "multiprocessing" → one task per path on the pool.
+        chunk_size          : Rows priced per block by the vectorized and
+                              shared-memory engines. Bounds memory for very large
+                              path matrices. None → all rows in one block
+                              (vectorized) or one block per worker (shared_memory).
 
         Returns
         -------
         np.ndarray of shape (n_simulations, first_expiration) — daily P&L per
         path, day-0 (entry day) excluded.
         """
-        if n_cores == -1:
-            n_cores = cpu_count()
-
         nsim = len(simulation_returns)
-        days_range = range(0, self.first_expiration + 1)
         initial_cost = self.strategy.strategy_premium
+        if n_cores == -1:
+            n_cores = cpu_count()
 
-        task_args = [
-            (
-                simulation_returns[j],
-                self.strategy,
-                starting_underlying,
-                vol_skew,
-                days_range,
-                initial_cost,
-            )
-            for j in range(nsim)
-        ]
-
-        if n_cores == 1:
-            results = [_run_single_path(args) for args in task_args]
-        else:
-            with Pool(processes=n_cores) as pool:
-                results = pool.map(_run_single_path, task_args)
-
-        return np.array(results)[:, 1:]
+        if engine == "auto":
+            workload = nsim * self.first_expiration * len(self.strategy.legs)
+            parallel = n_cores > 1 and workload > self.PARALLEL_WORK_THRESHOLD
+            engine = "shared_memory" if parallel else "vectorized"
+
+        match engine:
+            case "vectorized":
+                if chunk_size is None:
+                    chunk_size = max(nsim, 1)
+
+                results = np.empty((nsim, self.first_expiration + 1))
+                for start in range(0, nsim, chunk_size):
+                    results[start:start + chunk_size] = _price_paths(
+                        simulation_returns[start:start + chunk_size],
+                        self.strategy,
+                        starting_underlying,
+                        vol_skew,
+                        self.first_expiration,
+                        initial_cost,
+                    )
+
+            case "shared_memory":
+                if chunk_size is None:
+                    chunk_size = max(-(-nsim // n_cores), 1)
+
+                n_days = self.first_expiration
+                with (
+                    SharedArray.from_array(np.asarray(simulation_returns, dtype=float)[:, :n_days]) as shared_returns,
+                    SharedArray.create((nsim, n_days + 1)) as shared_output,
+                ):
+                    task_args = [
+                        (
+                            shared_returns.spec,
+                            shared_output.spec,
+                            start,
+                            min(start + chunk_size, nsim),
+                            self.strategy,
+                            starting_underlying,
+                            vol_skew,
+                            n_days,
+                            initial_cost,
+                        )
+                        for start in range(0, nsim, chunk_size)
+                    ]
+                    self._get_pool(n_cores).map(_run_shared_chunk, task_args)
+
+                    results = shared_output.array.copy()
+
+            case "multiprocessing":
+                days_range = range(0, self.first_expiration + 1)
+                task_args = [
+                    (
+                        simulation_returns[j],
+                        self.strategy,
+                        starting_underlying,
+                        vol_skew,
+                        days_range,
+                        initial_cost,
+                    )
+                    for j in range(nsim)
+                ]
+
+                if n_cores == 1:
+                    results = [_run_single_path(args) for args in task_args]
+                else:
+                    results = self._get_pool(n_cores).map(_run_single_path, task_args)
+                results = np.array(results)
+
+            case _:
+                raise ValueError(
+                    f"Unknown engine '{engine}'. Expected 'auto', 'vectorized', 'shared_memory' or 'multiprocessing'."
+                )
+
+        return results[:, 1:]
     
 
     @staticmethod
@@ -0,0 +1,51 @@
+import numpy as np
+
+
+# ---------------------------------------------------------------------------
+# Path-keyed random streams.
+#
+# Every simulated path owns a fixed-width row of uniforms that depends only on
+# (seed, path index). Paths are grouped into streams of PATHS_PER_STREAM rows,
+# each keyed by SeedSequence(seed, spawn_key=(path // PATHS_PER_STREAM,)) —
+# i.e. the stream'th child of SeedSequence(seed).spawn — and a row is reached
+# by advancing the stream's counter. Any split of the path range into chunks or
+# workers therefore reproduces exactly the same draws.
+# ---------------------------------------------------------------------------
+
+PATHS_PER_STREAM = 1024
+
+
+def as_seed_sequence(seed: int | np.random.SeedSequence | None) -> np.random.SeedSequence:
+    """Resolve a user seed once, so that every chunk of a run shares the same root."""
+    if isinstance(seed, np.random.SeedSequence):
+        return seed
+    return np.random.SeedSequence(seed)
+
+
+def path_uniforms(
+    seed: int | np.random.SeedSequence | None,
+    path_start: int,
+    num_paths: int,
+    width: int
+) -> np.ndarray:
+    """
+    (num_paths, width) matrix of U[0, 1) draws for paths
+    [path_start, path_start + num_paths). Row i depends only on `seed`, the
+    global path index `path_start + i` and `width`.
+    """
+    root = as_seed_sequence(seed)
+    out = np.empty((num_paths, width))
+
+    path, end = path_start, path_start + num_paths
+    while path < end:
+        stream, row = divmod(path, PATHS_PER_STREAM)
+        rows = min(PATHS_PER_STREAM - row, end - path)
+
+        bit_generator = np.random.PCG64(
+            np.random.SeedSequence(root.entropy, spawn_key=root.spawn_key + (stream,))
+        )
+        bit_generator.advance(row * width)           # one 64-bit draw per double
+        np.random.Generator(bit_generator).random(out=out[path - path_start:path - path_start + rows])
+        path += rows
+
+    return out
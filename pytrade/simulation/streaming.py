@@ -0,0 +1,130 @@
+import numpy as np
+
+
+# ---------------------------------------------------------------------------
+# Online accumulators for chunked Monte Carlo runs.
+#
+# Paths are folded in chunk by chunk and discarded, so memory depends on the
+# horizon and the number of bins, never on the number of simulated paths.
+# ---------------------------------------------------------------------------
+
+def histogram_quantiles(
+    counts: np.ndarray,
+    edges: np.ndarray,
+    quantiles: list[float],
+    skip_underflow: bool = False
+) -> np.ndarray:
+    """
+    Approximate quantiles from fixed-bin histograms.
+
+    Parameters
+    ----------
+    counts         : (C, B + 2) counts per column: [underflow, B interior bins, overflow].
+    edges          : (B + 1,) bin edges shared by every column.
+    quantiles      : Quantile levels in [0, 1].
+    skip_underflow : Ignore the underflow bin (e.g. depleted paths) when ranking.
+
+    Returns
+    -------
+    np.ndarray of shape (len(quantiles), C). Underflow ranks map to 0, overflow
+    ranks to the top edge; interior ranks are interpolated linearly within the bin.
+    Columns with no observations yield NaN.
+    """
+    counts = np.atleast_2d(np.asarray(counts, dtype=float))
+    if skip_underflow:
+        counts = counts.copy()
+        counts[:, 0] = 0
+
+    cum   = np.cumsum(counts, axis=1)
+    total = cum[:, -1]
+    num_bins = len(edges) - 1
+    cols  = np.arange(counts.shape[0])
+
+    out = np.empty((len(quantiles), counts.shape[0]))
+    for i, q in enumerate(quantiles):
+        target = q * total
+        # Bin holding the target rank; leading empty bins never do (q = 0 → first observation)
+        k = np.minimum(((cum < target[:, None]) | (cum <= 0)).sum(axis=1), num_bins + 1)
+
+        interior = np.clip(k - 1, 0, num_bins - 1)
+        below = np.where(k > 0, cum[cols, np.maximum(k - 1, 0)], 0.0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            frac = np.clip((target - below) / counts[cols, k], 0.0, 1.0)
+        value = edges[interior] + np.nan_to_num(frac) * (edges[interior + 1] - edges[interior])
+
+        value = np.where(k == 0, 0.0, value)
+        value = np.where(k == num_bins + 1, edges[-1], value)
+        out[i] = np.where(total > 0, value, np.nan)
+
+    return out
+
+
+class HistogramSketch:
+    """
+    Per-column fixed-bin histogram of a stream of (n, C) chunks.
+
+    Values below edges[0] land in an underflow bin and values at or above
+    edges[-1] in an overflow bin, so no observation is ever dropped.
+    """
+
+    def __init__(self, edges: np.ndarray, num_columns: int):
+        self.edges = np.asarray(edges, dtype=float)
+        self.num_columns = num_columns
+        self.counts = np.zeros((num_columns, len(self.edges) + 1), dtype=np.int64)
+
+    def update(self, values: np.ndarray) -> None:
+        bins = np.searchsorted(self.edges, values, side="right")
+        bins += np.arange(self.num_columns) * self.counts.shape[1]
+        self.counts += np.bincount(bins.ravel(), minlength=self.counts.size).reshape(self.counts.shape)
+
+    def quantiles(self, quantiles: list[float], skip_underflow: bool = False) -> np.ndarray:
+        return histogram_quantiles(self.counts, self.edges, quantiles, skip_underflow)
+
+
+class StreamingWithdrawalSummary:
+    """
+    Running summary of withdrawal simulations: per-month depletion counts,
+    means and value/withdrawal histograms (whose last month doubles as the
+    terminal value distribution).
+
+    Parameters
+    ----------
+    sequence_length  : Months per path.
+    value_edges      : Bin edges for portfolio values.
+    withdrawal_edges : Bin edges for monthly withdrawals.
+    """
+
+    def __init__(
+        self,
+        sequence_length: int,
+        value_edges: np.ndarray,
+        withdrawal_edges: np.ndarray
+    ):
+        self.num_simulations = 0
+        self.depleted        = np.zeros(sequence_length, dtype=np.int64)
+        self.value_sum       = np.zeros(sequence_length)
+        self.withdrawal_sum  = np.zeros(sequence_length)
+        self.value_sketch      = HistogramSketch(value_edges, sequence_length)
+        self.withdrawal_sketch = HistogramSketch(withdrawal_edges, sequence_length)
+
+    def update(self, portfolio_value: np.ndarray, withdrawals: np.ndarray) -> None:
+        """Fold a (n, T) chunk of simulated paths into the summary."""
+        self.num_simulations += portfolio_value.shape[0]
+        self.depleted        += (portfolio_value <= 0).sum(axis=0)
+        self.value_sum       += portfolio_value.sum(axis=0)
+        self.withdrawal_sum  += withdrawals.sum(axis=0)
+        self.value_sketch.update(portfolio_value)
+        self.withdrawal_sketch.update(withdrawals)
+
+    def to_output(self) -> dict[str, np.ndarray | int]:
+        n = max(self.num_simulations, 1)
+        return {
+            "num_simulations":           self.num_simulations,
+            "failure_rate":              self.depleted / n,
+            "portfolio_value_mean":      self.value_sum / n,
+            "withdrawals_mean":          self.withdrawal_sum / n,
+            "portfolio_value_histogram": self.value_sketch.counts,
+            "portfolio_value_bin_edges": self.value_sketch.edges,
+            "withdrawals_histogram":     self.withdrawal_sketch.counts,
+            "withdrawals_bin_edges":     self.withdrawal_sketch.edges,
+        }
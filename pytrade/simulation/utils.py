@@ -1,23 +1,109 @@
 
 import numpy as np
-import yfinance as yf
-from numba import njit
+from numba import njit, prange
+from pytrade.simulation.seeding import path_uniforms
+from pytrade.utils.market_data import MarketDataCache, default_market_data_cache
 
 
-def compute_correlation_matrix(tickers: list[str], freq: int = 1) -> np.array:
-    df = yf.download(tickers, period = "max")
+def compute_correlation_matrix(
+    tickers: list[str],
+    freq: int = 1,
+    market_data: MarketDataCache | None = None
+) -> np.array:
+    market_data = market_data if market_data is not None else default_market_data_cache()
     return (
-        df["Close"]
+        market_data.get_close(tickers)
         .pct_change(freq)
         .corr()
     )
 
 
+def block_resample_indices(
+    sequence_length: int,
+    num_resamples: int,
+    resample_sequence_length: int,
+    block_length: int | np.ndarray = 30,
+    seed: int | np.random.SeedSequence | None = None,
+    path_offset: int = 0
+) -> np.ndarray:
+    """
+    Batched Stationary Block Bootstrap (Politis & Romano, 1994).
+
+    Returns a (num_resamples, resample_sequence_length) matrix of indices into
+    a series of length `sequence_length`. All paths are built in a single NumPy
+    pass: block boundaries and circular start offsets are drawn for every path at
+    once, each position is mapped to the start of its block, and resolves to
+    `(block_start + offset) % sequence_length`.
+
+    A new block begins at each position with probability p = 1 / block_length,
+    which is exactly equivalent to drawing Geometric(p) block lengths (the
+    geometric distribution is memoryless) but needs one uniform draw per cell
+    instead of a variable number of length draws per path.
+
+    Gathering with the index matrix (``seq[idx]``) yields the bootstrapped
+    paths; applying the same matrix to several aligned series yields a joint
+    bootstrap.
+
+    Draws are keyed by path index (see pytrade.simulation.seeding): row i is
+    path `path_offset + i` of the run identified by `seed`, so generating a run
+    in chunks (or across workers) gives the same paths as generating it at once.
+
+    Parameters
+    ----------
+    sequence_length          : Length of the series being resampled.
+    num_resamples            : Number of paths (rows) to generate.
+    resample_sequence_length : Desired path length (columns).
+    block_length             : Target *mean* block length. Either a scalar shared
+                               by every path or a 1-D array with one value per path.
+    seed                     : Optional seed (or SeedSequence) for reproducibility.
+    path_offset              : Global index of the first path.
+    """
+    L = int(resample_sequence_length)
+    uniforms = path_uniforms(seed, path_offset, num_resamples, 2 * L)
+    return block_indices_from_uniforms(uniforms, sequence_length, block_length)
+
+
+def block_indices_from_uniforms(
+    uniforms: np.ndarray,
+    sequence_length: int,
+    block_length: int | np.ndarray = 30
+) -> np.ndarray:
+    """
+    Stationary block bootstrap indices from a (num_resamples, 2 * L) matrix of
+    per-path uniforms: the first L columns decide block starts, the last L the
+    circular start offsets. See `block_resample_indices`.
+    """
+    n = int(sequence_length)
+    num_resamples, L = uniforms.shape[0], uniforms.shape[1] // 2
+    block_length = np.broadcast_to(np.asarray(block_length, dtype=float), (num_resamples,))
+    if (block_length > n).any():
+        raise ValueError("block_length cannot be greater than the length of the input data.")
+
+    p = 1.0 / block_length          # geometric distribution parameter, one per path
+
+    is_block_start = uniforms[:, :L] < p[:, None]
+    is_block_start[:, 0] = True
+
+    # Column at which the block covering each position started
+    positions   = np.arange(L)
+    block_start = np.where(is_block_start, positions, 0)
+    np.maximum.accumulate(block_start, axis=1, out=block_start)
+
+    # Circular start offsets: any observation is equally likely to open a block
+    start_offset = np.zeros((num_resamples, L), dtype=np.intp)
+    start_offset[is_block_start] = (uniforms[:, L:][is_block_start] * n).astype(np.intp)
+
+    indices = np.take_along_axis(start_offset, block_start, axis=1)
+    indices += positions - block_start
+    indices %= n
+    return indices
+
+
 def block_resample(
     original_sequence: np.array,
     block_length: int = 30,
     resample_sequence_length: int = 30,
-    seed: int | None = None
+    seed: int | np.random.SeedSequence | None = None
 ) -> np.array:
     """
     Stationary Block Bootstrap (Politis & Romano, 1994).
@@ -35,21 +121,14 @@ def block_resample(
     resample_sequence_length : Desired output length
     seed                     : Optional RNG seed for reproducibility.
     """
-    n = len(original_sequence)
-    if block_length > n:
-        raise ValueError("block_length cannot be greater than the length of the input data.")
-
-    rng = np.random.default_rng(seed)
-    p = 1.0 / block_length          # geometric distribution parameter
-    result: list = []
-
-    while len(result) < resample_sequence_length:
-        actual_len = int(rng.geometric(p))          # random block length, mean = block_length
-        start      = int(rng.integers(0, n))        # circular: any index equally likely
-        indices    = [(start + k) % n for k in range(actual_len)]
-        result.extend(original_sequence[indices].tolist())
-
-    return np.array(result[:resample_sequence_length])
+    indices = block_resample_indices(
+        len(original_sequence),
+        num_resamples=1,
+        resample_sequence_length=resample_sequence_length,
+        block_length=block_length,
+        seed=seed
+    )[0]
+    return np.asarray(original_sequence)[indices]
 
 
 
@@ -57,7 +136,7 @@ def block_resample_joint(
     sequences: list[np.ndarray],
     block_length: int,
     resample_sequence_length: int,
-    seed: int | None = None
+    seed: int | np.random.SeedSequence | None = None
 ) -> list[np.ndarray]:
     """
     Stationary Joint Block Bootstrap for multiple sequences.
@@ -75,16 +154,13 @@ def block_resample_joint(
     resample_sequence_length : Desired output length
     seed                     : Optional RNG seed for reproducibility.
     """
-    
-    n = len(sequences[0])
-    rng = np.random.default_rng(seed)
-    p = 1.0 / block_length
-    indices: list[int] = []
-    while len(indices) < resample_sequence_length:
-        actual_len = int(rng.geometric(p))
-        start = int(rng.integers(0, n))
-        indices.extend((start + k) % n for k in range(actual_len))
-    indices = np.array(indices[:resample_sequence_length])
+    indices = block_resample_indices(
+        len(sequences[0]),
+        num_resamples=1,
+        resample_sequence_length=resample_sequence_length,
+        block_length=block_length,
+        seed=seed
+    )[0]
     return [seq[indices] for seq in sequences]
 
 
@@ -141,4 +217,129 @@ def apply_stop_loss(data, premium_limit):
             elif data[i, j] < premium_limit:
                 data[i, j] = premium_limit
                 stopped = True
-    return data
\ No newline at end of file
+    return data
+
+
+# Reasons recorded per path by apply_exit_rules, indexed by its exit_reason codes
+EXIT_REASONS = ("expiry", "stop_loss", "take_profit", "trailing_stop", "time")
+
+
+@njit(parallel=True)
+def _exit_rules_kernel(
+    data,
+    stop_loss,
+    take_profit,
+    trailing_stop,
+    exit_column,
+    adjusted,
+    exit_day,
+    exit_pnl,
+    exit_reason
+):
+    n, t = data.shape
+    for i in prange(n):
+        peak = 0.0                                  # entry P&L
+        day = t - 1
+        level = data[i, t - 1]
+        reason = 0
+
+        for j in range(t):
+            pnl = data[i, j]
+
+            # Stops fill at their level; on a gap through both, the higher one was hit first
+            trail = peak - trailing_stop
+            stop, stop_reason = (stop_loss, 1) if stop_loss >= trail else (trail, 3)
+            if pnl < stop:
+                day, level, reason = j, stop, stop_reason
+                break
+            if pnl >= take_profit:
+                day, level, reason = j, take_profit, 2
+                break
+            if j >= exit_column:
+                day, level, reason = j, pnl, 4
+                break
+
+            adjusted[i, j] = pnl
+            if pnl > peak:
+                peak = pnl
+
+        for j in range(day, t):
+            adjusted[i, j] = level
+        exit_day[i] = day
+        exit_pnl[i] = level
+        exit_reason[i] = reason
+
+
+def apply_exit_rules(
+    data: np.ndarray,
+    credit: float | None = None,
+    stop_loss: float | None = None,
+    take_profit: float | None = None,
+    trailing_stop: float | None = None,
+    exit_dte: int | None = None,
+    final_dte: int = 0,
+    inplace: bool = False
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Apply every exit rule of a strategy to a (N, T) matrix of daily P&L paths
+    (day 0 excluded, as returned by OptionStrategySimulator.simulate_pnl) in a
+    single compiled pass, parallel over paths.
+
+    Each day, in order: a stop (the higher of the stop-loss and the trailing
+    stop) closes the position when P&L falls below it, the take-profit when P&L
+    reaches it, and the time exit on the first day at or below `exit_dte`.
+    Stops and take-profits fill at exactly their level (see apply_stop_loss),
+    time exits at that day's P&L; from the exit day on, the path is forward
+    filled at the exit P&L. Paths that never exit are held to the last column.
+    Disabled rules (None) never trigger.
+
+    Parameters
+    ----------
+    data          : (N, T) daily P&L per path.
+    credit        : Net premium received at entry (strategy_premium); the unit of take_profit.
+    stop_loss     : P&L level below which the position is closed (e.g. -2 * credit).
+    take_profit   : Fraction of `credit` at which the position is closed (e.g. 0.5).
+    trailing_stop : Closes the position once P&L falls this far below its running
+                    peak (which starts at the entry P&L of 0).
+    exit_dte      : Close on the first day whose days-to-expiry is <= exit_dte.
+    final_dte     : Days to expiry on the last column (0 when the horizon ends at expiry).
+    inplace       : Overwrite `data` (float64, C-contiguous) instead of a copy.
+
+    Returns
+    -------
+    adjusted    : (N, T) P&L paths after the exits.
+    exit_day    : (N,) column of the exit (T - 1 for paths held to the end).
+    exit_pnl    : (N,) realized P&L.
+    exit_reason : (N,) index into EXIT_REASONS.
+    """
+    if inplace:
+        if data.dtype != np.float64 or not data.flags.c_contiguous or not data.flags.writeable:
+            raise ValueError("inplace=True requires a writeable, C-contiguous float64 matrix.")
+        adjusted = data
+    else:
+        data = np.ascontiguousarray(data, dtype=float)
+        adjusted = np.empty_like(data)
+
+    if data.ndim != 2 or data.shape[1] == 0:
+        raise ValueError(f"Expected a (N, T) matrix with T >= 1. Got shape {data.shape}.")
+    if take_profit is not None and (credit is None or credit <= 0):
+        raise ValueError("take_profit is a fraction of the credit received and requires credit > 0.")
+
+    n, t = data.shape
+    exit_column = t if exit_dte is None else max(t - 1 + final_dte - exit_dte, 0)
+
+    exit_day    = np.empty(n, dtype=np.int64)
+    exit_pnl    = np.empty(n)
+    exit_reason = np.empty(n, dtype=np.int8)
+    _exit_rules_kernel(
+        data,
+        -np.inf if stop_loss is None else float(stop_loss),
+        np.inf if take_profit is None else float(take_profit) * float(credit),
+        np.inf if trailing_stop is None else float(trailing_stop),
+        int(exit_column),
+        adjusted,
+        exit_day,
+        exit_pnl,
+        exit_reason
+    )
+    return adjusted, exit_day, exit_pnl, exit_reason
@@ -0,0 +1,365 @@
+import numpy as np
+from numba import njit, prange
+
+
+# ---------------------------------------------------------------------------
+# Withdrawal path recursion
+#
+# Every engine walks the same recursion, month by month:
+#
+#   V_t   = V_{t-1} * (1 + r_t)
+#   W_t   = clip(rate / 12 * V_t, min_t, max_t) capped at V_t   (0 while deferred)
+#   V_t   = max(V_t - W_t, 0)
+#   min_{t+1}, max_{t+1} = (min_t, max_t) * (1 + inf_t)
+#
+# and returns (portfolio_value, withdrawals), both of shape (N, T).
+# ---------------------------------------------------------------------------
+
+WITHDRAWAL_ENGINES = ("python", "numpy", "numba")
+
+
+def simulate_withdrawals_python(
+    returns: np.ndarray,
+    inflation: np.ndarray,
+    starting_portfolio: float,
+    anual_withdrawal_rate: float,
+    minimum_monthly_withdrawal_amount: float,
+    maximum_monthly_withdrawal_amount: float,
+    drawdown_deferral: int = 0
+) -> tuple[np.ndarray, np.ndarray]:
+    """Reference implementation: one scalar recursion per path."""
+    num_simulations, sequence_length = returns.shape
+    portfolio_value = np.full((num_simulations, sequence_length), np.nan)
+    withdrawals     = np.full((num_simulations, sequence_length), np.nan)
+
+    for i in range(num_simulations):
+        current_portfolio = starting_portfolio
+        mimwa_ = minimum_monthly_withdrawal_amount
+        mamwa_ = maximum_monthly_withdrawal_amount
+        for t in range(sequence_length):
+            r = returns[i, t]
+            current_portfolio *= (1 + r)
+
+            monthly_withdrawal_amount = (
+                min(
+                    min(
+                        max(mimwa_, anual_withdrawal_rate / 12 * current_portfolio),
+                        mamwa_
+                    ),
+                    current_portfolio
+                )
+                if t >= drawdown_deferral else 0
+            )
+
+            withdrawals[i, t] = monthly_withdrawal_amount
+            current_portfolio -= monthly_withdrawal_amount
+            current_portfolio = max(0, current_portfolio)
+
+            portfolio_value[i, t] = current_portfolio
+
+            # Adjust withdrawal bounds for inflation
+            mimwa_ *= (1 + inflation[i, t])
+            mamwa_ *= (1 + inflation[i, t])
+
+    return portfolio_value, withdrawals
+
+
+def simulate_withdrawals_numpy(
+    returns: np.ndarray,
+    inflation: np.ndarray,
+    starting_portfolio: float,
+    anual_withdrawal_rate: float,
+    minimum_monthly_withdrawal_amount: float,
+    maximum_monthly_withdrawal_amount: float,
+    drawdown_deferral: int = 0
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Vectorized engine: steps every path forward together, one month at a time,
+    over (N,) state arrays. Performs the same floating point operations in the
+    same order as the reference loop, so results match it exactly.
+    """
+    num_simulations, sequence_length = returns.shape
+
+    # Work month-major so each step reads and writes contiguous rows
+    returns_t   = np.ascontiguousarray(returns.T)
+    growth_t    = 1 + np.ascontiguousarray(inflation.T)
+    portfolio_t = np.empty((sequence_length, num_simulations))
+    withdraw_t  = np.zeros((sequence_length, num_simulations))
+
+    current_portfolio = np.full(num_simulations, float(starting_portfolio))
+    mimwa_ = np.full(num_simulations, float(minimum_monthly_withdrawal_amount))
+    mamwa_ = np.full(num_simulations, float(maximum_monthly_withdrawal_amount))
+    monthly_rate = anual_withdrawal_rate / 12
+
+    for t in range(sequence_length):
+        current_portfolio *= (1 + returns_t[t])
+
+        if t >= drawdown_deferral:
+            monthly_withdrawal_amount = withdraw_t[t]
+            np.multiply(monthly_rate, current_portfolio, out=monthly_withdrawal_amount)
+            np.maximum(mimwa_, monthly_withdrawal_amount, out=monthly_withdrawal_amount)
+            np.minimum(monthly_withdrawal_amount, mamwa_, out=monthly_withdrawal_amount)
+            np.minimum(monthly_withdrawal_amount, current_portfolio, out=monthly_withdrawal_amount)
+            current_portfolio -= monthly_withdrawal_amount
+
+        np.maximum(current_portfolio, 0, out=current_portfolio)
+        portfolio_t[t] = current_portfolio
+
+        mimwa_ *= growth_t[t]
+        mamwa_ *= growth_t[t]
+
+    return np.ascontiguousarray(portfolio_t.T), np.ascontiguousarray(withdraw_t.T)
+
+
+@njit(parallel=True)
+def _withdrawal_kernel_numba(
+    returns,
+    inflation,
+    starting_portfolio,
+    anual_withdrawal_rate,
+    minimum_monthly_withdrawal_amount,
+    maximum_monthly_withdrawal_amount,
+    drawdown_deferral,
+    portfolio_value,
+    withdrawals
+):
+    n, t_max = returns.shape
+    for i in prange(n):
+        current_portfolio = starting_portfolio
+        mimwa_ = minimum_monthly_withdrawal_amount
+        mamwa_ = maximum_monthly_withdrawal_amount
+        for t in range(t_max):
+            current_portfolio *= (1 + returns[i, t])
+
+            if t >= drawdown_deferral:
+                monthly_withdrawal_amount = min(
+                    min(max(mimwa_, anual_withdrawal_rate / 12 * current_portfolio), mamwa_),
+                    current_portfolio
+                )
+            else:
+                monthly_withdrawal_amount = 0.0
+
+            withdrawals[i, t] = monthly_withdrawal_amount
+            current_portfolio -= monthly_withdrawal_amount
+            current_portfolio = max(0.0, current_portfolio)
+
+            portfolio_value[i, t] = current_portfolio
+
+            mimwa_ *= (1 + inflation[i, t])
+            mamwa_ *= (1 + inflation[i, t])
+
+
+def simulate_withdrawals_numba(
+    returns: np.ndarray,
+    inflation: np.ndarray,
+    starting_portfolio: float,
+    anual_withdrawal_rate: float,
+    minimum_monthly_withdrawal_amount: float,
+    maximum_monthly_withdrawal_amount: float,
+    drawdown_deferral: int = 0
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Compiled engine: the reference recursion under @njit, with paths spread
+    across all cores via prange. Each path is an independent scalar recursion,
+    so results match the reference loop bit for bit. The first call pays the
+    JIT compilation cost.
+    """
+    num_simulations, sequence_length = returns.shape
+    portfolio_value = np.empty((num_simulations, sequence_length))
+    withdrawals     = np.empty((num_simulations, sequence_length))
+
+    _withdrawal_kernel_numba(
+        np.ascontiguousarray(returns),
+        np.ascontiguousarray(inflation),
+        float(starting_portfolio),
+        float(anual_withdrawal_rate),
+        float(minimum_monthly_withdrawal_amount),
+        float(maximum_monthly_withdrawal_amount),
+        int(drawdown_deferral),
+        portfolio_value,
+        withdrawals
+    )
+    return portfolio_value, withdrawals
+
+
+def simulate_withdrawals(
+    returns: np.ndarray,
+    inflation: np.ndarray,
+    starting_portfolio: float,
+    anual_withdrawal_rate: float,
+    minimum_monthly_withdrawal_amount: float,
+    maximum_monthly_withdrawal_amount: float,
+    drawdown_deferral: int = 0,
+    engine: str = "numpy"
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Run the withdrawal recursion over a (N, T) matrix of monthly returns and
+    inflation with the requested engine.
+
+    Parameters
+    ----------
+    returns   : (N, T) monthly portfolio returns.
+    inflation : (N, T) monthly inflation rates; scales the withdrawal bounds.
+    engine    : "numpy"  → vectorized over paths (default).
+                "numba"  → compiled per-path recursion, parallel over paths.
+                "python" → per-path scalar reference loop.
+    """
+    match engine:
+        case "numpy":
+            kernel = simulate_withdrawals_numpy
+        case "numba":
+            kernel = simulate_withdrawals_numba
+        case "python":
+            kernel = simulate_withdrawals_python
+        case _:
+            raise ValueError(f"Unknown engine '{engine}'. Expected one of {WITHDRAWAL_ENGINES}.")
+
+    return kernel(
+        np.asarray(returns, dtype=float),
+        np.asarray(inflation, dtype=float),
+        starting_portfolio,
+        anual_withdrawal_rate,
+        minimum_monthly_withdrawal_amount,
+        maximum_monthly_withdrawal_amount,
+        drawdown_deferral
+    )
+
+
+def simulate_withdrawal_policies(
+    returns: np.ndarray,
+    inflation: np.ndarray,
+    starting_portfolio: float,
+    anual_withdrawal_rates: np.ndarray,
+    minimum_monthly_withdrawal_amounts: np.ndarray,
+    maximum_monthly_withdrawal_amounts: np.ndarray,
+    drawdown_deferrals: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Evaluate P withdrawal policies against the same (N, T) paths at once.
+
+    The recursion state is a (P, N) tensor stepped month by month, so every
+    policy sees exactly the same returns and inflation (common random numbers).
+    Only terminal quantities are kept, making memory independent of T. Each
+    policy row performs the same floating point operations as the numpy engine,
+    so it matches a separate simulate_withdrawals call exactly.
+
+    Parameters
+    ----------
+    returns   : (N, T) monthly portfolio returns shared by every policy, or
+                (P, N, T) with one return matrix per policy (e.g. candidate
+                allocations recombined from the same asset paths).
+    inflation : (N, T) monthly inflation rates.
+    anual_withdrawal_rates, minimum_monthly_withdrawal_amounts,
+    maximum_monthly_withdrawal_amounts, drawdown_deferrals
+              : (P,) policy parameters (scalars broadcast).
+
+    Returns
+    -------
+    (terminal_value, total_withdrawals), both of shape (P, N).
+    """
+    # Month-major: (T, N) or (T, P, N)
+    returns_t = np.ascontiguousarray(np.moveaxis(np.asarray(returns, dtype=float), -1, 0))
+    growth_t  = 1 + np.ascontiguousarray(np.asarray(inflation, dtype=float).T)
+    sequence_length, num_simulations = returns_t.shape[0], returns_t.shape[-1]
+
+    rates, mins, maxs, deferrals = (
+        np.asarray(anual_withdrawal_rates, dtype=float).reshape(-1),
+        np.asarray(minimum_monthly_withdrawal_amounts, dtype=float).reshape(-1),
+        np.asarray(maximum_monthly_withdrawal_amounts, dtype=float).reshape(-1),
+        np.asarray(drawdown_deferrals, dtype=int).reshape(-1),
+    )
+    num_policies = max(
+        rates.size, mins.size, maxs.size, deferrals.size,
+        returns_t.shape[1] if returns_t.ndim == 3 else 1
+    )
+    rates, mins, maxs, deferrals = (np.broadcast_to(x, (num_policies,)) for x in (rates, mins, maxs, deferrals))
+    shape = (num_policies, num_simulations)
+
+    current_portfolio = np.full(shape, float(starting_portfolio))
+    mimwa_ = np.repeat(mins.reshape(-1, 1), num_simulations, axis=1)
+    mamwa_ = np.repeat(maxs.reshape(-1, 1), num_simulations, axis=1)
+    monthly_rate = (rates / 12).reshape(-1, 1)
+
+    monthly_withdrawal_amount = np.empty(shape)
+    total_withdrawals = np.zeros(shape)
+
+    for t in range(sequence_length):
+        current_portfolio *= (1 + returns_t[t])
+
+        np.multiply(monthly_rate, current_portfolio, out=monthly_withdrawal_amount)
+        np.maximum(mimwa_, monthly_withdrawal_amount, out=monthly_withdrawal_amount)
+        np.minimum(monthly_withdrawal_amount, mamwa_, out=monthly_withdrawal_amount)
+        np.minimum(monthly_withdrawal_amount, current_portfolio, out=monthly_withdrawal_amount)
+        monthly_withdrawal_amount[t < deferrals] = 0
+
+        current_portfolio -= monthly_withdrawal_amount
+        total_withdrawals += monthly_withdrawal_amount
+        np.maximum(current_portfolio, 0, out=current_portfolio)
+
+        mimwa_ *= growth_t[t]
+        mamwa_ *= growth_t[t]
+
+    return current_portfolio, total_withdrawals
+
+
+# ---------------------------------------------------------------------------
+# Perpetual withdrawal rate
+# ---------------------------------------------------------------------------
+
+def solve_perpetual_withdrawal_rates(
+    returns: np.ndarray,
+    inflation: np.ndarray,
+    chunk_size: int | None = None
+) -> np.ndarray:
+    """
+    Closed-form annual withdrawal rate w* per path such that the terminal
+    portfolio value equals the inflation-adjusted initial value.
+
+    With monthly withdrawals of w/12 * CPI_{t-1} (CPI_0 = 1) taken after each
+    month's growth, the terminal value of a unit portfolio is linear in w:
+
+        V_T = A - w * B,   A = prod_t (1 + r_t),
+                           B = 1/12 * sum_t CPI_{t-1} * prod_{j>t} (1 + r_j)
+
+    so w* = (A - CPI_T) / B. All rows are solved at once from suffix growth
+    products and CPI multipliers.
+
+    Parameters
+    ----------
+    returns    : (N, T) monthly portfolio returns.
+    inflation  : (N, T) monthly inflation rates.
+    chunk_size : Optional number of rows solved per block. Bounds the solver's
+                 (chunk, T) temporaries; the (N, T) inputs themselves are the
+                 caller's (see Portfolio.estimate_perpetual_withdrawal_rate for
+                 a run that bootstraps them chunk by chunk).
+                 None → solve every row in one block.
+    """
+    returns   = np.asarray(returns, dtype=float)
+    inflation = np.asarray(inflation, dtype=float)
+    num_simulations = returns.shape[0]
+    if chunk_size is None:
+        chunk_size = max(num_simulations, 1)
+    elif chunk_size < 1:
+        raise ValueError(f"chunk_size must be a positive number of rows. Got {chunk_size}.")
+
+    w_stars = np.empty(num_simulations)
+    for start in range(0, num_simulations, chunk_size):
+        rows = slice(start, start + chunk_size)
+        growth    = 1 + returns[rows]
+        cpi_ratio = 1 + inflation[rows]
+
+        # CPI_{t-1} for each withdrawal month t=1..T  →  [1, 1+inf[0], ...]
+        cpi_mult = np.ones_like(cpi_ratio)
+        np.cumprod(cpi_ratio[:, :-1], axis=1, out=cpi_mult[:, 1:])
+        terminal_cpi = cpi_mult[:, -1] * cpi_ratio[:, -1]   # CPI_T
+
+        # Suffix growth: suffix_g[:, k] = prod(1+r[:, j] for j=k..T-1), suffix_g[:, T] = 1
+        suffix_g = np.ones((growth.shape[0], growth.shape[1] + 1))
+        suffix_g[:, :-1] = np.cumprod(growth[:, ::-1], axis=1)[:, ::-1]
+
+        total_growth = suffix_g[:, 0]        # A
+        B = np.einsum("ij,ij->i", cpi_mult, suffix_g[:, 1:]) / 12.0
+
+        w_stars[rows] = (total_growth - terminal_cpi) / B
+
+    return w_stars
@@ -0,0 +1,242 @@
+import asyncio
+import threading
+import warnings
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable
+from pytrade.utils.market_data import MarketDataCache, default_market_data_cache
+from pytrade.utils.inflation import InflationStore, default_inflation_store
+from pytrade.utils.external_data import ExternalSeriesRegistry, default_external_registry
+
+
+@dataclass(frozen=True)
+class SourcePolicy:
+    """
+    Per-attempt timeout (seconds) and retry budget of one kind of source.
+    Retry k (1-based) waits `backoff * 2 ** (k - 1)` seconds first, unless the
+    previous attempt timed out: a call cannot be interrupted, so the retry
+    keeps waiting for that same call instead of issuing a second one.
+    """
+    timeout: float = 30.0
+    retries: int = 2
+    backoff: float = 0.5
+
+
+class AsyncDataLoader:
+    """
+    Concurrent warm-up of every source a Portfolio reads: one price refresh per
+    stale ticker, the HICP request and the local parquet reads all run at once
+    on a bounded pool, so a cold start takes about as long as the slowest
+    source instead of the sum of all of them.
+
+    The loader only fills the caches; the data pipeline then reads them without
+    touching the network. A source that still fails after its retries, or times
+    out, falls back to its cached copy (with a warning) and is not contacted
+    again by the synchronous pipeline for the cache's `retry_after` window.
+    Sources are the caches' own, so stub servers stand in for tests through
+    `MarketDataCache(downloader=...)` and `EcbHicpSource(url=...)`.
+
+    Each call runs on its own daemon thread. The sources bound their requests
+    with their own timeouts; a call the loader stopped waiting for finishes
+    (or is abandoned at interpreter exit) in the background without holding
+    up later calls.
+
+    Parameters
+    ----------
+    market_data     : Daily close prices. Defaults to the process-wide cache.
+    inflation_store : HICP store. Defaults to the process-wide store.
+    external_data   : Local parquet series. Defaults to the process-wide registry.
+    max_concurrency : Upper bound on simultaneous source calls being waited for.
+    prices          : Timeout/retry policy of a single ticker refresh.
+    inflation       : Timeout/retry policy of the HICP request.
+    local           : Timeout/retry policy of a local parquet read (cached
+                      prices, stored HICP, external series).
+    """
+
+    def __init__(
+        self,
+        market_data: MarketDataCache | None = None,
+        inflation_store: InflationStore | None = None,
+        external_data: ExternalSeriesRegistry | None = None,
+        max_concurrency: int = 8,
+        prices: SourcePolicy = SourcePolicy(timeout=30.0, retries=2),
+        inflation: SourcePolicy = SourcePolicy(timeout=20.0, retries=2),
+        local: SourcePolicy = SourcePolicy(timeout=10.0, retries=0)
+    ):
+        self.market_data = market_data if market_data is not None else default_market_data_cache()
+        self.inflation_store = inflation_store if inflation_store is not None else default_inflation_store()
+        self.external_data = external_data if external_data is not None else default_external_registry()
+        self.max_concurrency = max_concurrency
+        self.prices = prices
+        self.inflation = inflation
+        self.local = local
+
+
+    def needs_network(self, tickers: list[str]) -> bool:
+        """Whether loading `tickers` would contact any remote source."""
+        return self._inflation_missing() or any(self.market_data.needs_refresh(ticker) for ticker in tickers)
+
+
+    def _inflation_missing(self) -> bool:
+        # A stale stored series is refreshed in the background by the store itself;
+        # only a missing one is worth waiting for
+        return not self.inflation_store.path.exists() and self.inflation_store.needs_refresh()
+
+
+    async def load(self, tickers: list[str], external_columns: list[str] = ()) -> dict[str, Any]:
+        """
+        Fetch the close prices of `tickers`, the HICP series and the external
+        `external_columns` concurrently.
+
+        Returns
+        -------
+        dict with "prices" ({ticker: Series}), "inflation" (possibly empty
+        Series) and "external" ({column: Series} for the columns some file
+        provides). Prices are required: a ticker that could be neither fetched
+        nor served from the cache raises once every source has finished; the
+        other sources degrade to what is available, with a warning.
+        """
+        tickers = list(dict.fromkeys(tickers))
+        external_columns = [column for column in dict.fromkeys(external_columns) if column in self.external_data]
+
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        results = await asyncio.gather(
+            *(self._ticker(ticker, semaphore) for ticker in tickers),
+            self._inflation(semaphore),
+            *(self._call(f"external series '{column}'", self.local, semaphore, self.external_data.get, column)
+              for column in external_columns),
+            return_exceptions=True
+        )
+
+        prices, inflation, external = (
+            results[:len(tickers)], results[len(tickers)], results[len(tickers) + 1:]
+        )
+        for error in prices:
+            if isinstance(error, BaseException):
+                raise error
+        for column, series in zip(external_columns, external):
+            if isinstance(series, BaseException):
+                warnings.warn(f"Could not read external series '{column}' ({series}); skipping it.")
+        return {
+            "prices":    dict(zip(tickers, prices)),
+            "inflation": inflation,
+            "external":  {c: s for c, s in zip(external_columns, external) if isinstance(s, pd.Series)},
+        }
+
+
+    def load_sync(self, tickers: list[str], external_columns: list[str] = ()) -> dict[str, Any]:
+        """`load` from synchronous code, including code already running inside an event loop."""
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(self.load(tickers, external_columns))
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            return executor.submit(asyncio.run, self.load(tickers, external_columns)).result()
+
+
+    async def _ticker(self, ticker: str, semaphore: asyncio.Semaphore) -> pd.Series:
+        if not self.market_data.needs_refresh(ticker):
+            return await self._call(f"cached prices for '{ticker}'", self.local, semaphore,
+                                    self.market_data.get_ticker, ticker)
+        try:
+            return await self._call(f"prices for '{ticker}'", self.prices, semaphore,
+                                    self.market_data.refresh, ticker)
+        except Exception as exc:
+            self.market_data.defer_refresh(ticker)
+            cached = await self._call(f"cached prices for '{ticker}'", self.local, semaphore,
+                                      self.market_data.load, ticker)
+            if cached is None:
+                raise
+            warnings.warn(f"Could not refresh prices for '{ticker}' ({exc}); serving cached data.")
+            return cached
+
+
+    async def _inflation(self, semaphore: asyncio.Semaphore) -> pd.Series:
+        # Only a missing series is waited for; a stale one is served as stored
+        # while the store refreshes it in the background
+        if self._inflation_missing():
+            try:
+                await self._call("HICP series", self.inflation, semaphore, self.inflation_store.refresh)
+            except Exception as exc:
+                self.inflation_store.defer_refresh()
+                warnings.warn(f"Could not fetch HICP data ({exc}); continuing without it.")
+        elif self.inflation_store.needs_refresh():
+            self.inflation_store.refresh_in_background()
+        try:
+            return await self._call("stored HICP series", self.local, semaphore, self.inflation_store.load)
+        except Exception as exc:
+            warnings.warn(f"Could not read stored HICP data ({exc}); continuing without it.")
+            return pd.Series(dtype=float)
+
+
+    async def _call(
+        self,
+        name: str,
+        policy: SourcePolicy,
+        semaphore: asyncio.Semaphore,
+        func: Callable,
+        *args
+    ) -> Any:
+        running: asyncio.Future | None = None
+        for attempt in range(policy.retries + 1):
+            if attempt and running is None:
+                await asyncio.sleep(policy.backoff * 2 ** (attempt - 1))
+            try:
+                async with semaphore:
+                    if running is None:
+                        running = _run_in_daemon_thread(func, *args)
+                    # shield: a timeout stops the wait, not the call the next attempt resumes
+                    return await asyncio.wait_for(asyncio.shield(running), policy.timeout)
+            except asyncio.TimeoutError:
+                error = TimeoutError(f"{name} timed out after {policy.timeout:g}s")
+            except Exception as exc:
+                error, running = exc, None
+        raise error
+
+
+
+def _run_in_daemon_thread(func: Callable, *args) -> asyncio.Future:
+    """
+    Run `func(*args)` on a new daemon thread and return a future of the running
+    loop for its result. Unlike an executor's workers, the thread never blocks
+    interpreter exit; a result arriving after the loop closed is dropped.
+    """
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+
+    def settle(setter, value) -> None:
+        if not future.done():
+            setter(value)
+
+    def run() -> None:
+        try:
+            outcome = (future.set_result, func(*args))
+        except BaseException as exc:
+            outcome = (future.set_exception, exc)
+        try:
+            loop.call_soon_threadsafe(settle, *outcome)
+        except RuntimeError:
+            pass                                    # loop already closed
+
+    threading.Thread(target=run, name="pytrade-loader", daemon=True).start()
+    return future
+
+
+
+_loaders: dict[tuple, AsyncDataLoader] = {}
+
+
+def default_async_loader(
+    market_data: MarketDataCache | None = None,
+    inflation_store: InflationStore | None = None,
+    external_data: ExternalSeriesRegistry | None = None
+) -> AsyncDataLoader:
+    """
+    Process-wide loader over the given caches (the process-wide ones when None),
+    shared by every caller using the same caches.
+    """
+    loader = AsyncDataLoader(market_data, inflation_store, external_data)
+    key = (loader.market_data, loader.inflation_store, loader.external_data)
+    return _loaders.setdefault(key, loader)
@@ -0,0 +1,129 @@
+import time
+import pandas as pd
+import pyarrow.parquet as pq
+from datetime import timedelta
+from functools import lru_cache
+from pathlib import Path
+
+
+EXTERNAL_DATA_DIR = Path(__file__).resolve().parent.parent.parent / "data" / "external"
+
+
+class ExternalSeriesRegistry:
+    """
+    Index of the monthly series stored in the external data directory.
+
+    Parquet schemas are scanned once (footers only, no data pages) to build a
+    column → files index. Series are then read one column at a time with column
+    projection and memoized in an LRU cache, so only the columns a portfolio
+    actually needs are ever loaded. When several files provide a column, they
+    are combined in file name order: earlier files win where they overlap and
+    later ones fill their gaps. Everything is rescanned when a file is added,
+    removed or rewritten (keyed on each file's modification time). Lookups check
+    the directory at most once per `recheck_interval`; `refresh` checks it now
+    (Portfolio does so once per load).
+
+    Parameters
+    ----------
+    directory         : Folder of Parquet files with a DatetimeIndex.
+    max_cached_series : LRU capacity of loaded series.
+    recheck_interval  : How long lookups trust the last directory check.
+    """
+
+    def __init__(
+        self,
+        directory: str | Path = EXTERNAL_DATA_DIR,
+        max_cached_series: int = 64,
+        recheck_interval: timedelta = timedelta(seconds=5)
+    ):
+        self.directory = Path(directory)
+        self.recheck_interval = recheck_interval
+        self._index: dict[str, list[Path]] = {}
+        self._signature: tuple[tuple[str, int], ...] | None = None
+        self._checked_at = 0.0
+        self._load = lru_cache(maxsize=max_cached_series)(self._read_series)
+
+
+    def refresh(self) -> None:
+        """Rescan now if any file was added, removed or rewritten since the last check."""
+        self._scan(force=True)
+
+
+    def _scan(self, force: bool = False) -> None:
+        now = time.monotonic()
+        if (
+            not force and self._signature is not None
+            and now - self._checked_at < self.recheck_interval.total_seconds()
+        ):
+            return
+        self._checked_at = now
+
+        paths = self._paths()
+        signature = tuple((str(path), path.stat().st_mtime_ns) for path in paths)
+        if signature == self._signature:
+            return
+
+        index: dict[str, list[Path]] = {}
+        for parquet_path in paths:
+            schema = pq.read_schema(parquet_path)
+            pandas_meta = schema.pandas_metadata or {}
+            index_columns = {c for c in pandas_meta.get("index_columns", []) if isinstance(c, str)}
+            for column in schema.names:
+                if column not in index_columns:
+                    index.setdefault(column, []).append(parquet_path)
+
+        self._index = index
+        self._signature = signature
+        self._load.cache_clear()
+
+
+    def _paths(self) -> list[Path]:
+        return sorted(self.directory.glob("*.parquet")) if self.directory.exists() else []
+
+
+    @property
+    def columns(self) -> set[str]:
+        self._scan()
+        return set(self._index)
+
+    def __contains__(self, column: str) -> bool:
+        self._scan()
+        return column in self._index
+
+
+    def get(self, column: str) -> pd.Series | None:
+        """
+        Month-end indexed series for `column`, or None when no file provides it
+        (or none of the providing files is indexed by date). The returned series
+        is shared with the cache and must not be modified in place.
+        """
+        self._scan()
+        if column not in self._index:
+            return None
+        return self._load(column)
+
+
+    def _read_series(self, column: str) -> pd.Series | None:
+        combined = None
+        for parquet_path in self._index[column]:
+            df = pd.read_parquet(parquet_path, columns=[column])
+            if not isinstance(df.index, pd.DatetimeIndex):
+                continue
+
+            # Normalize index to month-end to align with monthly portfolio data
+            series = df[column]
+            series.index = series.index + pd.offsets.MonthEnd(0)
+            combined = series if combined is None else combined.combine_first(series)
+        return combined
+
+
+
+_default_registry: ExternalSeriesRegistry | None = None
+
+
+def default_external_registry() -> ExternalSeriesRegistry:
+    """Process-wide registry used when callers do not supply their own."""
+    global _default_registry
+    if _default_registry is None:
+        _default_registry = ExternalSeriesRegistry()
+    return _default_registry
@@ -0,0 +1,293 @@
+import os
+import json
+import time
+import warnings
+import threading
+import numpy as np
+import pandas as pd
+import requests
+from abc import ABC, abstractmethod
+from datetime import timedelta
+from pathlib import Path
+from pytrade.utils.market_data import DEFAULT_CACHE_DIR, _env_flag
+
+
+ECB_HICP_PT_URL = (
+    "https://data-api.ecb.europa.eu/service/data/"
+    "ICP/M.PT.N.000000.4.ANR?format=jsondata"
+)
+
+
+def parse_ecb_jsondata(data: dict) -> pd.Series:
+    """
+    Parse an ECB SDMX-JSON ("jsondata") response holding a single monthly series
+    into a month-end indexed float Series.
+    """
+    series       = data["dataSets"][0]["series"]
+    observations = next(iter(series.values()))["observations"]
+    dates_raw    = data["structure"]["dimensions"]["observation"][0]["values"]
+
+    positions = np.fromiter(observations.keys(), dtype=int, count=len(observations))
+    values    = np.fromiter((obs[0] for obs in observations.values()), dtype=float, count=len(observations))
+    dates     = pd.to_datetime([d["id"] for d in dates_raw], format="%Y-%m") + pd.offsets.MonthEnd(0)
+
+    return pd.Series(values, index=dates[positions], dtype=float).sort_index()
+
+
+# ---------------------------------------------------------------------------
+# Sources
+# ---------------------------------------------------------------------------
+
+class InflationSource(ABC):
+    """
+    Where HICP observations (annual % change, monthly) come from.
+
+    `fetch` returns the observations from `start` onwards (all of them when
+    `start` is None) together with an opaque validator (e.g. an HTTP ETag) for
+    the next conditional request of the same `start`. It returns
+    (None, validator) when the source reports nothing has changed since
+    `validator`.
+    """
+
+    @abstractmethod
+    def fetch(
+        self,
+        start: pd.Timestamp | None = None,
+        validator: str | None = None
+    ) -> tuple[pd.Series | None, str | None]:
+        ...
+
+
+class EcbHicpSource(InflationSource):
+    """ECB Data Portal REST API. Point `url` at a stub server in tests."""
+
+    def __init__(self, url: str = ECB_HICP_PT_URL, timeout: float = 15):
+        self.url = url
+        self.timeout = timeout
+
+    def fetch(self, start=None, validator=None):
+        params  = {"startPeriod": start.strftime("%Y-%m")} if start is not None else {}
+        headers = {"If-None-Match": validator} if validator else {}
+
+        resp = requests.get(self.url, params=params, headers=headers, timeout=self.timeout)
+        if resp.status_code == 304:
+            return None, validator
+        resp.raise_for_status()
+        return parse_ecb_jsondata(resp.json()), resp.headers.get("ETag")
+
+
+class LocalFileSource(InflationSource):
+    """
+    A local file standing in for the API: either an ECB jsondata dump or a
+    Parquet/CSV file with a date index and a single column of annual % changes.
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+
+    def fetch(self, start=None, validator=None):
+        stamp = str(self.path.stat().st_mtime_ns)
+        if validator == stamp:
+            return None, validator
+
+        match self.path.suffix.lower():
+            case ".json":
+                hicp = parse_ecb_jsondata(json.loads(self.path.read_text()))
+            case ".parquet":
+                hicp = pd.read_parquet(self.path).iloc[:, 0]
+            case _:
+                hicp = pd.read_csv(self.path, index_col=0, parse_dates=True).iloc[:, 0]
+
+        hicp.index = pd.DatetimeIndex(hicp.index) + pd.offsets.MonthEnd(0)
+        if start is not None:
+            hicp = hicp[hicp.index >= start]
+        return hicp.astype(float), stamp
+
+
+# ---------------------------------------------------------------------------
+# Local store
+# ---------------------------------------------------------------------------
+
+class InflationStore:
+    """
+    Locally persisted HICP series with incremental, conditional refresh.
+
+    Reads are always served from disk. When the stored copy is older than `ttl`,
+    a refresh runs on a background thread: only the trailing `revision_window`
+    of months is re-requested (conditionally, when the source supports it) and
+    merged over the stored history. Only the very first load, with nothing on
+    disk, waits for the source — and returns an empty series if it fails (see
+    `load`).
+
+    Parameters
+    ----------
+    source            : Where observations come from. Defaults to the ECB API.
+    cache_dir         : Root of the store. Defaults to $PYTRADE_CACHE_DIR or data/cache.
+    name              : File stem of the stored series.
+    ttl               : Freshness window. None → never refresh once stored.
+    offline           : Never contact the source. Defaults to the PYTRADE_OFFLINE flag.
+    revision_window   : Trailing months re-requested on refresh to pick up revisions.
+    retry_after       : After a failed refresh, the source is not contacted again for this long.
+    """
+
+    def __init__(
+        self,
+        source: InflationSource | None = None,
+        cache_dir: str | Path | None = None,
+        name: str = "ecb_hicp_pt",
+        ttl: timedelta | None = timedelta(days=1),
+        offline: bool | None = None,
+        revision_window: int = 12,
+        retry_after: timedelta = timedelta(minutes=15)
+    ):
+        self.source = source if source is not None else EcbHicpSource()
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else DEFAULT_CACHE_DIR
+        self.name = name
+        self.ttl = ttl
+        self.offline = _env_flag("PYTRADE_OFFLINE") if offline is None else offline
+        self.revision_window = revision_window
+        self.retry_after = retry_after
+
+        self._lock = threading.Lock()
+        self._refresh_thread: threading.Thread | None = None
+        self._loaded: tuple[int, pd.Series] | None = None      # (file mtime_ns, series)
+        self._failed_at: float | None = None
+
+
+    @property
+    def path(self) -> Path:
+        return self.cache_dir / "inflation" / f"{self.name}.parquet"
+
+    @property
+    def _meta_path(self) -> Path:
+        return self.path.with_suffix(".json")
+
+
+    def is_fresh(self) -> bool:
+        if not self.path.exists():
+            return False
+        if self.ttl is None:
+            return True
+        return time.time() - self.path.stat().st_mtime < self.ttl.total_seconds()
+
+
+    def needs_refresh(self) -> bool:
+        """Whether load would contact the source (synchronously or in the background)."""
+        if self.offline:
+            return False
+        if self._failed_at is not None and time.time() - self._failed_at < self.retry_after.total_seconds():
+            return False
+        return not self.is_fresh()
+
+
+    def defer_refresh(self) -> None:
+        """Serve the stored series without contacting the source for `retry_after`."""
+        self._failed_at = time.time()
+
+
+    def load(self) -> pd.Series:
+        """
+        Stored HICP series (annual % change, month-end index).
+
+        Never raises for an unreachable source: when nothing is stored yet and
+        the first fetch fails (or the store is offline), a warning is issued
+        where applicable and an *empty* series is returned. Callers must check
+        for `.empty` and decide on a fallback (Portfolio uses its
+        `inflation_rate_fallback`).
+        """
+        if not self.path.exists():
+            if not self.needs_refresh():
+                return pd.Series(dtype=float)
+            try:
+                return self.refresh()
+            except Exception as exc:
+                warnings.warn(f"Could not fetch HICP data ({exc}); continuing without it.")
+                return pd.Series(dtype=float)
+
+        if self.needs_refresh():
+            self.refresh_in_background()
+
+        # Re-read only when the file changed (e.g. after a background refresh)
+        mtime = self.path.stat().st_mtime_ns
+        if self._loaded is None or self._loaded[0] != mtime:
+            self._loaded = (mtime, pd.read_parquet(self.path)["HICP"])
+        return self._loaded[1].copy()
+
+
+    def monthly_inflation(self) -> pd.Series:
+        """Stored series converted from annual % change to equivalent monthly rates."""
+        return (1 + self.load() / 100) ** (1 / 12) - 1
+
+
+    def refresh(self) -> pd.Series:
+        """Fetch new and revised observations from the source and persist them."""
+        try:
+            hicp = self._refresh()
+        except Exception:
+            self.defer_refresh()
+            raise
+        self._failed_at = None
+        return hicp
+
+
+    def _refresh(self) -> pd.Series:
+        with self._lock:
+            stored = pd.read_parquet(self.path)["HICP"] if self.path.exists() else None
+            meta = json.loads(self._meta_path.read_text()) if self._meta_path.exists() else {}
+
+            start = None
+            if stored is not None and len(stored):
+                start = stored.index[-1] - pd.offsets.MonthEnd(self.revision_window)
+
+            # A validator only vouches for the query that produced it: a full
+            # fetch's ETag says nothing about an incremental (startPeriod) request
+            query = start.strftime("%Y-%m") if start is not None else ""
+            latest, validator = self.source.fetch(
+                start=start,
+                validator=meta.get("validator") if stored is not None and meta.get("query") == query else None
+            )
+            if latest is None:
+                hicp = stored                               # not modified
+            elif stored is None:
+                hicp = latest
+            else:
+                hicp = latest.combine_first(stored)         # revisions win
+
+            self._write(hicp, query, validator)
+            return hicp
+
+
+    def refresh_in_background(self) -> None:
+        """Start a refresh on a daemon thread unless one is already running."""
+        if self._refresh_thread is not None and self._refresh_thread.is_alive():
+            return
+
+        def _run():
+            try:
+                self.refresh()
+            except Exception as exc:
+                warnings.warn(f"Background HICP refresh failed ({exc}); serving stored data.")
+
+        self._refresh_thread = threading.Thread(target=_run, daemon=True)
+        self._refresh_thread.start()
+
+
+    def _write(self, hicp: pd.Series, query: str, validator: str | None) -> None:
+        # Write-then-rename so concurrent readers never see a partial file
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".parquet.tmp")
+        hicp.rename("HICP").astype(float).to_frame().to_parquet(tmp_path)
+        os.replace(tmp_path, self.path)
+        self._meta_path.write_text(json.dumps({"query": query, "validator": validator}))
+
+
+
+_default_store: InflationStore | None = None
+
+
+def default_inflation_store() -> InflationStore:
+    """Process-wide store used when callers do not supply their own."""
+    global _default_store
+    if _default_store is None:
+        _default_store = InflationStore()
+    return _default_store
@@ -0,0 +1,221 @@
+import os
+import time
+import warnings
+import threading
+import pandas as pd
+import yfinance as yf
+from datetime import timedelta
+from functools import partial
+from pathlib import Path
+from typing import Callable
+
+
+DEFAULT_CACHE_DIR = Path(
+    os.environ.get(
+        "PYTRADE_CACHE_DIR",
+        Path(__file__).resolve().parent.parent.parent / "data" / "cache"
+    )
+)
+
+
+def _env_flag(name: str) -> bool:
+    return os.environ.get(name, "").strip().lower() in ("1", "true", "yes")
+
+
+class MarketDataCache:
+    """
+    Local Parquet store of daily (auto-adjusted) close prices, one file per ticker.
+
+    On request, a ticker is served from disk when its file was checked within
+    `ttl`. Otherwise only the trailing dates missing from the file are downloaded
+    from yfinance and appended. If the provider re-adjusted history in the
+    meantime (dividends, splits), the cached prices are rescaled onto the new
+    basis using the overlapping day, so returns across the seam stay correct.
+
+    Parameters
+    ----------
+    cache_dir   : Root of the store. Defaults to $PYTRADE_CACHE_DIR or data/cache.
+    ttl         : Freshness window. None → never refresh a cached ticker.
+    offline     : Never touch the network; serve only what is on disk. Defaults
+                  to the PYTRADE_OFFLINE environment flag, so test suites can run
+                  against a pre-seeded store (see `store`).
+    downloader  : `(ticker, start) -> close Series` used for refreshes; defaults to
+                  yfinance. Point it at a stub server in tests. A custom
+                  downloader must enforce its own request timeout.
+    retry_after : After a failed refresh, stale cached prices are served without
+                  retrying the provider for this long.
+    timeout     : Per-request timeout (seconds) of the default yfinance downloader.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str | Path | None = None,
+        ttl: timedelta | None = timedelta(hours=12),
+        offline: bool | None = None,
+        downloader: Callable[[str, pd.Timestamp | None], pd.Series] | None = None,
+        retry_after: timedelta = timedelta(minutes=15),
+        timeout: float = 30.0
+    ):
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else DEFAULT_CACHE_DIR
+        self.ttl = ttl
+        self.offline = _env_flag("PYTRADE_OFFLINE") if offline is None else offline
+        self.downloader = downloader if downloader is not None else partial(self._download, timeout=timeout)
+        self.retry_after = retry_after
+        self._failed_at: dict[str, float] = {}
+
+
+    def path(self, ticker: str) -> Path:
+        safe_name = "".join(c if c.isalnum() or c in "-_." else "_" for c in ticker)
+        return self.cache_dir / "prices" / f"{safe_name}.parquet"
+
+
+    def is_fresh(self, ticker: str) -> bool:
+        path = self.path(ticker)
+        if not path.exists():
+            return False
+        if self.ttl is None:
+            return True
+        return time.time() - path.stat().st_mtime < self.ttl.total_seconds()
+
+
+    def version(self, ticker: str) -> int | None:
+        """Modification time (ns) of the cached prices for `ticker`, None if never stored."""
+        try:
+            return self.path(ticker).stat().st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+
+    def load(self, ticker: str) -> pd.Series | None:
+        """Cached close prices for `ticker`, or None if it has never been stored."""
+        path = self.path(ticker)
+        if not path.exists():
+            return None
+        return pd.read_parquet(path)["Close"].rename(ticker)
+
+
+    def store(self, ticker: str, close: pd.Series) -> None:
+        """Write (or overwrite) the cached close prices for `ticker`."""
+        path = self.path(ticker)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        close = close.dropna().sort_index()
+        close = close[~close.index.duplicated(keep="last")]
+
+        # Write-then-rename so concurrent readers never see a partial file
+        tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        close.rename("Close").to_frame().to_parquet(tmp_path)
+        os.replace(tmp_path, path)
+
+
+    def needs_refresh(self, ticker: str) -> bool:
+        """Whether get_ticker would contact the provider for `ticker`."""
+        if self.offline:
+            return False
+        failed_at = self._failed_at.get(ticker)
+        if failed_at is not None and time.time() - failed_at < self.retry_after.total_seconds():
+            return False
+        return not self.is_fresh(ticker)
+
+
+    def defer_refresh(self, ticker: str) -> None:
+        """Serve cached prices for `ticker` without contacting the provider for `retry_after`."""
+        self._failed_at[ticker] = time.time()
+
+
+    def get_ticker(self, ticker: str) -> pd.Series:
+        """
+        Daily close prices for one ticker, refreshed incrementally when stale.
+        If the refresh fails, stale cached prices are served (with a warning).
+        """
+        cached = self.load(ticker)
+        if cached is None and self.offline:
+            raise RuntimeError(
+                f"No cached prices for '{ticker}' in {self.cache_dir} and offline mode is enabled."
+            )
+        if cached is not None and not self.needs_refresh(ticker):
+            return cached
+
+        try:
+            close = self._refresh(ticker, cached)
+        except Exception as exc:
+            self.defer_refresh(ticker)
+            if cached is None:
+                raise
+            warnings.warn(f"Could not refresh prices for '{ticker}' ({exc}); serving cached data.")
+            return cached
+
+        self._failed_at.pop(ticker, None)
+        return close
+
+
+    def refresh(self, ticker: str) -> pd.Series:
+        """Download new prices for `ticker` into the store, raising if the provider fails."""
+        close = self._refresh(ticker, self.load(ticker))
+        self._failed_at.pop(ticker, None)
+        return close
+
+
+    def get_close(self, tickers: list[str]) -> pd.DataFrame:
+        """
+        Daily close prices for `tickers` as a wide DataFrame (one column per
+        ticker, union of trading dates), refreshing stale tickers incrementally.
+        """
+        columns = {ticker: self.get_ticker(ticker) for ticker in dict.fromkeys(tickers)}
+        return pd.DataFrame(columns).sort_index()
+
+
+    def _refresh(self, ticker: str, cached: pd.Series | None) -> pd.Series:
+        if cached is None or cached.empty:
+            close = self.downloader(ticker, None)
+        else:
+            # Re-download from the last cached day so the overlap can detect
+            # back-adjustments of the provider's history.
+            latest = self.downloader(ticker, cached.index[-1])
+            close = self._merge(cached, latest)
+
+        if close.empty:
+            raise RuntimeError(f"No price data returned for '{ticker}'.")
+
+        self.store(ticker, close)
+        return close.rename(ticker)
+
+
+    @staticmethod
+    def _merge(cached: pd.Series, latest: pd.Series) -> pd.Series:
+        if latest.empty:
+            return cached
+
+        overlap = cached.index.intersection(latest.index)
+        if len(overlap):
+            anchor = overlap[-1]
+            cached = cached * (latest[anchor] / cached[anchor])
+
+        return pd.concat([cached[cached.index < latest.index[0]], latest])
+
+
+    @staticmethod
+    def _download(ticker: str, start: pd.Timestamp | None = None, timeout: float = 30.0) -> pd.Series:
+        # Ticker.history keeps its state per object, unlike yf.download's
+        # module-level buffers, so concurrent refreshes of different tickers are safe
+        kwargs = {"start": start.strftime("%Y-%m-%d")} if start is not None else {"period": "max"}
+        df = yf.Ticker(ticker).history(interval="1d", auto_adjust=True, actions=False, timeout=timeout, **kwargs)
+        if df is None or df.empty:
+            return pd.Series(dtype=float, name=ticker)
+
+        close = df["Close"]
+        if isinstance(close, pd.DataFrame):
+            close = close.iloc[:, 0]
+        close.index = pd.DatetimeIndex(close.index).tz_localize(None)
+        return close.dropna().rename(ticker)
+
+
+
+_default_cache: MarketDataCache | None = None
+
+
+def default_market_data_cache() -> MarketDataCache:
+    """Process-wide cache used when callers do not supply their own."""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = MarketDataCache()
+    return _default_cache
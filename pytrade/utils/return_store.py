@@ -0,0 +1,203 @@
+import threading
+import numpy as np
+import pandas as pd
+from pytrade.utils.market_data import MarketDataCache, default_market_data_cache
+
+
+# Separators of chained tickers: "A?FB=B" → A, falling back to B where A has no data
+COMPLEX_TICKER_STRUCTURES = ["?FB="]
+
+
+def split_ticker_chain(ticker: str, structures: list[str] = COMPLEX_TICKER_STRUCTURES) -> list[str]:
+    """Constituents of a (possibly chained) ticker, in fill order."""
+    for cts in structures:
+        ticker = ticker.replace(cts, "?")
+    return ticker.split("?")
+
+
+# ---------------------------------------------------------------------------
+# Columnar daily → monthly transform
+# ---------------------------------------------------------------------------
+
+def chained_daily_returns(close: pd.DataFrame, chains: list[list[str]]) -> np.ndarray:
+    """
+    Daily returns (D, P) of P chained tickers from a wide close-price frame.
+
+    Prices are forward filled before differencing (pandas' pct_change pad
+    semantics), then each chain takes, per day, the first constituent with data
+    according to a precomputed (P, K) fill-order index. Days on which none of a
+    chain's constituents quoted are NaN, so every column only depends on its
+    own constituents and not on the other tickers sharing the frame.
+    """
+    prices = close.to_numpy(dtype=float)
+    num_days, num_columns = prices.shape
+
+    # Short chains and constituents missing from the frame both point at the
+    # all-NaN padding column appended below
+    fill_order = np.full((len(chains), max(len(chain) for chain in chains)), num_columns)
+    for row, chain in enumerate(chains):
+        positions = close.columns.get_indexer(chain)
+        fill_order[row, :len(chain)] = np.where(positions < 0, num_columns, positions)
+
+    # Forward fill: carry the row of the last valid observation per column
+    valid = ~np.isnan(prices)
+    last_valid = np.where(valid, np.arange(num_days)[:, None], 0)
+    np.maximum.accumulate(last_valid, axis=0, out=last_valid)
+    prices = np.take_along_axis(prices, last_valid, axis=0)
+
+    returns = np.full((num_days, num_columns + 1), np.nan)                  # last column: chain padding
+    returns[1:, :-1] = prices[1:] / prices[:-1] - 1
+
+    chained = returns[:, fill_order]                                        # (D, P, K)
+    first_available = np.argmax(~np.isnan(chained), axis=2)[..., None]
+    chained_returns = np.take_along_axis(chained, first_available, axis=2)[..., 0]
+
+    quoted = np.pad(valid, ((0, 0), (0, 1)))[:, fill_order].any(axis=2)
+    chained_returns[~quoted] = np.nan
+    return chained_returns
+
+
+def apply_leverage_factor(
+    returns: np.ndarray,
+    leverage_factor: np.ndarray,
+    expense_ratio: np.ndarray
+) -> np.ndarray:
+    """Daily-reset leverage and its financing/expense drag, broadcast over columns."""
+    SW = 1.1
+    FFR = 0.03
+
+    leverage_factor = np.asarray(leverage_factor, dtype=float)
+    expense_ratio = np.asarray(expense_ratio, dtype=float)
+
+    E = 0.005 * (leverage_factor - 1)
+    SP = np.sign(leverage_factor) * 0.004
+
+    cost_of_leverage = SW * (leverage_factor - 1) * (FFR + SP) + E
+    return returns * leverage_factor - ((cost_of_leverage + expense_ratio) / 365)
+
+
+def resample_monthly(dates: pd.DatetimeIndex, returns: np.ndarray) -> tuple[pd.DatetimeIndex, np.ndarray]:
+    """
+    Compound daily returns into calendar months, like
+    `(1 + df).resample("ME").prod(min_count=1) - 1`: days without data are
+    skipped and months without any data are NaN. Returns the month-end index
+    (every month from the first to the last date) and the (M, P) matrix.
+    """
+    months = dates.year * 12 + dates.month - 1
+    month_starts = np.flatnonzero(np.r_[True, months[1:] != months[:-1]])
+
+    growth = np.where(np.isnan(returns), 1.0, 1 + returns)
+    monthly = np.multiply.reduceat(growth, month_starts, axis=0) - 1
+    observed = np.logical_or.reduceat(~np.isnan(returns), month_starts, axis=0)
+    monthly[~observed] = np.nan
+
+    month_ends = pd.DatetimeIndex(dates[month_starts]) + pd.offsets.MonthEnd(0)
+    full_range = pd.date_range(month_ends[0], month_ends[-1], freq="ME")
+    out = np.full((len(full_range), monthly.shape[1]), np.nan)
+    out[full_range.get_indexer(month_ends)] = monthly
+    return full_range, out
+
+
+# ---------------------------------------------------------------------------
+# Store
+# ---------------------------------------------------------------------------
+
+class MonthlyReturnStore:
+    """
+    Process-wide memo of monthly returns per (ticker, leverage, expense_ratio).
+
+    The first request for a key computes it from the market data cache (all
+    missing keys of a request in one columnar pass); later requests, from any
+    Portfolio, reuse the stored series. Stored values are read-only NumPy
+    arrays and are shared, never copied, by the returned Series.
+
+    Each series remembers the cache file versions of its constituents and is
+    recomputed once any of them is rewritten, or is due for a refresh.
+
+    Parameters
+    ----------
+    market_data : Source of daily close prices. Defaults to the process-wide cache.
+    """
+
+    def __init__(self, market_data: MarketDataCache | None = None):
+        self.market_data = market_data if market_data is not None else default_market_data_cache()
+        self._series: dict[tuple[str, float, float], pd.Series] = {}
+        self._versions: dict[tuple[str, float, float], tuple[int | None, ...]] = {}
+        self._lock = threading.Lock()
+
+
+    def __contains__(self, key: tuple[str, float, float]) -> bool:
+        """Whether `key` is memoized and still matches the market data cache."""
+        return key in self._series and self._is_current(key)
+
+    def __len__(self) -> int:
+        return len(self._series)
+
+    def clear(self) -> None:
+        """Drop every memoized series."""
+        with self._lock:
+            self._series.clear()
+            self._versions.clear()
+
+
+    def _constituent_versions(self, ticker: str) -> tuple[int | None, ...]:
+        return tuple(self.market_data.version(t) for t in split_ticker_chain(ticker))
+
+    def _is_current(self, key: tuple[str, float, float]) -> bool:
+        chain = split_ticker_chain(key[0])
+        return (
+            self._versions.get(key) == self._constituent_versions(key[0])
+            and not any(self.market_data.needs_refresh(t) for t in chain)
+        )
+
+
+    def get(self, keys: list[tuple[str, float, float]]) -> dict[tuple[str, float, float], pd.Series]:
+        """
+        Monthly returns (month-end index, from the first to the last month with
+        data) for each (ticker, leverage, expense_ratio) key.
+        """
+        keys = [(ticker, float(leverage), float(expense_ratio)) for ticker, leverage, expense_ratio in keys]
+        with self._lock:
+            missing = [key for key in dict.fromkeys(keys) if key not in self]
+            if missing:
+                self._series.update(self._compute(missing))
+                # Versions after the computation, which may have refreshed the cache
+                self._versions.update({key: self._constituent_versions(key[0]) for key in missing})
+            return {key: self._series[key] for key in keys}
+
+
+    def _compute(self, keys: list[tuple[str, float, float]]) -> dict[tuple[str, float, float], pd.Series]:
+        chains = [split_ticker_chain(ticker) for ticker, _, _ in keys]
+        close = self.market_data.get_close([t for chain in chains for t in chain])
+
+        daily_returns = apply_leverage_factor(
+            chained_daily_returns(close, chains),
+            leverage_factor=[leverage for _, leverage, _ in keys],
+            expense_ratio=[expense_ratio for _, _, expense_ratio in keys]
+        )
+        month_ends, monthly = resample_monthly(close.index, daily_returns)
+
+        series = {}
+        for column, key in enumerate(keys):
+            observed = np.flatnonzero(~np.isnan(monthly[:, column]))
+            rows = slice(observed[0], observed[-1] + 1) if len(observed) else slice(0, 0)
+
+            values = monthly[rows, column].copy()
+            values.flags.writeable = False
+            series[key] = pd.Series(values, index=month_ends[rows], name=key[0], copy=False)
+        return series
+
+
+
+_stores: dict[MarketDataCache, MonthlyReturnStore] = {}
+
+
+def default_monthly_return_store(market_data: MarketDataCache | None = None) -> MonthlyReturnStore:
+    """
+    Process-wide store for `market_data` (the default cache when None), shared
+    by every caller using the same market data cache.
+    """
+    market_data = market_data if market_data is not None else default_market_data_cache()
+    if market_data not in _stores:
+        _stores[market_data] = MonthlyReturnStore(market_data)
+    return _stores[market_data]
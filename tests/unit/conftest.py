@@ -0,0 +1,41 @@
+import numpy as np
+import pandas as pd
+import pytest
+from pytrade.data_models.portfolio import Portfolio, StockPosition
+from pytrade.utils.external_data import ExternalSeriesRegistry
+from pytrade.utils.inflation import InflationStore
+from pytrade.utils.market_data import MarketDataCache
+from pytrade.utils.return_store import MonthlyReturnStore
+
+
+@pytest.fixture
+def market_data(tmp_path):
+    """Offline price cache pre-seeded with synthetic daily closes."""
+    cache = MarketDataCache(tmp_path / "cache", offline=True)
+    rng = np.random.default_rng(1)
+    for ticker, start in {"SPY": "1995-01-03", "GLD": "2004-11-18", "QQQ": "2000-01-03"}.items():
+        index = pd.bdate_range(start, "2024-12-31")
+        cache.store(ticker, pd.Series(100 * np.cumprod(1 + rng.normal(3e-4, 0.01, len(index))), index=index))
+    return cache
+
+
+@pytest.fixture
+def inflation_store(tmp_path):
+    store = InflationStore(cache_dir=tmp_path / "cache", offline=True)
+    hicp = pd.Series(
+        np.random.default_rng(2).normal(2.0, 1.0, 300),
+        index=pd.date_range("1997-01-31", periods=300, freq="ME")
+    )
+    store._write(hicp, "", None)
+    return store
+
+
+@pytest.fixture
+def make_portfolio(tmp_path, market_data, inflation_store):
+    """Portfolio factory over the offline caches; keyword arguments go to Portfolio."""
+    def make(positions=(("SPY", 0.6), ("GLD", 0.4)), **kwargs):
+        kwargs.setdefault("return_store", MonthlyReturnStore(market_data))
+        kwargs.setdefault("inflation_store", inflation_store)
+        kwargs.setdefault("external_data", ExternalSeriesRegistry(tmp_path / "external"))
+        return Portfolio([StockPosition(*position) for position in positions], **kwargs)
+    return make
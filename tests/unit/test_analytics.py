@@ -0,0 +1,126 @@
+import numpy as np
+import pytest
+from scipy.stats import spearmanr
+from pytrade.data_models.analytics import PortfolioAnalytics
+from pytrade.data_models.simulation import BaseSimulationResults
+
+
+def _reference_events(returns_2d):
+    """Per-row drawdown extraction, one event at a time."""
+    events = []
+    for row in returns_2d:
+        wealth = np.cumprod(1 + row)
+        dd = wealth / np.maximum.accumulate(wealth) - 1
+        in_dd = dd < -1e-10
+
+        t = 0
+        while t < len(dd):
+            if not in_dd[t]:
+                t += 1
+                continue
+            start = t
+            while t < len(dd) and in_dd[t]:
+                t += 1
+            trough = start + int(np.argmin(dd[start:t]))
+            recovered = t < len(dd)
+            events.append((
+                -dd[trough], t - (start - 1), trough - (start - 1),
+                (t - trough) if recovered else np.nan, recovered
+            ))
+    return events
+
+
+def _events(results):
+    output = results.simulation_output
+    return list(zip(
+        output["depths"], output["durations"], output["times_to_trough"],
+        output["recovery_times"], output["recovered"]
+    ))
+
+
+@pytest.mark.parametrize("shape", [(1, 1), (1, 2), (5, 2), (40, 120), (3, 500)])
+def test_drawdowns_match_per_row_reference(shape):
+    returns = np.random.default_rng(sum(shape)).normal(0.005, 0.05, shape)
+    got = _events(PortfolioAnalytics().analyze_drawdowns(returns))
+    expected = _reference_events(returns)
+
+    assert len(got) == len(expected)
+    for event, reference in zip(got, expected):
+        np.testing.assert_equal(event, reference)
+
+
+def test_no_drawdowns():
+    results = PortfolioAnalytics().analyze_drawdowns(np.full((4, 12), 0.01))
+    assert all(len(values) == 0 for values in results.simulation_output.values())
+
+
+def test_open_and_closed_drawdowns_on_the_same_matrix():
+    returns = np.array([
+        [0.10, -0.20, 0.05, 0.30, 0.01],        # recovers in month 3
+        [0.10, 0.05, -0.10, -0.10, 0.02],       # still under water at the end
+        [-0.50, 0.00, 0.00, 0.00, 0.00],        # first month is its own peak: no event
+    ])
+    output = PortfolioAnalytics().analyze_drawdowns(returns).simulation_output
+
+    assert output["recovered"].tolist() == [True, False]
+    assert output["durations"].tolist() == [3, 4]                # peak month 0 → 3, peak 1 → end (5)
+    assert output["times_to_trough"].tolist() == [1, 2]
+    assert output["recovery_times"][0] == 2 and np.isnan(output["recovery_times"][1])
+    np.testing.assert_allclose(output["depths"], [0.2, 1 - 0.9 * 0.9])
+
+
+def test_single_path_as_1d_array():
+    returns = np.random.default_rng(0).normal(0.0, 0.05, 60)
+    np.testing.assert_equal(
+        _events(PortfolioAnalytics().analyze_drawdowns(returns)),
+        _events(PortfolioAnalytics().analyze_drawdowns(returns[None, :]))
+    )
+
+
+def _sequence_results(returns, terminal_values):
+    return BaseSimulationResults(simulation_output={
+        "sampled_returns": returns,
+        "portfolio_value": np.column_stack([np.ones(len(returns)), terminal_values]),
+    })
+
+
+def _reference_sensitivity(returns, terminal_values, months_per_period):
+    total_return = np.prod(1 + returns, axis=1) - 1
+    r_YZ = spearmanr(terminal_values, total_return).statistic
+    correlation, partial = [], []
+    for start in range(0, returns.shape[1] - months_per_period + 1, months_per_period):
+        period_return = np.prod(1 + returns[:, start:start + months_per_period], axis=1) - 1
+        r_XY = spearmanr(period_return, terminal_values).statistic
+        r_XZ = spearmanr(period_return, total_return).statistic
+        denom = np.sqrt((1 - r_XZ ** 2) * (1 - r_YZ ** 2))
+        correlation.append(r_XY)
+        partial.append((r_XY - r_XZ * r_YZ) / denom if denom > 1e-10 else 0.0)
+    return np.array(correlation), np.array(partial)
+
+
+@pytest.mark.parametrize("resolution, months_per_period, prefix", [("yearly", 12, "annual"), ("monthly", 1, "monthly")])
+def test_sequence_sensitivity_matches_spearmanr_per_period(resolution, months_per_period, prefix):
+    rng = np.random.default_rng(4)
+    returns = np.round(rng.normal(0.005, 0.04, (300, 40)), 3)          # rounding creates ties
+    terminal_values = np.maximum(np.prod(1 + returns, axis=1) * rng.uniform(0.5, 1.5, 300) - 0.6, 0)
+
+    output = PortfolioAnalytics().analyze_sequence_sensitivity(
+        _sequence_results(returns, terminal_values), resolution=resolution
+    ).simulation_output
+    correlation, partial = _reference_sensitivity(returns, terminal_values, months_per_period)
+
+    assert len(correlation) == 40 // months_per_period
+    np.testing.assert_allclose(output[f"{prefix}_correlation"], correlation, rtol=1e-10, atol=1e-12)
+    np.testing.assert_allclose(output[f"{prefix}_partial_correlation"], partial, rtol=1e-10, atol=1e-12)
+
+
+@pytest.mark.parametrize("resolution", ["yearly", "monthly"])
+def test_sequence_sensitivity_with_every_path_depleted(resolution):
+    returns = np.random.default_rng(5).normal(0.0, 0.04, (50, 24))
+    output = PortfolioAnalytics().analyze_sequence_sensitivity(
+        _sequence_results(returns, np.zeros(50)), resolution=resolution
+    ).simulation_output
+
+    prefix = "annual" if resolution == "yearly" else "monthly"
+    assert np.isnan(output[f"{prefix}_correlation"]).all()
+    assert (output[f"{prefix}_partial_correlation"] == 0.0).all()
@@ -0,0 +1,132 @@
+import os
+import subprocess
+import sys
+import threading
+import time
+import numpy as np
+import pandas as pd
+from datetime import timedelta
+from pathlib import Path
+from pytrade.utils.async_loader import AsyncDataLoader, SourcePolicy
+from pytrade.utils.external_data import ExternalSeriesRegistry
+from pytrade.utils.inflation import InflationSource, InflationStore
+from pytrade.utils.market_data import MarketDataCache
+
+
+def _close(ticker, start=None):
+    index = pd.bdate_range("2020-01-01", periods=50)
+    close = pd.Series(np.linspace(100.0, 110.0, len(index)), index=index, name=ticker)
+    return close if start is None else close[close.index >= start]
+
+
+class StaticSource(InflationSource):
+    def __init__(self):
+        self.calls = 0
+
+    def fetch(self, start=None, validator=None):
+        self.calls += 1
+        return pd.Series(2.0, index=pd.date_range("2020-01-31", periods=24, freq="ME")), None
+
+
+def _loader(tmp_path, downloader, inflation_store=None, **kwargs):
+    market_data = MarketDataCache(tmp_path / "cache", offline=False, downloader=downloader)
+    if inflation_store is None:
+        inflation_store = InflationStore(StaticSource(), cache_dir=tmp_path / "cache", offline=True)
+    return AsyncDataLoader(market_data, inflation_store, ExternalSeriesRegistry(tmp_path / "external"), **kwargs)
+
+
+def test_timed_out_call_is_awaited_again_instead_of_repeated(tmp_path):
+    calls, release = [], threading.Event()
+
+    def slow_downloader(ticker, start):
+        calls.append(ticker)
+        assert release.wait(10)
+        return _close(ticker, start)
+
+    loader = _loader(tmp_path, slow_downloader, prices=SourcePolicy(timeout=0.1, retries=5, backoff=0.0))
+    threading.Timer(0.25, release.set).start()
+
+    result = loader.load_sync(["SPY"])
+
+    assert calls == ["SPY"]
+    assert len(result["prices"]["SPY"]) == 50
+
+
+class SlowSource(StaticSource):
+    def __init__(self):
+        super().__init__()
+        self.release = threading.Event()
+
+    def fetch(self, start=None, validator=None):
+        assert self.release.wait(10)
+        return super().fetch(start, validator)
+
+
+def _stale_store(tmp_path, source):
+    store = InflationStore(source, cache_dir=tmp_path / "cache", offline=False, ttl=timedelta(hours=1))
+    store._write(pd.Series(1.0, index=pd.date_range("2019-01-31", periods=12, freq="ME")), "", None)
+    two_hours_ago = time.time() - 7200
+    os.utime(store.path, (two_hours_ago, two_hours_ago))
+    return store
+
+
+def test_stale_inflation_file_is_served_and_refreshed_in_background(tmp_path):
+    source = SlowSource()
+    store = _stale_store(tmp_path, source)
+    loader = _loader(tmp_path, _close, inflation_store=store)
+
+    assert not loader.needs_network([])
+    started = time.time()
+    inflation = loader.load_sync([])["inflation"]
+    assert time.time() - started < 5
+    assert inflation.index[-1] == pd.Timestamp("2019-12-31")
+
+    source.release.set()
+    store._refresh_thread.join(10)
+    assert source.calls == 1
+    assert store.load().index[-1] == pd.Timestamp("2021-12-31")
+
+
+def test_portfolio_over_a_stale_inflation_store_does_not_wait(tmp_path, make_portfolio):
+    source = SlowSource()
+    store = _stale_store(tmp_path, source)
+
+    started = time.time()
+    portfolio = make_portfolio(inflation_store=store)
+    assert time.time() - started < 5
+    assert "INFLATION" in portfolio.data
+
+    source.release.set()
+    store._refresh_thread.join(10)
+
+
+def test_hung_source_does_not_block_interpreter_exit(tmp_path):
+    script = f"""
+import threading, warnings
+from pathlib import Path
+from pytrade.utils.async_loader import AsyncDataLoader, SourcePolicy
+from pytrade.utils.external_data import ExternalSeriesRegistry
+from pytrade.utils.inflation import InflationStore
+from pytrade.utils.market_data import MarketDataCache
+
+def hang(ticker, start):
+    threading.Event().wait()
+
+root = Path({str(tmp_path)!r})
+loader = AsyncDataLoader(
+    MarketDataCache(root / "cache", offline=False, downloader=hang),
+    InflationStore(cache_dir=root / "cache", offline=True),
+    ExternalSeriesRegistry(root / "external"),
+    prices=SourcePolicy(timeout=0.1, retries=0),
+)
+try:
+    loader.load_sync(["SPY"])
+except TimeoutError:
+    print("timed out")
+"""
+    started = time.time()
+    completed = subprocess.run(
+        [sys.executable, "-c", script], capture_output=True, text=True, timeout=60, cwd=Path(__file__).parents[2]
+    )
+    assert completed.stdout.strip() == "timed out", completed.stderr
+    assert time.time() - started < 30
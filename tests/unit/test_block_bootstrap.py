@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+from pytrade.simulation.utils import block_indices_from_uniforms, block_resample_indices
+
+
+def _block_starts(indices, n):
+    """Positions (after the first) where the path does not continue the previous index."""
+    return np.diff(indices, axis=1) % n != 1
+
+
+def test_explicit_uniforms_give_the_expected_blocks():
+    n = 10
+    starts  = [0.9, 0.9, 0.1, 0.9, 0.1, 0.9, 0.9]      # p = 0.5: blocks open at columns 0, 2 and 4
+    offsets = [0.35, 0.0, 0.15, 0.0, 0.85, 0.0, 0.0]
+    indices = block_indices_from_uniforms(np.array([starts + offsets]), n, block_length=2)
+
+    # Column 0 always opens a block; the block opened at column 4 starts at 8 and wraps
+    assert indices.tolist() == [[3, 4, 1, 2, 8, 9, 0]]
+
+
+def test_indices_wrap_around_and_stay_in_range():
+    n = 12
+    indices = block_resample_indices(n, num_resamples=500, resample_sequence_length=60, block_length=10, seed=0)
+
+    assert indices.shape == (500, 60)
+    assert indices.min() >= 0 and indices.max() < n
+    steps = np.diff(indices, axis=1)
+    assert ((indices[:, :-1] == n - 1) & (indices[:, 1:] == 0)).any()      # n - 1 → 0 inside a block
+    assert (steps[~_block_starts(indices, n)] % n == 1).all()
+
+
+@pytest.mark.parametrize("block_length", [1, 5, 24])
+def test_mean_block_length_matches_for_a_scalar(block_length):
+    n = 100_000
+    indices = block_resample_indices(n, num_resamples=2000, resample_sequence_length=240,
+                                     block_length=block_length, seed=1)
+    start_rate = _block_starts(indices, n).mean()
+    assert 1 / start_rate == pytest.approx(block_length, rel=0.05)
+
+
+def test_mean_block_length_per_path():
+    n = 100_000
+    block_length = np.tile([3.0, 30.0], 1000)
+    indices = block_resample_indices(n, num_resamples=2000, resample_sequence_length=240,
+                                     block_length=block_length, seed=2)
+    starts = _block_starts(indices, n)
+
+    assert 1 / starts[0::2].mean() == pytest.approx(3.0, rel=0.05)
+    assert 1 / starts[1::2].mean() == pytest.approx(30.0, rel=0.05)
+
+
+@pytest.mark.parametrize("block_length", [11, np.array([5.0, 11.0])])
+def test_block_length_longer_than_the_series_is_rejected(block_length):
+    with pytest.raises(ValueError):
+        block_resample_indices(10, num_resamples=2, resample_sequence_length=5, block_length=block_length, seed=0)
@@ -0,0 +1,84 @@
+import numpy as np
+import pytest
+from pytrade.simulation.utils import EXIT_REASONS, apply_exit_rules, apply_stop_loss
+
+
+def _exit(paths, **kwargs):
+    adjusted, exit_day, exit_pnl, exit_reason = apply_exit_rules(np.array(paths, dtype=float), **kwargs)
+    return adjusted, exit_day.tolist(), exit_pnl.tolist(), [EXIT_REASONS[r] for r in exit_reason]
+
+
+def test_stop_is_checked_before_take_profit():
+    # Take-profit level (0.5) below the stop (1.0): a day at 0.8 triggers both
+    _, exit_day, exit_pnl, reason = _exit([[0.8, 2.0]], credit=1.0, stop_loss=1.0, take_profit=0.5)
+    assert (exit_day, exit_pnl, reason) == ([0], [1.0], ["stop_loss"])
+
+
+def test_higher_of_stop_loss_and_trailing_stop_wins():
+    # Trail at 2.0 - 1.0 = 1.0 is above the stop-loss
+    _, exit_day, exit_pnl, reason = _exit([[2.0, 0.5, 3.0]], stop_loss=-1.0, trailing_stop=1.0)
+    assert (exit_day, exit_pnl, reason) == ([1], [1.0], ["trailing_stop"])
+
+    # Trail at 0.2 - 5.0 = -4.8 is below it
+    _, exit_day, exit_pnl, reason = _exit([[0.2, -3.0, 3.0]], stop_loss=-1.0, trailing_stop=5.0)
+    assert (exit_day, exit_pnl, reason) == ([1], [-1.0], ["stop_loss"])
+
+
+def test_take_profit_is_checked_before_time_exit():
+    kwargs = dict(credit=2.0, take_profit=0.5, exit_dte=2, final_dte=0)     # time exit on column 1
+    _, exit_day, exit_pnl, reason = _exit([[0.0, 1.5, 0.0, 0.0], [0.0, 0.5, 0.0, 0.0]], **kwargs)
+    assert exit_day == [1, 1]
+    assert exit_pnl == [1.0, 0.5]
+    assert reason == ["take_profit", "time"]
+
+
+@pytest.mark.parametrize(
+    "final_dte, exit_dte, expected_day",
+    [
+        (0, 0, 9),              # exit on expiry: last column
+        (0, 3, 6),
+        (5, 7, 7),              # column j has final_dte + (T - 1 - j) days to expiry
+        (5, 30, 0),             # already within exit_dte at entry
+    ]
+)
+def test_time_exit_column(final_dte, exit_dte, expected_day):
+    paths = np.arange(10, dtype=float)[None, :] / 100
+    adjusted, exit_day, exit_pnl, reason = _exit(paths, exit_dte=exit_dte, final_dte=final_dte)
+
+    assert exit_day == [expected_day] and reason == ["time"]
+    assert exit_pnl == [paths[0, expected_day]]
+    assert (adjusted[0, expected_day:] == paths[0, expected_day]).all()
+
+
+def test_time_exit_after_the_horizon_never_triggers():
+    paths = np.zeros((1, 10))
+    _, exit_day, _, reason = _exit(paths, exit_dte=2, final_dte=5)
+    assert exit_day == [9] and reason == ["expiry"]
+
+
+def test_column_zero_is_a_trading_day_unlike_apply_stop_loss():
+    paths = np.array([[-5.0, 0.0, 0.0],
+                      [0.0, -5.0, 0.0]])
+
+    adjusted, exit_day, _, reason = _exit(paths, stop_loss=-1.0)
+    assert exit_day == [0, 1] and reason == ["stop_loss", "stop_loss"]
+    assert adjusted.tolist() == [[-1.0, -1.0, -1.0], [0.0, -1.0, -1.0]]
+
+    # apply_stop_loss treats column 0 as the entry and never checks it
+    legacy = apply_stop_loss(paths.copy(), -1.0)
+    assert legacy[0].tolist() == [-5.0, 0.0, 0.0]
+    assert legacy[1].tolist() == adjusted[1].tolist()
+
+
+def test_inplace_overwrites_the_input():
+    paths = np.array([[0.0, -5.0, 1.0]])
+    adjusted, *_ = apply_exit_rules(paths, stop_loss=-1.0, inplace=True)
+    assert adjusted is paths and paths.tolist() == [[0.0, -1.0, -1.0]]
+
+    with pytest.raises(ValueError):
+        apply_exit_rules(paths.astype(np.float32), stop_loss=-1.0, inplace=True)
+
+
+def test_take_profit_requires_a_credit():
+    with pytest.raises(ValueError):
+        apply_exit_rules(np.zeros((1, 3)), take_profit=0.5)
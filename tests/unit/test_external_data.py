@@ -0,0 +1,72 @@
+import os
+import pandas as pd
+from datetime import timedelta
+from pytrade.utils.external_data import ExternalSeriesRegistry
+
+
+def _write(path, column, values, start):
+    index = pd.date_range(start, periods=len(values), freq="MS")
+    pd.DataFrame({column: values}, index=index).to_parquet(path)
+
+
+def test_overwritten_file_is_reread(tmp_path):
+    path = tmp_path / "a.parquet"
+    _write(path, "SPY", [0.01, 0.02], "2000-01-01")
+    registry = ExternalSeriesRegistry(tmp_path)
+    assert registry.get("SPY").tolist() == [0.01, 0.02]
+
+    # Rewrite in place: the directory's own mtime does not change
+    directory_mtime = tmp_path.stat().st_mtime_ns
+    _write(path, "SPY", [0.03, 0.04], "2000-01-01")
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    os.utime(tmp_path, ns=(directory_mtime, directory_mtime))
+
+    assert registry.get("SPY").tolist() == [0.01, 0.02]     # within recheck_interval
+    registry.refresh()
+    assert registry.get("SPY").tolist() == [0.03, 0.04]
+
+
+def test_later_files_fill_gaps_of_earlier_ones(tmp_path):
+    _write(tmp_path / "a.parquet", "SPY", [0.01, None, 0.03], "2000-03-01")
+    _write(tmp_path / "b.parquet", "SPY", [0.10, 0.20, 0.30, 0.40, 0.50], "2000-01-01")
+
+    series = ExternalSeriesRegistry(tmp_path).get("SPY")
+
+    assert series.index[0] == pd.Timestamp("2000-01-31")
+    assert series.tolist() == [0.10, 0.20, 0.01, 0.40, 0.03]
+
+
+def test_files_without_a_date_index_are_ignored(tmp_path):
+    pd.DataFrame({"SPY": [1.0, 2.0]}).to_parquet(tmp_path / "a.parquet")
+    registry = ExternalSeriesRegistry(tmp_path)
+    assert "SPY" in registry
+    assert registry.get("SPY") is None
+
+    _write(tmp_path / "b.parquet", "SPY", [0.01], "2000-01-01")
+    registry.refresh()
+    assert registry.get("SPY").tolist() == [0.01]
+
+
+def test_lookups_do_not_rescan_within_recheck_interval(tmp_path, make_portfolio):
+    for name in "abcdefgh":
+        _write(tmp_path / f"{name}.parquet", f"X_{name}", [0.01], "2000-01-01")
+    registry = ExternalSeriesRegistry(tmp_path, recheck_interval=timedelta(hours=1))
+    scans = []
+    paths = registry._paths
+    registry._paths = lambda: scans.append(1) or paths()
+
+    for _ in range(50):
+        assert "X_a" in registry and registry.get("SPY") is None
+    assert len(scans) == 1
+
+    make_portfolio(external_data=registry)                  # one check per load
+    assert len(scans) == 2
+
+    registry = ExternalSeriesRegistry(tmp_path, recheck_interval=timedelta(0))
+    _write(tmp_path / "i.parquet", "SPY", [0.02], "2000-01-01")
+    assert registry.get("SPY").tolist() == [0.02]
+    _write(tmp_path / "i.parquet", "SPY", [0.03], "2000-01-01")
+    stat = (tmp_path / "i.parquet").stat()
+    os.utime(tmp_path / "i.parquet", ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    assert registry.get("SPY").tolist() == [0.03]
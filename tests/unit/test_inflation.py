@@ -0,0 +1,56 @@
+import pandas as pd
+import pytest
+from pytrade.utils.inflation import InflationSource, InflationStore
+
+
+class RecordingSource(InflationSource):
+    """Serves a fixed series; answers "not modified" whenever handed back its last validator."""
+
+    def __init__(self, hicp: pd.Series):
+        self.hicp = hicp
+        self.calls: list[tuple[pd.Timestamp | None, str | None]] = []
+
+    def fetch(self, start=None, validator=None):
+        self.calls.append((start, validator))
+        etag = "full" if start is None else f"since-{start:%Y-%m}"
+        if validator == etag:
+            return None, validator
+        return (self.hicp if start is None else self.hicp[self.hicp.index >= start]), etag
+
+
+class FailingSource(InflationSource):
+    def fetch(self, start=None, validator=None):
+        raise ConnectionError("unreachable")
+
+
+def _hicp(periods=36):
+    return pd.Series(2.0, index=pd.date_range("2020-01-31", periods=periods, freq="ME"))
+
+
+def test_inflation_source_is_abstract():
+    with pytest.raises(TypeError):
+        InflationSource()
+
+
+def test_validator_is_only_sent_with_the_query_that_produced_it(tmp_path):
+    source = RecordingSource(_hicp())
+    store = InflationStore(source, cache_dir=tmp_path, offline=False, revision_window=12)
+
+    store.refresh()                         # full fetch
+    store.refresh()                         # incremental: the full fetch's ETag must not be sent
+    store.refresh()                         # same incremental query: its own ETag is sent
+
+    (start_0, validator_0), (start_1, validator_1), (start_2, validator_2) = source.calls
+    assert start_0 is None and validator_0 is None
+    assert start_1 is not None and validator_1 is None
+    assert start_2 == start_1 and validator_2 == f"since-{start_1:%Y-%m}"
+    pd.testing.assert_series_equal(store.load(), _hicp(), check_names=False, check_freq=False)
+
+
+def test_failed_first_load_returns_an_empty_series(tmp_path):
+    store = InflationStore(FailingSource(), cache_dir=tmp_path, offline=False)
+    with pytest.warns(UserWarning):
+        assert store.load().empty
+    # The failure is remembered: no second attempt within retry_after
+    assert not store.needs_refresh()
+    assert store.load().empty
@@ -0,0 +1,57 @@
+import subprocess
+import sys
+import numpy as np
+import pytest
+from datetime import datetime, timedelta
+from pathlib import Path
+from pytrade.data_models.options import OptionDirection, OptionLeg, OptionModel, OptionStrategy, OptionType
+from pytrade.simulation.option_strategy import OptionStrategySimulator
+
+
+def _strategy(days=25):
+    expiry = (datetime.today() + timedelta(days=days)).strftime("%Y-%m-%d")
+    return OptionStrategy([
+        OptionLeg(OptionModel("SPY", 440, 5.0, 0.20, expiry, OptionType.PUT, OptionDirection.SHORT), 2),
+        OptionLeg(OptionModel("SPY", 420, 2.0, 0.24, expiry, OptionType.PUT, OptionDirection.LONG), 2),
+        OptionLeg(OptionModel("SPY", 470, 3.0, 0.18, expiry, OptionType.CALL, OptionDirection.SHORT), 1),
+    ])
+
+
+@pytest.mark.parametrize("vol_skew", [0.0, 1.5])
+def test_engines_match_the_per_path_loop(vol_skew):
+    rng = np.random.default_rng(3)
+    with OptionStrategySimulator(_strategy(), returns=rng.normal(0, 0.01, 1000)) as sim:
+        paths = rng.normal(0, 0.015, (53, sim.first_expiration))
+        reference = sim.simulate_pnl(paths, 450.0, vol_skew=vol_skew, engine="multiprocessing", n_cores=1)
+
+        for engine, n_cores in [("vectorized", 1), ("shared_memory", 2)]:
+            for chunk_size in (None, 7):                     # 7 does not divide 53
+                pnl = sim.simulate_pnl(
+                    paths, 450.0, vol_skew=vol_skew, engine=engine, n_cores=n_cores, chunk_size=chunk_size
+                )
+                assert pnl.shape == (53, sim.first_expiration)
+                assert np.array_equal(pnl, reference), (engine, chunk_size)
+
+
+def test_owned_pool_after_numba_kernel_does_not_hang_exit():
+    script = """
+import numpy as np
+from datetime import datetime, timedelta
+from pytrade.data_models.options import OptionDirection, OptionLeg, OptionModel, OptionStrategy, OptionType
+from pytrade.simulation.option_strategy import OptionStrategySimulator
+from pytrade.simulation.utils import apply_exit_rules
+
+if __name__ == "__main__":
+    expiry = (datetime.today() + timedelta(days=20)).strftime("%Y-%m-%d")
+    strategy = OptionStrategy([OptionLeg(OptionModel("SPY", 440, 5.0, 0.2, expiry, OptionType.PUT, OptionDirection.SHORT), 1)])
+    rng = np.random.default_rng(0)
+    sim = OptionStrategySimulator(strategy, returns=rng.normal(0, 0.01, 1000))
+    apply_exit_rules(rng.normal(size=(1000, 20)), stop_loss=-1.0)       # numba threads now exist
+    sim.simulate_pnl(rng.normal(0, 0.01, (50, sim.first_expiration)), 450.0, engine="shared_memory", n_cores=2)
+    sim.close()
+    print("done")
+"""
+    completed = subprocess.run(
+        [sys.executable, "-c", script], capture_output=True, text=True, timeout=120, cwd=Path(__file__).parents[2]
+    )
+    assert completed.stdout.strip() == "done", completed.stderr
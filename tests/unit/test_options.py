@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+from dataclasses import asdict
+from datetime import datetime, timedelta
+from pytrade.data_models.options import OptionDirection, OptionModel, OptionType
+
+
+def _option(option_type, strike=100.0):
+    expiry = (datetime.today() + timedelta(days=30)).strftime("%Y-%m-%d")
+    return OptionModel("SPY", strike, 2.0, 0.25, expiry, option_type, OptionDirection.LONG)
+
+
+SPOTS = np.array([80.0, 99.0, 100.0, 101.0, 120.0])[:, None]             # both sides of the strike
+DAYS = np.array([-3.0, 0.0, 0.5, 1.0, 30.0, 365.0])[None, :]             # expired and live
+
+
+@pytest.mark.parametrize("option_type", [OptionType.PUT, OptionType.CALL])
+def test_price_grid_matches_scalar_calls(option_type):
+    option = _option(option_type)
+    prices = option.black_scholes_calculation(SPOTS, days_to_expiry=DAYS)
+
+    assert prices.shape == (SPOTS.size, DAYS.size)
+    for i, spot in enumerate(SPOTS[:, 0]):
+        for j, days in enumerate(DAYS[0]):
+            price = option.black_scholes_calculation(float(spot), days_to_expiry=float(days))
+            assert np.ndim(price) == 0
+            assert prices[i, j] == price
+
+    # Expired contracts are worth their intrinsic value
+    intrinsic = np.maximum(SPOTS - 100.0, 0) if option_type == OptionType.CALL else np.maximum(100.0 - SPOTS, 0)
+    np.testing.assert_array_equal(prices[:, :2], np.broadcast_to(intrinsic, (SPOTS.size, 2)))
+
+
+@pytest.mark.parametrize("option_type", [OptionType.PUT, OptionType.CALL])
+def test_greek_grid_matches_scalar_calls(option_type):
+    option = _option(option_type)
+    ivs = np.linspace(0.15, 0.35, SPOTS.size)[:, None]
+    grid = asdict(option.compute_greeks(SPOTS, iv=ivs, days_to_expiry=DAYS))
+
+    for i, spot in enumerate(SPOTS[:, 0]):
+        for j, days in enumerate(DAYS[0]):
+            greeks = asdict(option.compute_greeks(float(spot), iv=float(ivs[i, 0]), days_to_expiry=float(days)))
+            for name, value in greeks.items():
+                assert np.ndim(value) == 0, name
+                assert grid[name].shape == (SPOTS.size, DAYS.size)
+                assert grid[name][i, j] == value, (name, spot, days)
+
+    expired = {name: values[:, :2] for name, values in grid.items()}
+    assert (expired["theta"] == 0).all() and (expired["gamma"] == 0).all() and (expired["vega"] == 0).all()
+    expected_delta = (SPOTS > 100.0) * 1.0 if option_type == OptionType.CALL else (SPOTS < 100.0) * -1.0
+    np.testing.assert_array_equal(expired["delta"], np.broadcast_to(expected_delta, (SPOTS.size, 2)))
+
+
+def test_scalar_inputs_return_scalars():
+    option = _option(OptionType.CALL)
+    assert isinstance(option.black_scholes_calculation(100.0), float)
+    assert all(isinstance(value, float) for value in asdict(option.compute_greeks(100.0)).values())
@@ -0,0 +1,135 @@
+import threading
+import numpy as np
+import pytest
+from pytrade.utils.market_data import MarketDataCache
+from pytrade.utils.return_store import MonthlyReturnStore
+
+
+def test_return_store_must_read_the_given_market_data(make_portfolio, market_data, tmp_path):
+    other = MarketDataCache(tmp_path / "other", offline=True)
+    with pytest.raises(ValueError):
+        make_portfolio(market_data=other, return_store=MonthlyReturnStore(market_data))
+    make_portfolio(market_data=market_data, return_store=MonthlyReturnStore(market_data))
+
+
+def test_same_ticker_with_different_leverage_keeps_both_positions(make_portfolio):
+    portfolio = make_portfolio([("SPY", 0.5, 1.0, 0.001), ("SPY", 0.5, 2.0, 0.006)])
+    columns = portfolio._position_columns
+
+    assert columns == ["SPY x1 er0.001", "SPY x2 er0.006"]
+    data = portfolio.data
+    assert not np.allclose(data[columns[0]], data[columns[1]])
+    np.testing.assert_allclose(data["PRTF"], data[columns].mean(axis=1))
+
+
+def test_unique_tickers_keep_their_names(make_portfolio):
+    portfolio = make_portfolio([("SPY", 0.5), ("GLD", 0.25), ("GLD", 0.25)])
+    assert portfolio._position_columns == ["SPY", "GLD", "GLD"]
+    np.testing.assert_allclose(
+        portfolio.data["PRTF"], 0.5 * portfolio.data["SPY"] + 0.5 * portfolio.data["GLD"]
+    )
+
+
+def test_data_read_during_load_waits_for_the_full_frame(make_portfolio):
+    portfolio = make_portfolio(lazy=True)
+    entered, release = threading.Event(), threading.Event()
+    build_portfolio = portfolio._build_portfolio
+
+    def slow_build_portfolio(data):
+        entered.set()
+        assert release.wait(10)
+        return build_portfolio(data)
+
+    portfolio._build_portfolio = slow_build_portfolio
+    loader = threading.Thread(target=portfolio.load)
+    loader.start()
+    assert entered.wait(10)
+
+    seen = []
+    reader = threading.Thread(target=lambda: seen.append(portfolio.data))
+    reader.start()
+    reader.join(0.2)
+    assert reader.is_alive() and not portfolio.is_loaded
+
+    release.set()
+    loader.join(10)
+    reader.join(10)
+    assert seen[0] is portfolio.data and "PRTF" in seen[0] and "INFLATION" in seen[0]
+
+
+def test_failed_load_leaves_no_data(make_portfolio, monkeypatch):
+    portfolio = make_portfolio(lazy=True)
+
+    def fail(data):
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(portfolio, "_build_portfolio", fail)
+    with pytest.raises(RuntimeError):
+        portfolio.load()
+    assert not portfolio.is_loaded
+
+
+def test_policy_sweep_rows_match_individual_runs(make_portfolio):
+    portfolio = make_portfolio()
+    common = dict(starting_portfolio=100_000, horizon_years=10, num_simulations=150, seed=11)
+    sweep = portfolio.sweep_withdrawal_policies(
+        {
+            "anual_withdrawal_rate": [0.04, 0.12],
+            "minimum_monthly_withdrawal_amount": [300.0, 1_500.0],
+            "maximum_monthly_withdrawal_amount": [2_000.0],
+            "drawdown_deferral": [0, 6],
+        },
+        quantiles=(0.1, 0.5, 0.9),
+        **common
+    )
+
+    assert len(sweep) == 8
+    for row in sweep.itertuples():
+        output = portfolio.simulate_withdrawal_failure_rate(
+            anual_withdrawal_rate=row.anual_withdrawal_rate,
+            minimum_monthly_withdrawal_amount=row.minimum_monthly_withdrawal_amount,
+            maximum_monthly_withdrawal_amount=row.maximum_monthly_withdrawal_amount,
+            drawdown_deferral=row.drawdown_deferral,
+            **common
+        ).simulation_output
+        terminal_value = output["portfolio_value"][:, -1]
+
+        assert row.failure_rate == (terminal_value <= 0).mean()
+        assert row.mean_total_withdrawals == pytest.approx(output["withdrawals"].sum(axis=1).mean(), rel=1e-12)
+        np.testing.assert_allclose(
+            [row.terminal_value_q10, row.terminal_value_q50, row.terminal_value_q90],
+            np.quantile(terminal_value, (0.1, 0.5, 0.9)),
+            rtol=1e-12
+        )
+    assert 0 < sweep["failure_rate"].max() and sweep["failure_rate"].min() < 1
+
+
+def test_current_allocation_scores_match_the_simulations(make_portfolio):
+    portfolio = make_portfolio()
+    common = dict(horizon_years=10, num_simulations=200, seed=5)
+    plan = dict(
+        starting_portfolio=100_000, anual_withdrawal_rate=0.15,
+        minimum_monthly_withdrawal_amount=1_200.0, maximum_monthly_withdrawal_amount=2_500.0, drawdown_deferral=3
+    )
+    table = portfolio.optimize_allocation(num_candidates=5, **plan, **common)
+    current = table.loc[0]
+
+    assert current[portfolio._position_columns].tolist() == [0.6, 0.4]
+    output = portfolio.simulate_withdrawal_failure_rate(**plan, **common).simulation_output
+    assert current["failure_rate"] == (output["portfolio_value"][:, -1] <= 0).mean()
+    assert 0 < current["failure_rate"] < 1
+    w_stars = portfolio.estimate_perpetual_withdrawal_rate(**common).simulation_output["perpetual_withdrawal_rates"]
+    assert current["median_perpetual_withdrawal_rate"] == pytest.approx(np.median(w_stars), rel=1e-9)
+
+
+@pytest.mark.parametrize(
+    "kwargs, error",
+    [
+        (dict(objective="sharpe"), ValueError),
+        (dict(candidates=[[0.2, 0.3, 0.5]]), ValueError),         # one weight per position
+        (dict(candidates=[[0.5, 0.6]]), RuntimeError),           # does not sum to 1
+    ]
+)
+def test_invalid_candidates_are_rejected(make_portfolio, kwargs, error):
+    with pytest.raises(error):
+        make_portfolio().optimize_allocation(num_simulations=10, horizon_years=1, **kwargs)
@@ -0,0 +1,48 @@
+import os
+import numpy as np
+import pandas as pd
+from pytrade.utils.return_store import MonthlyReturnStore, chained_daily_returns
+
+
+def _close():
+    index = pd.bdate_range("2020-01-01", periods=6)
+    return pd.DataFrame({
+        "NEW": [np.nan, np.nan, np.nan, 10.0, 11.0, 12.1],
+        "OLD": [100.0, 101.0, np.nan, 103.0, 104.0, np.nan],
+    }, index=index)
+
+
+def test_chain_falls_back_to_later_constituents():
+    returns = chained_daily_returns(_close(), [["NEW", "OLD"], ["OLD"]])
+
+    old = _close()["OLD"].ffill().pct_change().to_numpy()
+    new = _close()["NEW"].pct_change().to_numpy()
+    expected = np.where(np.isnan(new), old, new)
+    expected[2] = np.nan                     # neither constituent quoted that day
+    np.testing.assert_allclose(returns[:, 0], expected)
+    np.testing.assert_allclose(returns[:, 1], np.where(_close()["OLD"].isna(), np.nan, old))
+
+
+def test_constituents_missing_from_the_frame_are_skipped():
+    close = _close()
+    expected = chained_daily_returns(close, [["NEW", "OLD"]])
+    returns = chained_daily_returns(close, [["GONE", "NEW", "MISSING", "OLD"], ["GONE"]])
+
+    np.testing.assert_array_equal(returns[:, 0], expected[:, 0])
+    assert np.isnan(returns[:, 1]).all()
+
+
+def test_memo_is_reused_until_the_price_cache_changes(market_data):
+    store = MonthlyReturnStore(market_data)
+    first = store.get([("SPY", 1.0, 0.0)])[("SPY", 1.0, 0.0)]
+    assert store.get([("SPY", 1, 0)])[("SPY", 1.0, 0.0)] is first
+
+    close = market_data.load("SPY")
+    market_data.store("SPY", close * np.linspace(1.0, 2.0, len(close)))
+    stat = market_data.path("SPY").stat()
+    os.utime(market_data.path("SPY"), ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+    assert ("SPY", 1.0, 0.0) not in store
+    second = store.get([("SPY", 1.0, 0.0)])[("SPY", 1.0, 0.0)]
+    assert not np.array_equal(second.to_numpy(), first.to_numpy())
+    assert ("SPY", 1.0, 0.0) in store
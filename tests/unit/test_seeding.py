@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+from pytrade.simulation.seeding import PATHS_PER_STREAM, path_uniforms
+
+
+@pytest.mark.parametrize("chunk", [1, 7, PATHS_PER_STREAM - 1, PATHS_PER_STREAM + 3])
+def test_path_uniforms_do_not_depend_on_chunking(chunk):
+    num_paths, width = 2 * PATHS_PER_STREAM + 50, 5
+    expected = path_uniforms(42, 0, num_paths, width)
+    chunked = np.vstack([
+        path_uniforms(42, start, min(chunk, num_paths - start), width)
+        for start in range(0, num_paths, chunk)
+    ])
+    assert np.array_equal(chunked, expected)
+
+
+def test_path_uniforms_depend_on_seed_and_path():
+    draws = path_uniforms(0, 0, 4, 3)
+    assert not np.array_equal(draws, path_uniforms(1, 0, 4, 3))
+    assert len({tuple(row) for row in draws}) == 4
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        dict(chunk_size=1),
+        dict(chunk_size=7),
+        dict(n_workers=2),
+        dict(n_workers=2, chunk_size=7),
+        dict(n_workers=2, chunk_size=3, task_size=11),
+    ]
+)
+def test_sampled_paths_do_not_depend_on_chunks_or_workers(make_portfolio, kwargs):
+    portfolio = make_portfolio()
+    expected = portfolio.simulate_withdrawal_failure_rate(num_simulations=60, horizon_years=5, seed=7)
+    results = portfolio.simulate_withdrawal_failure_rate(num_simulations=60, horizon_years=5, seed=7, **kwargs)
+
+    for key, values in expected.simulation_output.items():
+        assert np.array_equal(results.simulation_output[key], values), key
@@ -0,0 +1,31 @@
+import numpy as np
+import pytest
+from multiprocessing import shared_memory
+from pytrade.simulation import shared_memory as shared_memory_module
+from pytrade.simulation.shared_memory import SharedArray
+
+
+@pytest.mark.parametrize("remap", [True, False])
+def test_detach_keeps_contents_and_frees_the_name(monkeypatch, remap):
+    if not remap:
+        monkeypatch.setattr(shared_memory_module, "_block_descriptor", lambda shm: None)
+    values = np.arange(12, dtype=np.float32).reshape(3, 4)
+    shared = SharedArray.from_array(values)
+    name = shared.spec[0]
+
+    array = shared.detach()
+
+    assert np.array_equal(array, values) and array.dtype == values.dtype
+    assert array.flags.owndata is not remap                 # remapped, not copied
+    array[0, 0] = -1.0                      # still writable after the block is gone
+    with pytest.raises(FileNotFoundError):
+        shared_memory.SharedMemory(name=name)
+    shared.close()                          # no-op once detached
+
+
+def test_only_the_owner_can_detach():
+    with SharedArray.create((2,)) as shared:
+        attached = SharedArray.attach(shared.spec)
+        with pytest.raises(ValueError):
+            attached.detach()
+        attached.close()
@@ -0,0 +1,51 @@
+import json
+import numpy as np
+import pytest
+from pytrade.data_models.simulation import BaseSimulationResults, CompactSimulationOutput
+
+
+def _compact_output(num_paths=20, sequence_length=12):
+    rng = np.random.default_rng(0)
+    history = rng.normal(0.005, 0.04, 300)
+    indices = rng.integers(0, len(history), (num_paths, sequence_length))
+    return CompactSimulationOutput(
+        arrays={"portfolio_value": rng.random((num_paths, sequence_length)).astype(np.float32)},
+        indices=indices,
+        sources={"sampled_returns": history, "sampled_inflation": 0.0025}
+    )
+
+
+def test_dense_results_round_trip(tmp_path):
+    results = BaseSimulationResults(
+        simulation_output={"perpetual_withdrawal_rates": np.arange(5.0), "num_simulations": 5},
+        metadata={"method": "estimate_perpetual_withdrawal_rate", "seed": 3, "parameters": {"compact": False}}
+    )
+    loaded = BaseSimulationResults.load(results.save(tmp_path / "run"))
+
+    assert isinstance(loaded.simulation_output["perpetual_withdrawal_rates"], np.memmap)
+    assert np.array_equal(loaded.simulation_output["perpetual_withdrawal_rates"], np.arange(5.0))
+    assert loaded.simulation_output["num_simulations"] == 5
+    assert loaded.metadata == results.metadata
+
+
+def test_compact_results_round_trip_without_rescanning_indices(tmp_path, monkeypatch):
+    output = _compact_output()
+    assert output.indices.dtype == np.int16
+    path = BaseSimulationResults(simulation_output=output).save(tmp_path / "run")
+    assert json.loads((path / "metadata.json").read_text())["compact_indices_dtype"] == np.dtype(np.int16).str
+
+    def fail(indices):
+        raise AssertionError("indices were re-narrowed on load")
+    monkeypatch.setattr(CompactSimulationOutput, "narrow_indices", staticmethod(fail))
+    loaded = BaseSimulationResults.load(path).simulation_output
+
+    assert isinstance(loaded.indices, np.memmap) and loaded.indices.dtype == np.int16
+    for key in output:
+        assert np.array_equal(loaded[key], output[key]), key
+
+
+def test_index_dtype_mismatch_is_rejected(tmp_path):
+    path = BaseSimulationResults(simulation_output=_compact_output()).save(tmp_path / "run")
+    np.save(path / "bootstrap_indices.npy", np.zeros((20, 12), dtype=np.int64))
+    with pytest.raises(ValueError):
+        BaseSimulationResults.load(path)
@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+from pytrade.simulation.streaming import HistogramSketch, histogram_quantiles
+
+LEVELS = [0.0, 0.01, 0.1, 0.25, 0.5, 0.75, 0.9, 0.99, 1.0]
+
+
+def test_sketch_quantiles_are_within_one_bin_of_exact():
+    rng = np.random.default_rng(6)
+    values = np.column_stack([rng.uniform(0, 100, 5000), rng.normal(50, 10, 5000), rng.exponential(20, 5000)])
+    edges = np.linspace(0, 200, 401)
+
+    sketch = HistogramSketch(edges, num_columns=3)
+    for chunk in np.array_split(values, 7):
+        sketch.update(chunk)
+
+    assert sketch.counts.sum() == values.size
+    bin_width = edges[1] - edges[0]
+    np.testing.assert_array_less(
+        np.abs(sketch.quantiles(LEVELS) - np.quantile(values, LEVELS, axis=0)), bin_width + 1e-12
+    )
+
+
+def test_underflow_and_overflow_ranks():
+    edges = np.linspace(10, 20, 11)
+    values = np.array([0.0] * 30 + [15.2] * 40 + [99.0] * 30)[:, None]
+    sketch = HistogramSketch(edges, num_columns=1)
+    sketch.update(values)
+
+    assert sketch.counts[0, 0] == 30 and sketch.counts[0, -1] == 30
+    low, middle, high = sketch.quantiles([0.2, 0.5, 0.9])[:, 0]
+    assert low == 0.0                                      # underflow ranks map to 0
+    assert 15.0 <= middle <= 16.0
+    assert high == edges[-1]                               # overflow ranks map to the top edge
+
+    # Without the underflow bin the median falls among the remaining 70 values
+    assert 15.0 <= sketch.quantiles([0.5], skip_underflow=True)[0, 0] <= 16.0
+
+
+def test_empty_columns_yield_nan():
+    edges = np.linspace(0, 1, 5)
+    counts = np.zeros((2, len(edges) + 1))
+    counts[1, 2] = 4
+    out = histogram_quantiles(counts, edges, [0.5])
+    assert np.isnan(out[0, 0]) and 0.25 <= out[0, 1] <= 0.5
+
+    # A column whose only observations are skipped underflows is empty too
+    assert np.isnan(histogram_quantiles([[3, 0, 0, 0, 0, 0]], edges, [0.5], skip_underflow=True)[0, 0])
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 64, 1000])
+def test_streamed_failure_rate_matches_dense_run(make_portfolio, chunk_size):
+    portfolio = make_portfolio()
+    plan = dict(
+        starting_portfolio=100_000, anual_withdrawal_rate=0.15, minimum_monthly_withdrawal_amount=1_200.0,
+        maximum_monthly_withdrawal_amount=2_500.0, drawdown_deferral=2, horizon_years=10, seed=9
+    )
+    dense = portfolio.simulate_withdrawal_failure_rate(num_simulations=150, **plan).simulation_output
+    summary = portfolio.simulate_withdrawal_summary(
+        num_simulations=150, chunk_size=chunk_size, **plan
+    ).simulation_output
+
+    expected = (dense["portfolio_value"] <= 0).mean(axis=0)
+    assert 0 < expected[-1] < 1
+    np.testing.assert_array_equal(summary["failure_rate"], expected)
+    np.testing.assert_allclose(summary["portfolio_value_mean"], dense["portfolio_value"].mean(axis=0), rtol=1e-9)
@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+from pytrade.simulation.withdrawal import WITHDRAWAL_ENGINES, simulate_withdrawals, solve_perpetual_withdrawal_rates
+
+
+def _paths(num_simulations=200, sequence_length=120, seed=0):
+    rng = np.random.default_rng(seed)
+    returns   = rng.normal(0.005, 0.05, (num_simulations, sequence_length))
+    inflation = rng.normal(0.002, 0.003, (num_simulations, sequence_length))
+    return returns, inflation
+
+
+@pytest.mark.parametrize("drawdown_deferral", [0, 12])
+@pytest.mark.parametrize(
+    "anual_withdrawal_rate, minimum, maximum",
+    [
+        (0.04, 2_000.0, 8_000.0),          # sustainable: bounds bind on both sides
+        (0.30, 20_000.0, 60_000.0),        # drains the portfolio on most paths
+    ]
+)
+def test_engines_match_reference_bit_for_bit(drawdown_deferral, anual_withdrawal_rate, minimum, maximum):
+    returns, inflation = _paths()
+    results = {
+        engine: simulate_withdrawals(
+            returns, inflation, 1_000_000.0, anual_withdrawal_rate, minimum, maximum,
+            drawdown_deferral=drawdown_deferral, engine=engine
+        )
+        for engine in WITHDRAWAL_ENGINES
+    }
+
+    reference_value, reference_withdrawals = results["python"]
+    for engine in WITHDRAWAL_ENGINES:
+        portfolio_value, withdrawals = results[engine]
+        assert np.array_equal(portfolio_value, reference_value), engine
+        assert np.array_equal(withdrawals, reference_withdrawals), engine
+
+    assert (reference_withdrawals[:, :drawdown_deferral] == 0).all()
+    if anual_withdrawal_rate > 0.1:
+        assert (reference_value[:, -1] == 0).mean() > 0.5
+
+
+def test_unknown_engine_raises():
+    returns, inflation = _paths(2, 3)
+    with pytest.raises(ValueError):
+        simulate_withdrawals(returns, inflation, 1.0, 0.04, 0.0, 1.0, engine="fortran")
+
+
+def test_perpetual_rates_preserve_real_value():
+    returns, inflation = _paths(50, 60)
+    w_stars = solve_perpetual_withdrawal_rates(returns, inflation)
+
+    # Withdraw w*/12 * CPI_{t-1} after each month's growth from a unit portfolio
+    cpi = np.cumprod(1 + inflation, axis=1)
+    value = np.ones(len(returns))
+    for t in range(returns.shape[1]):
+        value *= 1 + returns[:, t]
+        value -= w_stars / 12 * (cpi[:, t - 1] if t else 1.0)
+    assert np.allclose(value, cpi[:, -1])
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 1000])
+def test_perpetual_rates_do_not_depend_on_chunk_size(chunk_size):
+    returns, inflation = _paths(50, 60)
+    expected = solve_perpetual_withdrawal_rates(returns, inflation)
+    assert np.array_equal(solve_perpetual_withdrawal_rates(returns, inflation, chunk_size=chunk_size), expected)
+
+
+def test_perpetual_rates_reject_empty_chunks():
+    returns, inflation = _paths(2, 3)
+    with pytest.raises(ValueError):
+        solve_perpetual_withdrawal_rates(returns, inflation, chunk_size=0)